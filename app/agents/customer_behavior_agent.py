@@ -2,6 +2,8 @@
 from crewai import Agent
 from app.utils.llm_utils import get_llm
 from app.utils.config import get_agents_config
+from app.utils.tools_utils import get_erp_tools
+from app.tools.customer_tools import get_customer_tools
 
 # Initialize the LLM and load agent configurations
 llm = get_llm()
@@ -12,5 +14,6 @@ customer_behavior_agent = Agent(
     config=agents_config['customer_behavior_agent'],
     verbose=True,
     llm=llm,
+    tools=get_erp_tools() + get_customer_tools(),  # Equip with ERP history and the customer demand model
     cache=False
 )
\ No newline at end of file
@@ -3,6 +3,7 @@ from crewai import Agent
 from app.utils.llm_utils import get_llm
 from app.utils.config import get_agents_config
 from app.utils.tools_utils import get_weather_tools, get_news_tools
+from app.tools.disruption_tools import get_disruption_tools
 
 # Initialize the LLM and load agent configurations
 llm = get_llm()
@@ -13,6 +14,6 @@ disruption_management_agent = Agent(
     config=agents_config['disruption_management_agent'],
     verbose=True,
     llm=llm,
-    tools=get_weather_tools() + get_news_tools(),  # Equip with tools to access weather and news data
+    tools=get_weather_tools() + get_news_tools() + get_disruption_tools(),  # Equip with tools to access weather and news data and to quantify impacts
     cache=False
 )
\ No newline at end of file
@@ -2,6 +2,8 @@
 from crewai import Agent
 from app.utils.llm_utils import get_llm
 from app.utils.config import get_agents_config
+from app.tools.logistics_tools import get_logistics_tools
+from app.tools.digital_twin_tools import get_digital_twin_tools
 
 # Initialize the LLM and load agent configurations
 llm = get_llm()
@@ -12,5 +14,6 @@ logistics_agent = Agent(
     config=agents_config['logistics_agent'],
     verbose=True,
     llm=llm,
+    tools=get_logistics_tools() + get_digital_twin_tools(),  # Equip with tools to plan loads and routes and to set the twin's lanes
     cache=False
 )
\ No newline at end of file
@@ -2,6 +2,8 @@
 from crewai import Agent
 from app.utils.llm_utils import get_llm
 from app.utils.config import get_agents_config
+from app.utils.tools_utils import get_erp_tools, get_weather_tools, get_news_tools
+from app.tools.supplier_tools import get_supplier_tools
 
 # Initialize the LLM and load agent configurations
 llm = get_llm()
@@ -12,5 +14,6 @@ supplier_evaluation_agent = Agent(
     config=agents_config['supplier_evaluation_agent'],
     verbose=True,
     llm=llm,
+    tools=get_erp_tools() + get_weather_tools() + get_news_tools() + get_supplier_tools(),  # Equip with supplier data, risk signals, and tools to score suppliers and allocate demand across them
     cache=False
 )
\ No newline at end of file
@@ -1,49 +1,79 @@
-import os
-from crewai import Agent
-from crewai.knowledge.source.text_file_knowledge_source import TextFileKnowledgeSource
+from typing import Any, Optional, Sequence
+from pydantic import Field
+from crewai import Agent, Task
+from crewai.tools.agent_tools.ask_question_tool import AskQuestionTool
+from crewai.tools.agent_tools.base_agent_tools import BaseAgentTool
+from crewai.tools.agent_tools.delegate_work_tool import DelegateWorkTool
 from crewai_tools import FileReadTool, FileWriterTool
 
 from app.utils.llm_utils import get_llm
 from app.utils.config import get_agents_config, get_prompts_config
+from app.utils.knowledge_utils import KnowledgeIndex
 
 # Get the LLM instance
 llm = get_llm()
 
-# Helper function to load markdown files
-def load_markdown_files(directory: str) -> str:
-    """
-    A helper function to recursively load all markdown files from a directory into a single string.
-    
-    Args:
-        directory: The path to the directory containing the markdown files.
-
-    Returns:
-        A string containing the concatenated content of all markdown files.
-    """
-    all_content = ""
-    for filename in os.listdir(directory):
-        if filename.endswith(".md"):
-            with open(os.path.join(directory, filename), "r", encoding='utf-8') as f:
-                all_content += f.read() + "\n\n"
-    return all_content
-
 # --- Knowledge Base Setup ---
 # The manager agent is equipped with a knowledge base containing project documentation.
-# This allows it to provide context and guidance to other agents.
-memory_bank_path = "memory_bank"
-memory_bank_files = [os.path.join(memory_bank_path, f) for f in os.listdir(f"knowledge/{memory_bank_path}") if f.endswith('.md')]
-# Only create a knowledge base if memory bank files are found.
-knowledge_base = None
-if memory_bank_files:
-    source = TextFileKnowledgeSource(file_paths=memory_bank_files)
-    # knowledge_base = KnowledgeBase(sources=[source]) # This line is commented out as it's not used
+# The instructions and knowledge files are chunked and embedded once into a persisted index,
+# which is only re-embedded for files whose modification time has changed.
+knowledge_index = KnowledgeIndex(directories=["instructions", "knowledge"])
 
 # --- Instructions and Prompts Setup ---
-# Load custom instructions from markdown files to inject into the agent's system prompt.
-custom_instructions = load_markdown_files("instructions")
+# Only a table of contents goes into the system prompt; the relevant sections are
+# retrieved from the index and injected into each task the manager executes.
+custom_instructions = knowledge_index.table_of_contents()
 # Load the system prompt template from the YAML configuration.
 system_template = get_prompts_config()['crew_manager_agent']['system_template']
 
+def with_knowledge(knowledge_index, query: str, context: Optional[str], top_k: int) -> Optional[str]:
+    """Returns the context with the top-k knowledge chunks most relevant to the query prepended to it."""
+    if knowledge_index is None:
+        return context
+    knowledge = knowledge_index.format_context(query, top_k)
+    if not knowledge:
+        return context
+    knowledge = f"Relevant project knowledge:\n{knowledge}"
+    return f"{knowledge}\n\n{context}" if context else knowledge
+
+class KnowledgeDelegationTool(BaseAgentTool):
+    """A delegation tool that adds the knowledge chunks relevant to each delegated task to the coworker's context."""
+    knowledge_index: Any = Field(default=None, description="The KnowledgeIndex to retrieve task context from.")
+    knowledge_top_k: int = Field(default=4, description="The number of knowledge chunks injected per delegated task.")
+
+    def _execute(self, agent_name: Optional[str], task: str, context: Optional[str] = None) -> str:
+        return super()._execute(agent_name, task, with_knowledge(self.knowledge_index, task, context, self.knowledge_top_k))
+
+class KnowledgeDelegateWorkTool(DelegateWorkTool, KnowledgeDelegationTool):
+    """Delegates work to a coworker with the relevant project knowledge."""
+
+class KnowledgeAskQuestionTool(AskQuestionTool, KnowledgeDelegationTool):
+    """Asks a coworker a question with the relevant project knowledge."""
+
+class KnowledgeAwareAgent(Agent):
+    """
+    An agent that injects the top-k most relevant knowledge chunks into the context of each task,
+    instead of carrying the full documentation corpus in its system prompt. Its delegation tools
+    do the same for every task it delegates, so the coworkers get the chunks relevant to their task.
+    """
+    knowledge_index: Any = Field(default=None, description="The KnowledgeIndex to retrieve task context from.")
+    knowledge_top_k: int = Field(default=4, description="The number of knowledge chunks injected per task.")
+
+    def execute_task(self, task: Task, context: Optional[str] = None, tools: Optional[list] = None) -> Any:
+        """Executes the task with the relevant knowledge chunks prepended to its context."""
+        context = with_knowledge(self.knowledge_index, f"{task.description}\n{task.expected_output}", context, self.knowledge_top_k)
+        return super().execute_task(task, context=context, tools=tools)
+
+    def get_delegation_tools(self, agents: Sequence[Any]) -> list:
+        """Returns the delegation tools, replaced by ones that add the relevant knowledge to each delegated task."""
+        knowledge_tools = {DelegateWorkTool: KnowledgeDelegateWorkTool, AskQuestionTool: KnowledgeAskQuestionTool}
+        return [
+            knowledge_tools[type(tool)](agents=tool.agents, description=tool.description,
+                                        knowledge_index=self.knowledge_index, knowledge_top_k=self.knowledge_top_k)
+            if type(tool) in knowledge_tools else tool
+            for tool in super().get_delegation_tools(agents)
+        ]
+
 # --- Agent Definition ---
 # Create the manager agent with its configuration, LLM, and enhanced system prompt.
 agent_params = {
@@ -55,7 +85,4 @@ agent_params = {
     "inject_date": True,
     "cache": False,
 }
-# if knowledge_base:
-#     agent_params["knowledge_base"] = knowledge_base
-
-manager_agent = Agent(**agent_params)
\ No newline at end of file
+manager_agent = KnowledgeAwareAgent(**agent_params, knowledge_index=knowledge_index)
\ No newline at end of file
@@ -0,0 +1,72 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from .erp_models import HistoricalData
+
+class CustomerSegment(BaseModel):
+    """
+    A group of customers with the same response to price, promotions and stockouts.
+    Its mean demand per step is `base_demand * (price / reference_price) ** price_elasticity`, raised by
+    `promotion_lift` in promotion steps.
+    """
+    name: str = Field(..., description="The name of the segment (e.g., 'loyal').")
+    base_demand: float = Field(..., ge=0, description="The mean demand per step at the reference price without a promotion.")
+    price_elasticity: float = Field(default=-1.0, le=0, description="The constant price elasticity of demand (e.g., -2 means a 10% higher price loses about 20% of the demand).")
+    promotion_lift: float = Field(default=0.0, ge=0, description="The relative increase of demand in a promotion step (e.g., 0.5 for +50%).")
+    backorder_fraction: float = Field(default=1.0, ge=0, le=1, description="The fraction of the segment's unmet demand that waits for a later delivery; the rest is lost.")
+    dispersion: Optional[float] = Field(default=None, gt=0, description="The negative binomial dispersion of the segment's demand: variance = mean + mean^2 / dispersion. Poisson if unset.")
+
+class CustomerDemandModel(BaseModel):
+    """The customer segments whose demands add up to the demand at each retail node."""
+    segments: List[CustomerSegment] = Field(..., min_length=1, description="The customer segments.")
+    reference_price: float = Field(default=20.0, gt=0, description="The price at which the segments' base demands apply.")
+    product_weights: Dict[str, float] = Field(default_factory=dict, description="Multiplies the demand of each product. Unlisted products use 1.")
+
+class PricingPlan(BaseModel):
+    """The price and promotion decisions the customer demand responds to, per step from now."""
+    price: Optional[float] = Field(default=None, gt=0, description="The price from the first step on. Defaults to the model's reference price.")
+    price_changes: Dict[int, float] = Field(default_factory=dict, description="New prices from a given step on (e.g., {8: 18.0} cuts the price to 18 from step 8).")
+    promotion_steps: List[int] = Field(default_factory=list, description="The steps with a promotion.")
+
+class DemandModelFit(BaseModel):
+    """The customer demand model fitted to observed demand, with the estimates it is based on."""
+    model: CustomerDemandModel = Field(..., description="The fitted model, ready to generate demand.")
+    observations: int = Field(..., description="The number of observed periods used.")
+    base_demand: float = Field(..., description="The fitted total mean demand per step at the reference price without a promotion.")
+    price_elasticity: float = Field(..., description="The demand-weighted price elasticity of all segments.")
+    promotion_lift: float = Field(..., description="The demand-weighted promotion lift of all segments.")
+    dispersion: Optional[float] = Field(default=None, description="The fitted negative binomial dispersion of the total demand, or None if it is not overdispersed.")
+    estimated: List[str] = Field(default_factory=list, description="The parameters estimated from the data; the others keep the values of the prior segments because the data does not vary enough to identify them.")
+
+class DemandScenarioRequest(BaseModel):
+    """Defines a batch of customer demand scenarios under a pricing plan, from a given or fitted model."""
+    model: Optional[CustomerDemandModel] = Field(default=None, description="The customer demand model. If unset, the default segments are used, or fitted to 'history' or 'observed_demand' if given.")
+    history: List[HistoricalData] = Field(default_factory=list, description="ERP history (as returned by get_historical_data) whose retailer orders are the observed demand to fit.")
+    observed_demand: List[float] = Field(default_factory=list, description="Observed demand per period to fit, instead of 'history'.")
+    observed_prices: List[float] = Field(default_factory=list, description="The price in each observed period, aligned with the observed demand. Needed to estimate the price elasticity.")
+    observed_promotions: List[bool] = Field(default_factory=list, description="Whether each observed period had a promotion. Needed to estimate the promotion lift.")
+    node: str = Field(default='retailer', description="The node whose orders in the ERP history are the observed demand.")
+    product_id: str = Field(default='beer', description="The product whose demand is observed.")
+    plan: PricingPlan = Field(default_factory=PricingPlan, description="The price and promotion decisions to generate demand for.")
+    steps: int = Field(default=13, ge=1, description="The number of steps per scenario.")
+    scenarios: int = Field(default=1000, ge=1, description="The number of demand scenarios generated.")
+    seed: Optional[int] = Field(default=None, description="The random seed. Scenarios are only reproducible when it is set.")
+
+class SegmentOutlook(BaseModel):
+    """The expected demand of one segment under the pricing plan."""
+    name: str = Field(..., description="The name of the segment.")
+    mean_demand: List[float] = Field(..., description="The mean demand per step.")
+    total_demand: float = Field(..., description="The mean total demand over all steps.")
+    backorder_fraction: float = Field(..., description="The fraction of the segment's unmet demand that waits.")
+
+class DemandScenarioResult(BaseModel):
+    """The customer demand expected under a pricing plan, summarised over the generated scenarios."""
+    prices: List[float] = Field(..., description="The price per step.")
+    promotions: List[bool] = Field(..., description="Whether each step has a promotion.")
+    mean_demand: List[float] = Field(..., description="The mean total demand per step over the scenarios.")
+    p10_demand: List[float] = Field(..., description="The 10th percentile of the total demand per step.")
+    p90_demand: List[float] = Field(..., description="The 90th percentile of the total demand per step.")
+    expected_revenue: float = Field(..., description="The mean revenue over all steps if all demand is served.")
+    backorder_fraction: float = Field(..., description="The demand-weighted fraction of unmet demand that waits; the rest is lost.")
+    segments: List[SegmentOutlook] = Field(..., description="The expected demand of every segment.")
+    fit: Optional[DemandModelFit] = Field(default=None, description="The fit of the model, if it was fitted to observed demand.")
+    model: CustomerDemandModel = Field(..., description="The model used. Pass it with the plan as a 'segmented' demand distribution to the simulation to test ordering policies against this demand.")
@@ -0,0 +1,57 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class ImpactNode(BaseModel):
+    """
+    A node of the network through which a disruption is propagated: its position, its stock and its demand.
+    Each node orders from a single supplier; a node without a supplier produces what it ships.
+    """
+    name: str = Field(..., description="The unique name of the node (e.g., 'retailer').")
+    supplier: Optional[str] = Field(default=None, description="The node it orders from. None for a producing node.")
+    inventory: float = Field(default=0.0, ge=0, description="The units on hand.")
+    demand: float = Field(default=0.0, ge=0, description="The external customer demand per step served by the node.")
+    capacity: Optional[float] = Field(default=None, ge=0, description="The most units the node ships (or, without a supplier, produces) per step. Unlimited if unset.")
+    lead_time: int = Field(default=2, ge=1, description="The steps a shipment from its supplier takes to arrive (or, without a supplier, its production lead time).")
+    lane_capacity: Optional[float] = Field(default=None, ge=0, description="The most units the lane from its supplier carries per step. Unlimited if unset.")
+    arrivals: List[float] = Field(default_factory=list, description="The units already on their way to the node, arriving in 1, 2, ... steps.")
+    backorder: float = Field(default=0.0, ge=0, description="The units the node has ordered that its supplier has not shipped yet.")
+    holding_cost: float = Field(default=0.5, ge=0, description="The cost per unit on hand and step.")
+    stockout_cost: float = Field(default=2.0, ge=0, description="The cost per unit of unmet demand or unshipped order and step.")
+
+class Disruption(BaseModel):
+    """
+    A disruption of a node or of the lane into a node, active for a number of steps.
+    A node disruption cuts what the node ships and delays everything it ships; a lane disruption only affects that lane.
+    """
+    node: Optional[str] = Field(default=None, description="The disrupted node (e.g., 'brewery' after a strike).")
+    origin: Optional[str] = Field(default=None, description="The origin of the disrupted lane; with 'destination', instead of 'node'.")
+    destination: Optional[str] = Field(default=None, description="The destination of the disrupted lane.")
+    capacity_loss: float = Field(default=1.0, ge=0, le=1, description="The fraction of the node's or lane's throughput lost, 1 being a full outage. The throughput is its capacity, or its normal flow if it has none.")
+    lead_time_delay: int = Field(default=0, ge=0, description="The extra steps taken by the shipments dispatched during the disruption.")
+    start: int = Field(default=0, ge=0, description="The number of steps from now until the disruption begins.")
+    duration: int = Field(default=1, ge=1, description="The number of steps the disruption lasts.")
+
+class ImpactRequest(BaseModel):
+    """Defines a what-if: the disruptions, the network they hit and how far ahead to look."""
+    disruptions: List[Disruption] = Field(..., description="The disruptions, applied together.")
+    nodes: List[ImpactNode] = Field(default_factory=list, description="The nodes of the network. If empty, the network is taken from the Digital Twin.")
+    horizon: int = Field(default=26, ge=1, description="The number of steps simulated.")
+    product_id: str = Field(default='beer', description="The product whose flow is simulated when the network is taken from the Digital Twin.")
+    demand: float = Field(default=10.0, ge=0, description="The customer demand per step at the nodes without customers downstream, when the network is taken from the Digital Twin.")
+
+class NodeImpact(BaseModel):
+    """The impact of the disruptions on one node downstream of them, compared with the undisrupted network."""
+    name: str = Field(..., description="The name of the node.")
+    rank: int = Field(..., description="The rank among the affected nodes, 1 being the hardest hit.")
+    time_to_stockout: Optional[int] = Field(default=None, description="The first step (from now) at which the node falls short of its demand and orders because of the disruptions. None if it never does within the horizon.")
+    steps_short: int = Field(default=0, description="The number of steps at which the node falls short because of the disruptions.")
+    peak_shortfall: float = Field(default=0.0, description="The largest extra unmet demand and unshipped orders of the node at any step.")
+    cost_impact: float = Field(default=0.0, description="The extra holding and stockout cost of the node over the horizon.")
+
+class ImpactReport(BaseModel):
+    """The outcome of a disruption what-if: the downstream nodes ranked by how hard they are hit."""
+    horizon: int = Field(..., description="The number of steps simulated.")
+    nodes_simulated: int = Field(..., description="The number of nodes in the network.")
+    impacts: List[NodeImpact] = Field(..., description="The nodes downstream of the disruptions, hardest hit first.")
+    total_cost_impact: float = Field(..., description="The extra cost of the whole network over the horizon.")
+    baseline_cost: float = Field(..., description="The cost of the whole network over the horizon without the disruptions.")
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import List, Dict
-from .supply_chain_models import SupplyChainNodeStatus, Shipment
+from typing import List, Dict, Optional
+from .supply_chain_models import SupplyChainNodeStatus, Order, Shipment
 
 class Product(BaseModel):
     """Data model for a product, representing its master data in an ERP system."""
@@ -13,6 +13,7 @@ class Supplier(BaseModel):
     name: str = Field(..., description="The name of the supplier.")
     reliability_score: float = Field(..., description="A score representing the supplier's reliability.")
     price: float = Field(..., description="The price per unit from this supplier.")
+    lead_time: Optional[int] = Field(default=None, description="The supplier's usual lead time in simulation steps, if known.")
 
 class HistoricalData(BaseModel):
     """
@@ -26,4 +27,83 @@ class HistoricalData(BaseModel):
 class StatusResponse(BaseModel):
     """A simple, generic status response model for operations that do not return complex data."""
     status: str = Field(..., description="The status of the operation (e.g., 'success', 'error').")
-    message: str = Field(..., description="A message providing details about the operation.")
\ No newline at end of file
+    message: str = Field(..., description="A message providing details about the operation.")
+
+class NodeDelta(BaseModel):
+    """The changes of a single node between two consecutive periods. Fields that did not change are left empty."""
+    inventory: Dict[str, int] = Field(default_factory=dict, description="The new inventory level of every product whose level changed.")
+    added_incoming_orders: List[Order] = Field(default_factory=list, description="The incoming orders that appeared in this period.")
+    removed_incoming_orders: List[str] = Field(default_factory=list, description="The IDs of the incoming orders that disappeared in this period.")
+    added_outgoing_orders: List[Order] = Field(default_factory=list, description="The outgoing orders that appeared in this period.")
+    removed_outgoing_orders: List[str] = Field(default_factory=list, description="The IDs of the outgoing orders that disappeared in this period.")
+
+class PeriodDelta(BaseModel):
+    """
+    The changes of the supply chain in a single period relative to the previous recorded period.
+    The first period of a delta-encoded history is relative to an empty supply chain, so it holds the full state.
+    """
+    period: int = Field(..., description="The simulation period number.")
+    nodes: Dict[str, NodeDelta] = Field(default_factory=dict, description="The changes of every node that changed, keyed by node name.")
+    added_shipments: List[Shipment] = Field(default_factory=list, description="The shipments that went into transit in this period.")
+    removed_shipments: List[str] = Field(default_factory=list, description="The IDs of the shipments that are no longer in transit.")
+
+class NodeColumns(BaseModel):
+    """The per-period quantities of a single node as arrays, aligned with the periods of a HistoryColumns object."""
+    inventory: Dict[str, List[int]] = Field(default_factory=dict, description="The inventory level of each product per period.")
+    incoming_quantity: Dict[str, List[int]] = Field(default_factory=dict, description="The total quantity of the open incoming orders of each product per period.")
+    outgoing_quantity: Dict[str, List[int]] = Field(default_factory=dict, description="The total quantity of the open outgoing orders of each product per period.")
+
+class HistoryColumns(BaseModel):
+    """A columnar view of the history: one array per node, quantity and product instead of one object per period."""
+    periods: List[int] = Field(..., description="The period numbers, which index every array.")
+    nodes: Dict[str, NodeColumns] = Field(default_factory=dict, description="The columns of each node, keyed by node name.")
+    in_transit_quantity: Dict[str, List[int]] = Field(default_factory=dict, description="The total quantity of each product in transit per period.")
+
+class SeriesSummary(BaseModel):
+    """Summary statistics of a per-period quantity."""
+    mean: float = Field(..., description="The mean over the periods.")
+    std: float = Field(..., description="The standard deviation over the periods.")
+    min: float = Field(..., description="The minimum over the periods.")
+    max: float = Field(..., description="The maximum over the periods.")
+    last: float = Field(..., description="The value in the last period.")
+
+class NodeHistorySummary(BaseModel):
+    """Summary statistics of the per-period quantities of a single node, per product."""
+    inventory: Dict[str, SeriesSummary] = Field(default_factory=dict, description="The inventory level of each product.")
+    incoming_quantity: Dict[str, SeriesSummary] = Field(default_factory=dict, description="The total quantity of the open incoming orders of each product.")
+    outgoing_quantity: Dict[str, SeriesSummary] = Field(default_factory=dict, description="The total quantity of the open outgoing orders of each product.")
+
+class HistorySummary(BaseModel):
+    """A per-node summary of a range of historical periods."""
+    first_period: Optional[int] = Field(default=None, description="The first summarised period.")
+    last_period: Optional[int] = Field(default=None, description="The last summarised period.")
+    num_periods: int = Field(..., description="The number of summarised periods.")
+    nodes: Dict[str, NodeHistorySummary] = Field(default_factory=dict, description="The summary of each node, keyed by node name.")
+    in_transit_quantity: Dict[str, SeriesSummary] = Field(default_factory=dict, description="The total quantity of each product in transit.")
+
+class RollingSummary(BaseModel):
+    """Statistics of a per-period quantity over all recorded periods and over the most recent window of periods."""
+    count: int = Field(..., description="The number of recorded periods.")
+    mean: float = Field(..., description="The mean over all periods.")
+    variance: float = Field(..., description="The variance over all periods.")
+    rolling_mean: float = Field(..., description="The mean over the most recent window of periods.")
+    rolling_variance: float = Field(..., description="The variance over the most recent window of periods.")
+    rolling_trend: float = Field(..., description="The average change per period over the most recent window (positive if rising).")
+    last: float = Field(..., description="The value in the most recent period.")
+
+class ProductAggregates(BaseModel):
+    """The aggregate views of one product at one node."""
+    inventory: RollingSummary = Field(..., description="The inventory level at the end of each period.")
+    orders_placed: RollingSummary = Field(..., description="The quantity of new orders the node placed with its supplier in each period.")
+    orders_received: RollingSummary = Field(..., description="The quantity of new orders the node received from its customers in each period.")
+    bullwhip_ratio: Optional[float] = Field(default=None, description="The variance of the orders placed divided by the variance of the orders received, over all periods. Above 1 means the node amplifies demand variability.")
+    rolling_bullwhip_ratio: Optional[float] = Field(default=None, description="The bullwhip ratio over the most recent window of periods.")
+    fill_rate: Optional[float] = Field(default=None, description="The fraction of the received order quantity that has been fulfilled.")
+    on_time_fill_rate: Optional[float] = Field(default=None, description="The fraction of the received order quantity that was fulfilled in the period the order was first recorded.")
+
+class HistoryAggregates(BaseModel):
+    """Materialised aggregate views over the ERP history, per node and product."""
+    window: int = Field(..., description="The number of periods in the rolling window.")
+    num_periods: int = Field(..., description="The number of recorded periods.")
+    last_period: Optional[int] = Field(default=None, description="The most recent recorded period.")
+    nodes: Dict[str, Dict[str, ProductAggregates]] = Field(default_factory=dict, description="The aggregates of each product at each node, keyed by node name and product ID.")
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+class KnowledgeChunk(BaseModel):
+    """Represents a single retrievable section of a markdown document in the knowledge index."""
+    source: str = Field(..., description="The path of the markdown file the chunk was taken from.")
+    heading: str = Field(..., description="The heading path of the section containing the chunk (e.g., 'Project Guide > Setup').")
+    text: str = Field(..., description="The text content of the chunk.")
+
+class KnowledgeMatch(BaseModel):
+    """Represents a chunk returned by a knowledge index query, together with its relevance score."""
+    chunk: KnowledgeChunk = Field(..., description="The matching chunk.")
+    score: float = Field(..., description="The cosine similarity between the query and the chunk.")
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+class LLMRecording(BaseModel):
+    """A single recorded LLM interaction, stored in a cassette file and keyed by the hash of its prompt."""
+    key: str = Field(..., description="The SHA-256 hash of the normalised prompt and requested response model.")
+    model: str = Field(..., description="The name of the model that produced the response.")
+    response_model: Optional[str] = Field(default=None, description="The name of the Pydantic model requested for a structured response, if any.")
+    messages: List[Dict[str, Any]] = Field(..., description="The normalised messages that were sent, kept for inspection.")
+    response: str = Field(..., description="The raw text (or JSON-serialised structured) response of the model.")
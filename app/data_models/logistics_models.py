@@ -0,0 +1,52 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
+from .simulation_models import LeadTimeDistribution
+
+class Lane(BaseModel):
+    """
+    Describes a transport lane between two nodes: how long its vehicles take, how much they carry and what they cost.
+    The shipments created on a lane in the same step are consolidated into as few vehicles as possible.
+    """
+    origin: str = Field(..., description="The node the lane starts from (e.g., 'distributor').")
+    destination: str = Field(..., description="The node the lane delivers to (e.g., 'wholesaler').")
+    transit_time: LeadTimeDistribution = Field(default_factory=lambda: LeadTimeDistribution(value=2), description="The distribution of the transit time, in steps, of each vehicle on the lane.")
+    vehicle_capacity: Optional[int] = Field(default=None, ge=1, description="The number of units one vehicle carries. If unset, one vehicle carries everything shipped on the lane in a step.")
+    cost_per_vehicle: float = Field(default=0.0, ge=0, description="The fixed cost of dispatching one vehicle on the lane.")
+    cost_per_unit: float = Field(default=0.0, ge=0, description="The variable freight cost per unit shipped on the lane.")
+
+class DeliveryLoad(BaseModel):
+    """A quantity to deliver from the depot to one location."""
+    destination: str = Field(..., description="The location the load is delivered to.")
+    quantity: float = Field(..., gt=0, description="The number of units to deliver.")
+    shipment_id: Optional[str] = Field(default=None, description="An optional ID of the shipment the load belongs to.")
+
+class LoadPlanningRequest(BaseModel):
+    """Defines a load building and routing problem: deliver the loads from one depot with capacitated vehicles."""
+    depot: str = Field(..., description="The location every vehicle starts from and returns to (e.g., 'brewery').")
+    coordinates: Dict[str, List[float]] = Field(..., description="The (x, y) coordinates of the depot and of every destination; distances are Euclidean.")
+    loads: List[DeliveryLoad] = Field(..., description="The loads to deliver. Loads for the same destination are consolidated.")
+    vehicle_capacity: float = Field(..., gt=0, description="The number of units one vehicle carries.")
+    max_stops: Optional[int] = Field(default=None, ge=1, description="The maximum number of destinations one vehicle visits. Unlimited if unset.")
+    cost_per_vehicle: float = Field(default=0.0, ge=0, description="The fixed cost of each vehicle used.")
+    cost_per_distance: float = Field(default=1.0, ge=0, description="The cost per unit of distance driven.")
+    method: Literal['savings', 'sweep'] = Field(default='savings', description="The construction heuristic: Clarke-Wright savings or the sweep around the depot.")
+    local_search: bool = Field(default=True, description="If True, the constructed routes are improved with 2-opt and relocate moves.")
+    max_iterations: int = Field(default=100, ge=0, description="The maximum number of local search passes.")
+
+class VehicleRoute(BaseModel):
+    """The route of one vehicle, from the depot through its stops and back."""
+    stops: List[str] = Field(..., description="The destinations in the order they are visited.")
+    quantity: float = Field(..., description="The number of units loaded on the vehicle.")
+    distance: float = Field(..., description="The distance of the round trip.")
+    utilisation: float = Field(..., description="The fraction of the vehicle capacity used.")
+    shipment_ids: List[str] = Field(default_factory=list, description="The IDs of the shipments loaded on the vehicle. A shipment split over several vehicles is listed only on the one that loads its first unit.")
+
+class LoadPlan(BaseModel):
+    """The outcome of load planning: the vehicles used, their routes and the cost."""
+    method: str = Field(..., description="The construction heuristic used.")
+    routes: List[VehicleRoute] = Field(..., description="The route of every vehicle, including the full truckloads sent directly.")
+    vehicles: int = Field(..., description="The number of vehicles used.")
+    full_truckloads: int = Field(..., description="The number of vehicles that carry a full load to a single destination.")
+    total_distance: float = Field(..., description="The total distance driven.")
+    direct_distance: float = Field(..., description="The distance driven if every consolidated load were delivered by its own vehicles, for comparison.")
+    total_cost: float = Field(..., description="The vehicle costs plus the distance costs.")
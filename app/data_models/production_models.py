@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal
+
+class ProductionCapacity(BaseModel):
+    """
+    Describes the finite production capacity of a producing node (e.g., the brewery).
+    Capacity and setup times are both measured in units of output per period.
+    """
+    capacity: float = Field(..., gt=0, description="The number of units the node can produce per period, across all products.")
+    setup_time: float = Field(default=0.0, ge=0, description="The capacity, in units, lost to the setup of each product produced in a period.")
+    batch_size: int = Field(default=1, ge=1, description="Products are produced in whole batches of this many units.")
+    setup_cost: float = Field(default=0.0, ge=0, description="The cost of each setup.")
+
+class ProductionScheduleRequest(BaseModel):
+    """Defines a multi-period, capacity-constrained production scheduling problem for one producing node."""
+    demand: Dict[str, List[float]] = Field(..., description="The quantity of each product required in each period (e.g., {'beer': [20, 25, 40]}).")
+    initial_inventory: Dict[str, float] = Field(default_factory=dict, description="The inventory of each product at the start of the first period.")
+    capacity: ProductionCapacity = Field(..., description="The production capacity, setup times and batch size.")
+    holding_costs: Dict[str, float] = Field(default_factory=dict, description="The holding cost per unit and period of each product. Unlisted products use the default.")
+    backorder_costs: Dict[str, float] = Field(default_factory=dict, description="The backorder cost per unit and period of each product. Unlisted products use the default.")
+    default_holding_cost: float = Field(default=0.5, description="The holding cost of products without an explicit cost.")
+    default_backorder_cost: float = Field(default=1.0, description="The backorder cost of products without an explicit cost.")
+    method: Literal['heuristic', 'milp'] = Field(default='heuristic', description="'heuristic' builds a feasible schedule in milliseconds; 'milp' solves the lot-sizing model exactly with PuLP, within the time limit.")
+    time_limit: float = Field(default=10.0, gt=0, description="The time limit of the MILP solver in seconds.")
+
+class ProductionSchedule(BaseModel):
+    """The outcome of production scheduling: what to produce of each product in each period, and its consequences."""
+    method: str = Field(..., description="The method that produced the schedule.")
+    status: str = Field(..., description="The solver status ('Heuristic', 'Optimal', or the status of a MILP stopped at its time limit).")
+    production: Dict[str, List[float]] = Field(..., description="The quantity of each product produced in each period.")
+    inventory: Dict[str, List[float]] = Field(..., description="The inventory of each product at the end of each period.")
+    backlog: Dict[str, List[float]] = Field(..., description="The unmet requirement of each product at the end of each period.")
+    utilisation: List[float] = Field(..., description="The fraction of the capacity used by production and setups in each period.")
+    setups: int = Field(..., description="The total number of setups.")
+    holding_cost: float = Field(..., description="The total holding cost.")
+    backorder_cost: float = Field(..., description="The total backorder cost.")
+    setup_cost: float = Field(..., description="The total setup cost.")
+    total_cost: float = Field(..., description="The sum of the holding, backorder and setup costs.")
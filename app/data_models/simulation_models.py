@@ -1,6 +1,45 @@
+import numpy as np
 from pydantic import BaseModel, Field
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Literal, Optional
 from .supply_chain_models import SupplyChainStatus
+from .production_models import ProductionCapacity
+from .customer_models import CustomerDemandModel, PricingPlan
+
+# Default per-unit, per-step costs of the Beer Distribution Game.
+DEFAULT_HOLDING_COST = 0.5
+DEFAULT_BACKORDER_COST = 1.0
+# The default cost of a unit of customer demand lost to a stockout (only segmented demand loses sales).
+DEFAULT_LOST_SALE_COST = 2.0
+
+# The default serial chain of the Beer Distribution Game: each node maps to its upstream supplier.
+BEER_GAME_TOPOLOGY = {'retailer': 'wholesaler', 'wholesaler': 'distributor', 'distributor': 'brewery', 'brewery': None}
+
+class DemandDistribution(BaseModel):
+    """
+    Describes the stochastic customer demand per product and step at the most downstream nodes.
+    The default reproduces the Beer Game's uniform demand between 10 and 30 units.
+    """
+    kind: Literal['uniform', 'poisson', 'negative_binomial', 'seasonal', 'empirical', 'segmented'] = Field(default='uniform', description="The family of the demand distribution. 'segmented' draws the demand of customer segments that respond to the pricing plan.")
+    low: int = Field(default=10, description="The smallest demand of the uniform distribution.")
+    high: int = Field(default=30, description="The largest demand of the uniform distribution.")
+    mean: float = Field(default=20.0, description="The mean demand of the Poisson, negative binomial and seasonal distributions.")
+    product_means: Dict[str, float] = Field(default_factory=dict, description="Per-product mean demands that override `mean`.")
+    dispersion: Optional[float] = Field(default=None, description="The negative binomial dispersion: variance = mean + mean^2 / dispersion. Seasonal demand is Poisson if unset.")
+    amplitude: float = Field(default=0.0, description="The relative amplitude of the seasonal cycle (e.g., 0.3 for +/-30%).")
+    period: int = Field(default=52, description="The length of the seasonal cycle in steps.")
+    phase: int = Field(default=0, description="The step at which the seasonal cycle starts rising.")
+    samples: List[float] = Field(default_factory=list, description="The observed demands resampled by the empirical distribution (e.g., from ERP history).")
+    customers: Optional[CustomerDemandModel] = Field(default=None, description="The customer segments of the segmented distribution (e.g., fitted by the Customer Demand Tool).")
+    pricing: PricingPlan = Field(default_factory=PricingPlan, description="The price and promotion decisions the segmented demand responds to.")
+
+class LeadTimeDistribution(BaseModel):
+    """Describes the stochastic lead time, in steps, of every shipment and production order in the simulation."""
+    kind: Literal['fixed', 'uniform', 'poisson', 'empirical'] = Field(default='fixed', description="The family of the lead-time distribution.")
+    value: int = Field(default=1, description="The lead time of the fixed distribution.")
+    low: int = Field(default=1, description="The shortest lead time of the uniform distribution.")
+    high: int = Field(default=3, description="The longest lead time of the uniform distribution.")
+    mean: float = Field(default=1.0, description="The mean extra delay beyond one step of the Poisson distribution.")
+    samples: List[int] = Field(default_factory=list, description="The observed lead times resampled by the empirical distribution.")
 
 class SimulationRequest(BaseModel):
     """
@@ -8,9 +47,46 @@ class SimulationRequest(BaseModel):
     This model structures the request sent to the SupplyChainSimulationTool.
     """
     initial_state: SupplyChainStatus = Field(..., description="The complete starting state of the supply chain for the simulation.")
-    ordering_policy_str: str = Field(..., description="A string containing a Python lambda function that defines the ordering logic to be tested.")
+    ordering_policy_str: str = Field(..., description=(
+        "A string containing a Python lambda function that defines the ordering logic to be tested. "
+        "Either a per-product policy `lambda node_name, current_inventory, demand: ...` returning a number, "
+        "or a product-level policy `lambda node_name, products, inventory, backlog, pipeline, demand: ...` "
+        "receiving numpy arrays over all products and returning an array of order quantities (`np` is available)."
+    ))
     steps: int = Field(default=20, description="The number of time steps the simulation will run for.")
     scenario_name: str = Field(default="Default Scenario", description="A descriptive name for the simulation scenario.")
+    topology: Optional[Dict[str, Optional[str]]] = Field(default=None, description="Maps each node to its upstream supplier (None for the producing node). Defaults to the Beer Game chain.")
+    products: Optional[List[str]] = Field(default=None, description="The products to simulate. Defaults to every product held in the initial state.")
+    holding_costs: Dict[str, float] = Field(default_factory=dict, description="The holding cost per unit and step of each product. Unlisted products use the default.")
+    backorder_costs: Dict[str, float] = Field(default_factory=dict, description="The backorder cost per unit and step of each product. Unlisted products use the default.")
+    default_holding_cost: float = Field(default=DEFAULT_HOLDING_COST, description="The holding cost of products without an explicit cost.")
+    default_backorder_cost: float = Field(default=DEFAULT_BACKORDER_COST, description="The backorder cost of products without an explicit cost.")
+    lost_sale_cost: float = Field(default=DEFAULT_LOST_SALE_COST, description="The cost per unit of customer demand lost to a stockout. Only segmented demand, whose segments may not wait, loses sales.")
+    demand: DemandDistribution = Field(default_factory=DemandDistribution, description="The customer demand distribution.")
+    lead_time: LeadTimeDistribution = Field(default_factory=LeadTimeDistribution, description="The lead-time distribution of shipments and production.")
+    seed: Optional[int] = Field(default=None, description="The random seed of the scenario. Runs are only reproducible when it is set.")
+    common_random_numbers: bool = Field(default=True, description="If True, every scenario with the same seed sees identical demand and lead-time draws, so policies can be compared pairwise. If False, the scenario name is mixed into the seed.")
+    replication: int = Field(default=0, description="The index of the replication, which selects an independent set of draws for the same seed.")
+    record_history: bool = Field(default=True, description="If False, the step-by-step history is not recorded, which speeds up batches of runs that only need the costs.")
+    cost_ceiling: Optional[float] = Field(default=None, description="If set, the run stops as soon as the total cost exceeds this value; its total cost is then a lower bound.")
+    production: Optional[ProductionCapacity] = Field(default=None, description="The finite capacity, setup times and batch size of the producing node. If unset, the producing node produces any quantity at once.")
+
+    def get_topology(self) -> Dict[str, Optional[str]]:
+        """Returns the node-to-upstream mapping, falling back to the Beer Game chain."""
+        return self.topology or dict(BEER_GAME_TOPOLOGY)
+
+    def get_products(self) -> List[str]:
+        """Returns the simulated products, falling back to every product held in the initial state."""
+        if self.products:
+            return list(self.products)
+        products = sorted({p for node in self.initial_state.nodes.values() for p in node.inventory})
+        return products or ['beer']
+
+    def get_cost_vectors(self, products: List[str]) -> tuple:
+        """Returns the holding and backorder costs of the given products as aligned numpy arrays."""
+        holding = np.array([self.holding_costs.get(p, self.default_holding_cost) for p in products], dtype=float)
+        backorder = np.array([self.backorder_costs.get(p, self.default_backorder_cost) for p in products], dtype=float)
+        return holding, backorder
 
     def get_ordering_policy(self) -> Callable:
         """
@@ -23,17 +99,84 @@ class SimulationRequest(BaseModel):
             method for defining and executing policies.
         """
         try:
-            return eval(self.ordering_policy_str)
+            return eval(self.ordering_policy_str, {"np": np})
         except Exception as e:
             raise ValueError(f"Invalid ordering policy lambda: {e}")
 
 class SimulationStepResult(BaseModel):
     """Data model for the state of the simulation at a single time step."""
     step: int = Field(..., description="The time step number.")
-    nodes: Dict[str, Dict[str, float]] = Field(..., description="A dictionary summarizing the state (e.g., inventory, cost) of each node at this step.")
+    nodes: Dict[str, Dict[str, float]] = Field(..., description="A dictionary summarizing the state (e.g., inventory, backlog, cost) of each node at this step, summed over all products.")
 
 class SimulationResults(BaseModel):
     """Data model for the final, aggregated results of a simulation run."""
     total_cost: float
     stockout_events: int
-    history: List[SimulationStepResult]
\ No newline at end of file
+    history: List[SimulationStepResult]
+    product_costs: Dict[str, float] = Field(default_factory=dict, description="The total cost of each product across all nodes.")
+    steps_completed: int = Field(default=0, description="The number of steps that were simulated.")
+    terminated_early: bool = Field(default=False, description="True if the run stopped before the last step because its cost exceeded the cost ceiling.")
+    production_utilisation: Optional[float] = Field(default=None, description="The mean fraction of the production capacity used by production and setups, if the capacity was finite.")
+    lost_sales: float = Field(default=0.0, description="The customer demand lost to stockouts, summed over all products.")
+
+class PolicySearchRequest(SimulationRequest):
+    """
+    Defines a simulation-based search for the parameters of an ordering policy family.
+    It holds the same scenario fields as a SimulationRequest; the policy itself is generated by the search.
+    """
+    ordering_policy_str: str = Field(default="", description="Ignored; the ordering policy is generated from the searched parameters.")
+    policy_family: Literal['base_stock', 's_S', 'R_Q'] = Field(default='base_stock', description="The policy family: base-stock level S, (s, S) reorder point and order-up-to level, or (R, Q) reorder point and order quantity, per node.")
+    method: Literal['coordinate', 'spsa'] = Field(default='coordinate', description="The search method: coordinate search or simultaneous perturbation stochastic approximation (SPSA).")
+    initial_parameters: Dict[str, List[float]] = Field(default_factory=dict, description="Optional starting parameters per node (e.g., {'retailer': [40, 80]} for (s, S)). Defaults are derived from the mean demand.")
+    replications: int = Field(default=8, description="The number of replications, with common random numbers, used to evaluate each candidate.")
+    budget: int = Field(default=400, description="The maximum number of simulation runs spent on the search.")
+    validation_replications: int = Field(default=30, description="The number of fresh replications used to estimate the confidence intervals of the best policy.")
+    confidence: float = Field(default=0.95, description="The confidence level of the reported intervals.")
+    seed: Optional[int] = Field(default=0, description="The random seed of the search. Candidates are compared on common random numbers derived from it.")
+
+class PolicySearchResult(BaseModel):
+    """Data model for the outcome of a policy parameter search."""
+    policy_family: str = Field(..., description="The searched policy family.")
+    parameters: Dict[str, Dict[str, float]] = Field(..., description="The best parameters per node (e.g., {'retailer': {'s': 40, 'S': 85}}).")
+    ordering_policy_str: str = Field(..., description="The best policy as a lambda string that can be passed to the simulation tool.")
+    mean_cost: float = Field(..., description="The mean total cost of the best policy over the validation replications.")
+    cost_interval: List[float] = Field(..., description="The confidence interval [low, high] of the mean total cost of the best policy.")
+    baseline_cost: float = Field(..., description="The mean total cost of the starting parameters over the same validation replications.")
+    improvement_interval: List[float] = Field(..., description="The paired confidence interval [low, high] of the cost reduction relative to the starting parameters.")
+    evaluations: int = Field(..., description="The number of simulation runs spent on the search, excluding validation.")
+    trajectory: List[float] = Field(default_factory=list, description="The best mean search cost after each iteration.")
+
+class PolicyComparisonRequest(SimulationRequest):
+    """
+    Defines an adaptive comparison of several ordering policies on the same scenario.
+    It holds the same scenario fields as a SimulationRequest; the policies to compare replace the single policy.
+    """
+    ordering_policy_str: str = Field(default="", description="Ignored; the compared policies are given in `policies`.")
+    policies: Dict[str, str] = Field(..., description="The policies to compare, by name (e.g., {'JIT': 'lambda ...', 'Safety Stock': 'lambda ...'}).")
+    elimination: Literal['racing', 'successive_halving'] = Field(default='racing', description="Racing drops a policy once it is significantly worse than the leader; successive halving keeps the better half of the policies each round.")
+    initial_replications: int = Field(default=5, description="The number of replications of every policy before the first elimination.")
+    batch_size: int = Field(default=5, description="The number of replications added to every remaining policy per racing round.")
+    max_replications: int = Field(default=100, description="The maximum number of replications of any single policy.")
+    relative_precision: float = Field(default=0.02, description="The comparison stops when the confidence interval of every cost difference to the leader is narrower than this fraction of the leader's cost.")
+    confidence: float = Field(default=0.95, description="The confidence level of the reported intervals and of the elimination tests.")
+    cost_ceiling_factor: Optional[float] = Field(default=2.0, description="Runs of policies other than the leader stop once their cost exceeds this multiple of the leader's mean cost. None disables early termination.")
+    seed: Optional[int] = Field(default=0, description="The random seed. All policies are compared on common random numbers derived from it.")
+
+class PolicyComparisonEntry(BaseModel):
+    """Data model for the outcome of a single policy in a comparison."""
+    mean_cost: float = Field(..., description="The mean total cost over the policy's replications; a lower bound if some runs were stopped at the cost ceiling.")
+    cost_interval: List[float] = Field(..., description="The confidence interval [low, high] of the mean total cost.")
+    difference_interval: List[float] = Field(..., description="The paired confidence interval [low, high] of the cost difference to the best policy (0 for the best policy).")
+    replications: int = Field(..., description="The number of replications run for this policy.")
+    terminated_runs: int = Field(default=0, description="The number of runs stopped early at the cost ceiling.")
+    eliminated_in_round: Optional[int] = Field(default=None, description="The round in which the policy was eliminated, or None if it survived.")
+
+class PolicyComparisonResult(BaseModel):
+    """Data model for the outcome of an adaptive policy comparison."""
+    best_policy: str = Field(..., description="The name of the policy with the lowest mean cost among the survivors.")
+    ordering_policy_str: str = Field(..., description="The best policy as a lambda string that can be passed to the simulation tool.")
+    policies: Dict[str, PolicyComparisonEntry] = Field(..., description="The outcome of every compared policy, by name.")
+    rounds: int = Field(..., description="The number of comparison rounds.")
+    total_runs: int = Field(..., description="The total number of simulation runs.")
+    simulated_steps: int = Field(..., description="The total number of simulated steps across all runs.")
+    converged: bool = Field(..., description="True if the comparison stopped because the intervals reached the requested precision or a single policy remained.")
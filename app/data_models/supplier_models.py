@@ -0,0 +1,61 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from .erp_models import Supplier
+
+class SupplierCandidate(Supplier):
+    """
+    A supplier of one product as seen by the scoring and allocation engine: its ERP master data plus
+    its capacity and the latest disruption signals for its location.
+    """
+    product_id: str = Field(default='beer', description="The product the supplier offers.")
+    capacity: Optional[float] = Field(default=None, ge=0, description="The maximum quantity the supplier can deliver. Unlimited if unset.")
+    risk: Optional[float] = Field(default=None, ge=0, le=1, description="An explicit disruption risk between 0 and 1. If unset, it is derived from the weather forecast and news headlines.")
+    weather_forecast: Optional[str] = Field(default=None, description="The latest forecast for the supplier's location from the weather feed (e.g., 'Heavy Rain').")
+    news_headlines: List[str] = Field(default_factory=list, description="The latest headlines from the news feed that concern the supplier.")
+
+class ScoreWeights(BaseModel):
+    """The weights of the scoring criteria; they are normalised to sum to one."""
+    price: float = Field(default=0.35, ge=0, description="The weight of a low price.")
+    reliability: float = Field(default=0.35, ge=0, description="The weight of a high reliability score.")
+    lead_time: float = Field(default=0.15, ge=0, description="The weight of a short lead time.")
+    risk: float = Field(default=0.15, ge=0, description="The weight of a low disruption risk.")
+
+class SourcingRequest(BaseModel):
+    """Defines the scoring of a set of suppliers and, optionally, the split-sourcing allocation of the demand for their products."""
+    suppliers: List[SupplierCandidate] = Field(..., description="The candidate suppliers of all products.")
+    demand: Dict[str, float] = Field(default_factory=dict, description="The quantity to source per product. If empty, the suppliers are only scored.")
+    weights: ScoreWeights = Field(default_factory=ScoreWeights, description="The weights of the scoring criteria.")
+    max_share: float = Field(default=0.7, gt=0, le=1, description="The largest share of a product's demand allocated to a single supplier.")
+    min_score: float = Field(default=0.0, ge=0, le=1, description="Suppliers scoring below this are not allocated any quantity.")
+    reliability_penalty: float = Field(default=5.0, ge=0, description="The expected cost per unit of a supplier's unreliability, charged as (1 - reliability_score) times this.")
+    lead_time_cost: float = Field(default=0.1, ge=0, description="The cost per unit and step of lead time.")
+    risk_penalty: float = Field(default=5.0, ge=0, description="The expected cost per unit of a disruption risk of 1.")
+    default_lead_time: int = Field(default=7, ge=0, description="The lead time of suppliers without a known lead time.")
+
+class SupplierScore(BaseModel):
+    """The multi-criteria score of one supplier, relative to the other suppliers of the same product."""
+    name: str = Field(..., description="The name of the supplier.")
+    product_id: str = Field(..., description="The product the supplier offers.")
+    score: float = Field(..., description="The weighted score between 0 (worst) and 1 (best).")
+    rank: int = Field(..., description="The rank among the suppliers of the product, 1 being the best.")
+    price_score: float = Field(..., description="1 for the cheapest supplier of the product, 0 for the most expensive.")
+    lead_time_score: float = Field(..., description="1 for the fastest supplier of the product, 0 for the slowest.")
+    reliability_score: float = Field(..., description="The supplier's reliability score.")
+    risk: float = Field(..., description="The disruption risk used for the score.")
+    unit_cost: float = Field(..., description="The risk-adjusted cost per unit used by the allocation.")
+
+class SupplierAllocation(BaseModel):
+    """The quantity of a product allocated to one supplier."""
+    name: str = Field(..., description="The name of the supplier.")
+    product_id: str = Field(..., description="The allocated product.")
+    quantity: float = Field(..., description="The allocated quantity.")
+    share: float = Field(..., description="The allocated share of the product's demand.")
+    unit_cost: float = Field(..., description="The risk-adjusted cost per unit.")
+
+class SourcingPlan(BaseModel):
+    """The outcome of supplier scoring and allocation."""
+    scores: List[SupplierScore] = Field(..., description="The score of every supplier, ordered by product and rank.")
+    allocations: List[SupplierAllocation] = Field(default_factory=list, description="The suppliers with a positive allocation, ordered by product and quantity.")
+    status: str = Field(default="Not solved", description="The status of the allocation LP, or 'Not solved' if no demand was given.")
+    total_cost: float = Field(default=0.0, description="The total risk-adjusted cost of the allocation.")
+    unmet_demand: Dict[str, float] = Field(default_factory=dict, description="The demand per product that the eligible suppliers cannot cover within their capacities and the share limit.")
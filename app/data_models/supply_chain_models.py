@@ -1,25 +1,26 @@
 from pydantic import BaseModel, Field
-from typing import Optional
-import uuid
+from typing import Callable, Dict, List, Literal, Optional
+import numpy as np
+from app.utils.identifiers import ORDER_IDS, SHIPMENT_IDS
 
 class Order(BaseModel):
     """
     Represents a purchase order between two nodes in the supply chain.
     Each order is given a unique ID upon creation.
     """
-    order_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique identifier for the order.")
+    order_id: str = Field(default_factory=ORDER_IDS.next_uuid, description="Unique identifier for the order, in UUID format.")
     product_id: str = Field(..., description="The unique identifier of the product being ordered.")
     quantity: int = Field(..., description="The number of units being ordered.")
     source_node: str = Field(..., description="The name of the node that will fulfill the order (e.g., 'wholesaler').")
     destination_node: str = Field(..., description="The name of the node that is placing the order (e.g., 'retailer').")
-    status: str = Field(default="PENDING", description="The current status of the order (e.g., PENDING, FULFILLED).")
+    status: str = Field(default="PENDING", description="The current status of the order (e.g., PENDING, FULFILLED, CANCELLED).")
 
 class Shipment(BaseModel):
     """
     Represents a physical shipment of goods in transit between two nodes.
     Each shipment is created to fulfill a specific order.
     """
-    shipment_id: str = Field(default_factory=lambda: str(uuid.uuid4()), description="Unique identifier for the shipment.")
+    shipment_id: str = Field(default_factory=SHIPMENT_IDS.next_uuid, description="Unique identifier for the shipment, in UUID format.")
     order_id: str = Field(..., description="The ID of the order that this shipment is fulfilling.")
     product_id: str = Field(..., description="The unique identifier of the product in the shipment.")
     quantity: int = Field(..., description="The number of units in the shipment.")
@@ -44,4 +45,73 @@ class SupplyChainStatus(BaseModel):
     """
     current_step: int = Field(..., description="The simulation time step at which this status was recorded.")
     nodes: dict[str, SupplyChainNodeStatus] = Field(..., description="A dictionary of all nodes in the supply chain, keyed by their unique names.")
-    shipments_in_transit: list[Shipment] = Field(..., description="A list of all shipments currently in transit between nodes.")
\ No newline at end of file
+    shipments_in_transit: list[Shipment] = Field(..., description="A list of all shipments currently in transit between nodes.")
+
+class OrderOperation(BaseModel):
+    """A single operation of an order batch: placing a new order, or cancelling or amending a pending one."""
+    action: Literal['place', 'cancel', 'amend'] = Field(..., description="The operation to perform.")
+    order: Optional[Order] = Field(default=None, description="The order to place (required for 'place').")
+    order_id: Optional[str] = Field(default=None, description="The ID of the pending order to cancel or amend (required for 'cancel' and 'amend').")
+    quantity: Optional[int] = Field(default=None, description="The new quantity of the amended order (required for 'amend').")
+
+class OrderBatch(BaseModel):
+    """A batch of order operations that is validated in one pass and applied in one call."""
+    operations: List[OrderOperation] = Field(..., description="The operations, applied in the given order.")
+    atomic: bool = Field(default=True, description="If True, no operation is applied when any operation is invalid; if False, the valid operations are applied and the invalid ones are reported.")
+
+class RejectedOperation(BaseModel):
+    """An operation of a batch that failed validation."""
+    index: int = Field(..., description="The position of the operation in the batch.")
+    action: str = Field(..., description="The operation that was rejected.")
+    reason: str = Field(..., description="Why the operation was rejected.")
+
+class OrderBatchResult(BaseModel):
+    """The compact outcome of an order batch."""
+    applied: int = Field(..., description="The number of operations applied.")
+    rejected: List[RejectedOperation] = Field(default_factory=list, description="The operations that failed validation.")
+    placed_order_ids: List[str] = Field(default_factory=list, description="The IDs of the newly placed orders, in batch order.")
+    pending_quantities: Dict[str, Dict[str, int]] = Field(default_factory=dict, description="The total quantity of each product that each node has on order and that is still pending after the batch.")
+
+class TwinAdvanceRequest(BaseModel):
+    """A request to advance the Digital Twin by several steps in one call."""
+    n_steps: int = Field(default=1, ge=1, le=520, description="The maximum number of steps to advance.")
+    until: Optional[str] = Field(default=None, description="An optional stopping condition as a Python lambda string, evaluated after each step with any of the arguments 'step', 'inventory', 'backlog' and 'pipeline' (each a dict of node name to a dict of product to quantity), e.g. \"lambda inventory: inventory['retailer']['beer'] < 50\".")
+    ordering_policy_str: Optional[str] = Field(default=None, description="An optional standing ordering policy as a Python lambda string, applied to every node with a supplier before each step. It is called per node and product with any of the arguments 'node_name', 'product_id', 'inventory', 'pipeline' and 'backlog', and returns the quantity to order, e.g. \"lambda node_name, inventory, pipeline, backlog: max(0, 120 - (inventory + pipeline - backlog))\".")
+
+    def get_condition(self) -> Optional[Callable]:
+        """Evaluates the stopping condition string, if any, and returns it as a callable."""
+        return _evaluate_lambda(self.until, "stopping condition")
+
+    def get_ordering_policy(self) -> Optional[Callable]:
+        """Evaluates the ordering policy string, if any, and returns it as a callable."""
+        return _evaluate_lambda(self.ordering_policy_str, "ordering policy")
+
+class TwinStepSummary(BaseModel):
+    """The state of the Digital Twin after one step, summed over all products."""
+    step: int = Field(..., description="The step number.")
+    inventory: Dict[str, int] = Field(..., description="The on-hand inventory of each node.")
+    backlog: Dict[str, int] = Field(..., description="The pending quantity ordered from each node and not yet shipped.")
+    pipeline: Dict[str, int] = Field(..., description="The quantity each node has on order or in transit towards it.")
+    orders_placed: int = Field(default=0, description="The number of orders placed by the standing ordering policy before this step.")
+
+class TwinAdvanceResult(BaseModel):
+    """The outcome of advancing the Digital Twin by several steps."""
+    start_step: int = Field(..., description="The step of the twin before advancing.")
+    end_step: int = Field(..., description="The step of the twin after advancing.")
+    condition_met: bool = Field(default=False, description="Whether the stopping condition was met, ending the advance.")
+    orders_placed: int = Field(default=0, description="The total number of orders placed by the standing ordering policy.")
+    trajectory: List[TwinStepSummary] = Field(default_factory=list, description="A summary of the twin after each step.")
+
+def _evaluate_lambda(source: Optional[str], kind: str) -> Optional[Callable]:
+    """
+    Evaluates a lambda string with numpy available as `np`.
+
+    Warning:
+        Using `eval` is a security risk in a production environment; see SimulationRequest.get_ordering_policy.
+    """
+    if source is None:
+        return None
+    try:
+        return eval(source, {"np": np})
+    except Exception as e:
+        raise ValueError(f"Invalid {kind} lambda: {e}")
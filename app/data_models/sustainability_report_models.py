@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Literal
+from typing import List, Literal, Optional
 
 class CheckResult(BaseModel):
     """Data model for a single sustainability or compliance check."""
@@ -22,4 +22,28 @@ class SustainabilityReport(BaseModel):
     """The final, structured output for the sustainability and compliance evaluation."""
     sustainability_check: EvaluationSection = Field(..., description="The results of the sustainability evaluation.")
     compliance_check: EvaluationSection = Field(..., description="The results of the compliance evaluation.")
-    recommendation: Recommendation = Field(..., description="The final recommendation.")
\ No newline at end of file
+    recommendation: Recommendation = Field(..., description="The final recommendation.")
+
+class GuideRule(BaseModel):
+    """Data model for a single rule or regulation parsed from the sustainability guide."""
+    rule_id: str = Field(..., description="The identifier of the rule as written in the guide (e.g., 'Rule 1.3').")
+    name: str = Field(..., description="The short name of the rule (e.g., 'Ethical Sourcing').")
+    text: str = Field(..., description="The full text of the rule.")
+    section: Literal['sustainability', 'compliance'] = Field(..., description="The report section the rule belongs to.")
+
+class ListedSupplier(BaseModel):
+    """Data model for an entry of the guide's Ethical Suppliers List."""
+    name: str = Field(..., description="The name of the supplier.")
+    location: str = Field(default="", description="The country or region where the supplier is based.")
+    status: str = Field(default="", description="The vetting status of the supplier (e.g., 'Approved').")
+    notes: str = Field(default="", description="Free-text audit notes about the supplier.")
+
+class ProposedAction(BaseModel):
+    """Data model for the structured facts extracted from a free-text proposed action."""
+    text: str = Field(..., description="The original proposed action.")
+    is_sourcing: bool = Field(default=False, description="Whether the action sources goods from a supplier.")
+    supplier: Optional[str] = Field(default=None, description="The name of the supplier mentioned in the action, if any.")
+    product: Optional[str] = Field(default=None, description="The product mentioned in the action, if any.")
+    quantity: Optional[int] = Field(default=None, description="The quantity mentioned in the action, if any.")
+    location: Optional[str] = Field(default=None, description="The location mentioned in the action, if any.")
+    transport_mode: Optional[str] = Field(default=None, description="The transport mode mentioned in the action, if any.")
@@ -1,9 +1,19 @@
 from .digital_twin import DigitalTwin
 from .supply_chain_node import SupplyChainNode
+from .checkpoint import TwinCheckpointer
+from .events import EventLog, TwinReplayer
+from .records import OrderRecord, ShipmentRecord
+from .logistics import LaneNetwork
 
 __all__ = [
     "DigitalTwin",
     "SupplyChainNode",
+    "TwinCheckpointer",
+    "EventLog",
+    "TwinReplayer",
+    "OrderRecord",
+    "ShipmentRecord",
+    "LaneNetwork",
     "Order",
     "Shipment"
 ]
\ No newline at end of file
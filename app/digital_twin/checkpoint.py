@@ -0,0 +1,298 @@
+import glob
+import os
+import pickle
+import struct
+import zlib
+from typing import Dict, List, Optional, Tuple
+from app.data_models.logistics_models import Lane
+from app.data_models.production_models import ProductionCapacity
+from app.digital_twin.records import (
+    OrderRecord, ShipmentRecord, order_key, shipment_key, render_order_id, render_shipment_id
+)
+from app.utils.identifiers import NODE_NAMES, PRODUCT_NAMES
+
+# Checkpoints are zlib-compressed pickles of plain tuples, prefixed with a magic header and a format version.
+CHECKPOINT_MAGIC = b"DTCK"
+CHECKPOINT_VERSION = 3
+# Older checkpoints are still read: version 1 has no production capacities, version 2 no lanes.
+SUPPORTED_VERSIONS = (1, 2, 3)
+HEADER = struct.Struct("<4sH")
+# Each journal record is prefixed with its length so a torn final write can be detected and ignored.
+RECORD_LENGTH = struct.Struct("<I")
+
+def append_record(path: str, record: tuple):
+    """Appends a length-prefixed, pickled record to an append-only log file."""
+    data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+    with open(path, 'ab') as f:
+        f.write(RECORD_LENGTH.pack(len(data)) + data)
+
+def read_records(path: str) -> List[tuple]:
+    """Reads all complete records from an append-only log file, ignoring a torn final record."""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'rb') as f:
+        data = f.read()
+    records, offset = [], 0
+    while offset + RECORD_LENGTH.size <= len(data):
+        (length,) = RECORD_LENGTH.unpack_from(data, offset)
+        start = offset + RECORD_LENGTH.size
+        if start + length > len(data):
+            break
+        records.append(pickle.loads(data[start:start + length]))
+        offset = start + length
+    return records
+
+# Persisted records hold rendered IDs, because internal integer IDs are only meaningful within the process that generated them.
+
+def _order_to_tuple(order: OrderRecord) -> tuple:
+    return (render_order_id(order.order_id), order.product_id, order.quantity, order.source_node, order.destination_node, order.status)
+
+def _order_from_tuple(values: tuple) -> OrderRecord:
+    order_id, product_id, quantity, source_node, destination_node, status = values
+    # Names are interned, so that restored orders share them like live ones instead of each holding unpickled copies.
+    return OrderRecord(order_key(order_id), PRODUCT_NAMES.canonical(product_id), quantity,
+                       NODE_NAMES.canonical(source_node), NODE_NAMES.canonical(destination_node), status)
+
+def _shipment_to_tuple(shipment: ShipmentRecord) -> tuple:
+    return (render_shipment_id(shipment.shipment_id), render_order_id(shipment.order_id), shipment.product_id, shipment.quantity,
+            shipment.source_node, shipment.destination_node, shipment.eta)
+
+def _shipment_from_tuple(values: tuple) -> ShipmentRecord:
+    shipment_id, order_id, product_id, quantity, source_node, destination_node, eta = values
+    return ShipmentRecord(shipment_key(shipment_id), order_key(order_id), PRODUCT_NAMES.canonical(product_id), quantity,
+                          NODE_NAMES.canonical(source_node), NODE_NAMES.canonical(destination_node), eta)
+
+def encode_state(twin) -> bytes:
+    """
+    Encodes the complete state of a Digital Twin into a compact binary checkpoint.
+
+    Orders are stored once in an order table and referenced by index from the nodes, because
+    the same order record is shared between the ordering node and its upstream supplier.
+
+    Args:
+        twin: The DigitalTwin whose state is encoded.
+
+    Returns:
+        The encoded checkpoint.
+    """
+    order_index: Dict[int, int] = {}
+    orders: List[tuple] = []
+
+    def ref(order: OrderRecord) -> int:
+        if id(order) not in order_index:
+            order_index[id(order)] = len(orders)
+            orders.append(_order_to_tuple(order))
+        return order_index[id(order)]
+
+    nodes = []
+    for node in twin.nodes.values():
+        nodes.append((
+            node.name,
+            node.node_type,
+            dict(node.inventory),
+            [ref(o) for o in node.incoming_orders],
+            [ref(o) for o in node.outgoing_orders],
+            [_shipment_to_tuple(s) for s in node.incoming_shipments],
+            node.upstream_node.name if node.upstream_node else None,
+            node.downstream_node.name if node.downstream_node else None,
+            node.production.model_dump() if node.production else None,
+        ))
+    logistics = twin.logistics
+    lanes = ([lane.model_dump() for lane in logistics.lanes.values()], logistics.vehicles_dispatched, logistics.freight_cost)
+    state = (twin.current_step, nodes, orders, [_shipment_to_tuple(s) for s in twin.shipments_in_transit], lanes)
+    payload = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    return HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION) + payload
+
+def decode_state(twin, data: bytes):
+    """
+    Restores the state of a Digital Twin in place from a binary checkpoint.
+
+    Args:
+        twin: The DigitalTwin to restore into. Its current state is replaced.
+        data: A checkpoint produced by `encode_state`.
+
+    Raises:
+        ValueError: If the data is not a checkpoint of a supported version.
+    """
+    # Late import to prevent circular dependency
+    from app.digital_twin.supply_chain_node import SupplyChainNode
+    from app.digital_twin.logistics import LaneNetwork
+
+    magic, version = HEADER.unpack_from(data)
+    if magic != CHECKPOINT_MAGIC or version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Unsupported checkpoint format (magic={magic!r}, version={version}).")
+    current_step, nodes, orders, shipments, *logistics = pickle.loads(zlib.decompress(data[HEADER.size:]))
+
+    order_objects = [_order_from_tuple(o) for o in orders]
+    twin.nodes = {}
+    links: List[Tuple[str, Optional[str], Optional[str]]] = []
+    for name, node_type, inventory, incoming, outgoing, incoming_shipments, upstream, downstream, *production in nodes:
+        node = SupplyChainNode(name=name, node_type=node_type, initial_inventory=inventory)
+        node.production = ProductionCapacity(**production[0]) if production and production[0] else None
+        node.incoming_orders = [order_objects[i] for i in incoming]
+        node.outgoing_orders = [order_objects[i] for i in outgoing]
+        node.incoming_shipments = [_shipment_from_tuple(s) for s in incoming_shipments]
+        twin.nodes[name] = node
+        links.append((name, upstream, downstream))
+    for name, upstream, downstream in links:
+        twin.nodes[name].upstream_node = twin.nodes.get(upstream) if upstream else None
+        twin.nodes[name].downstream_node = twin.nodes.get(downstream) if downstream else None
+
+    twin.logistics = LaneNetwork()
+    if logistics:
+        lanes, twin.logistics.vehicles_dispatched, twin.logistics.freight_cost = logistics[0]
+        for lane in lanes:
+            twin.logistics.set_lane(Lane(**lane))
+
+    twin.shipments_in_transit = [_shipment_from_tuple(s) for s in shipments]
+    twin.current_step = current_step
+
+class TwinCheckpointer:
+    """
+    Persists a Digital Twin as periodic binary snapshots plus an append-only journal.
+
+    Every mutating operation (placing, cancelling or amending an order, configuring production or a lane, advancing a step)
+    is appended to the journal.
+    A new snapshot is written every `snapshot_every` steps, after which the journal restarts.
+    Restoring loads the latest snapshot and replays the journal written since.
+    """
+
+    SNAPSHOT_PATTERN = "snapshot-{step:08d}.bin"
+    JOURNAL_NAME = "journal.bin"
+
+    def __init__(self, directory: str, snapshot_every: int = 10, keep_snapshots: int = 3):
+        """
+        Initializes the checkpointer.
+
+        Args:
+            directory: The directory in which snapshots and the journal are stored.
+            snapshot_every: The number of steps between automatic snapshots (0 disables them).
+            keep_snapshots: The number of most recent snapshots to keep on disk.
+        """
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.keep_snapshots = keep_snapshots
+        self._replaying = False
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def journal_path(self) -> str:
+        return os.path.join(self.directory, self.JOURNAL_NAME)
+
+    def snapshot(self, twin) -> str:
+        """
+        Writes a snapshot of the twin's state and starts a new, empty journal.
+
+        Args:
+            twin: The DigitalTwin to snapshot.
+
+        Returns:
+            The path of the written snapshot.
+        """
+        path = os.path.join(self.directory, self.SNAPSHOT_PATTERN.format(step=twin.current_step))
+        # Write to a temporary file first so that a crash never leaves a partial snapshot behind.
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(encode_state(twin))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        open(self.journal_path, 'wb').close()
+
+        for old in self._snapshots()[:-self.keep_snapshots]:
+            os.remove(old)
+        return path
+
+    def record_order(self, twin, order: OrderRecord):
+        """Appends a placed order to the journal."""
+        self._append(('place_order', _order_to_tuple(order)))
+
+    def record_cancel(self, twin, order_id: str):
+        """Appends a cancelled order to the journal."""
+        self._append(('cancel_order', order_id))
+
+    def record_amend(self, twin, order_id: str, quantity: int):
+        """Appends an amended order to the journal."""
+        self._append(('amend_order', (order_id, quantity)))
+
+    def record_production(self, twin, node_name: str, capacity: Optional[ProductionCapacity]):
+        """Appends a changed production capacity to the journal."""
+        self._append(('configure_production', (node_name, capacity.model_dump() if capacity else None)))
+
+    def record_lane(self, twin, lane: Lane):
+        """Appends a configured lane to the journal."""
+        self._append(('configure_lane', lane.model_dump()))
+
+    def record_step(self, twin, new_shipments: List[ShipmentRecord]):
+        """
+        Appends a simulation step to the journal and takes an automatic snapshot when one is due.
+        The IDs and ETAs of the shipments created during the step are journaled so that replay reproduces them
+        exactly, including transit times drawn on the twin's lanes.
+        """
+        if self._replaying:
+            return
+        self._append(('step', [(render_shipment_id(s.shipment_id), s.eta) for s in new_shipments]))
+        if self.snapshot_every and twin.current_step % self.snapshot_every == 0:
+            self.snapshot(twin)
+
+    def restore(self, twin) -> int:
+        """
+        Restores a twin from the latest snapshot and replays the journal on top of it.
+
+        Args:
+            twin: The DigitalTwin to restore into.
+
+        Returns:
+            The number of journal records replayed.
+
+        Raises:
+            FileNotFoundError: If no snapshot exists in the checkpoint directory.
+        """
+        snapshots = self._snapshots()
+        if not snapshots:
+            raise FileNotFoundError(f"No snapshot found in '{self.directory}'.")
+        with open(snapshots[-1], 'rb') as f:
+            decode_state(twin, f.read())
+
+        records = self._read_journal()
+        self._replaying = True
+        try:
+            for op, payload in records:
+                if op == 'place_order':
+                    order = _order_from_tuple(payload)
+                    twin._place_order(twin.nodes[order.destination_node], order)
+                elif op == 'cancel_order':
+                    twin.cancel_order(payload)
+                elif op == 'amend_order':
+                    twin.amend_order(*payload)
+                elif op == 'configure_production':
+                    name, capacity = payload
+                    twin.configure_production(name, ProductionCapacity(**capacity) if capacity else None)
+                elif op == 'configure_lane':
+                    twin.configure_lane(Lane(**payload))
+                elif op == 'step':
+                    # Shipments created by the step are appended in a deterministic order; give them their original IDs and ETAs.
+                    in_transit = {id(s) for s in twin.shipments_in_transit}
+                    twin.step()
+                    new_shipments = [s for s in twin.shipments_in_transit if id(s) not in in_transit]
+                    for shipment, entry in zip(new_shipments, payload):
+                        # Journals written before lanes existed hold only the IDs.
+                        shipment_id, eta = entry if isinstance(entry, tuple) else (entry, shipment.eta)
+                        shipment.shipment_id = shipment_key(shipment_id)
+                        shipment.eta = eta
+        finally:
+            self._replaying = False
+        return len(records)
+
+    def _append(self, record: tuple):
+        """Appends a record to the journal, unless the journal itself is being replayed."""
+        if not self._replaying:
+            append_record(self.journal_path, record)
+
+    def _read_journal(self) -> List[tuple]:
+        """Reads all complete records from the journal."""
+        return read_records(self.journal_path)
+
+    def _snapshots(self) -> List[str]:
+        """Returns the paths of all snapshots, ordered from oldest to newest."""
+        return sorted(glob.glob(os.path.join(self.directory, "snapshot-*.bin")))
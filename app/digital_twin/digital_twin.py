@@ -1,6 +1,32 @@
-from typing import List, Dict
+import inspect
+from typing import Callable, List, Dict, Optional, Tuple
+from app.digital_twin.records import OrderRecord, ShipmentRecord, RecordId, order_key, render_order_id, render_shipment_id
 from app.digital_twin.supply_chain_node import SupplyChainNode
-from app.data_models.supply_chain_models import Order, Shipment, SupplyChainNodeStatus, SupplyChainStatus
+from app.digital_twin.checkpoint import TwinCheckpointer
+from app.digital_twin.events import (
+    EventLog, StepAdvanced, OrderPlaced, OrderFulfilled, ShipmentCreated, ShipmentArrived, OrderCancelled, OrderAmended,
+    ProductionCompleted, VehiclesDispatched, ProductionConfigured, LaneConfigured
+)
+from app.digital_twin.logistics import LaneNetwork
+from app.data_models.supply_chain_models import (
+    Order, SupplyChainNodeStatus, SupplyChainStatus, OrderOperation, OrderBatch, OrderBatchResult, RejectedOperation,
+    TwinStepSummary, TwinAdvanceResult
+)
+from app.data_models.logistics_models import Lane
+from app.data_models.production_models import ProductionCapacity
+from app.optimizations.production_scheduling import max_batch_quantity
+from app.utils.identifiers import ORDER_IDS, NODE_NAMES
+from app.utils.logging_utils import get_logger, quiet
+from app.utils.metrics import timed
+
+logger = get_logger("digital_twin")
+
+# The arguments a standing ordering policy and a stopping condition of `DigitalTwin.advance` may accept.
+POLICY_ARGUMENTS = ('node_name', 'product_id', 'inventory', 'pipeline', 'backlog')
+CONDITION_ARGUMENTS = ('step', 'inventory', 'backlog', 'pipeline')
+
+# Quantities per node and product, e.g. {'retailer': {'beer': 100}}.
+Positions = Dict[str, Dict[str, int]]
 
 class SingletonMeta(type):
     """A metaclass that implements the Singleton design pattern."""
@@ -23,10 +49,48 @@ class DigitalTwin(metaclass=SingletonMeta):
     def __init__(self):
         """Initializes the Digital Twin, setting up the supply chain nodes and initial state."""
         self.nodes: Dict[str, SupplyChainNode] = {}
-        self.shipments_in_transit: List[Shipment] = []
+        self.shipments_in_transit: List[ShipmentRecord] = []
+        self.logistics = LaneNetwork()
         self.current_step: int = 0
+        self.checkpointer: Optional[TwinCheckpointer] = None
+        self.event_log: Optional[EventLog] = None
         self._initialize_supply_chain()
 
+    @classmethod
+    def detached(cls) -> 'DigitalTwin':
+        """
+        Creates an independent Digital Twin that is not the shared singleton instance.
+        This is used for restoring checkpoints or running scenarios without touching the live twin.
+        """
+        instance = cls.__new__(cls)
+        instance.__init__()
+        return instance
+
+    def attach_checkpointer(self, checkpointer: TwinCheckpointer, snapshot_now: bool = True):
+        """
+        Attaches a checkpointer that journals every state change and takes periodic snapshots.
+
+        Args:
+            checkpointer: The TwinCheckpointer to attach.
+            snapshot_now: Whether to take an initial snapshot of the current state.
+        """
+        self.checkpointer = checkpointer
+        if snapshot_now:
+            checkpointer.snapshot(self)
+
+    def attach_event_log(self, path: Optional[str] = None) -> EventLog:
+        """
+        Starts recording every order, fulfilment, shipment and arrival as a typed event.
+
+        Args:
+            path: An optional file to which the events are appended as they happen.
+
+        Returns:
+            The new EventLog, based on the twin's current state.
+        """
+        self.event_log = EventLog.for_twin(self, path)
+        return self.event_log
+
     def _initialize_supply_chain(self):
         """
         Creates the individual nodes of the Beer Game supply chain and links them together.
@@ -46,38 +110,166 @@ class DigitalTwin(metaclass=SingletonMeta):
         self.nodes['distributor'].upstream_node = self.nodes['brewery']
         self.nodes['brewery'].downstream_node = self.nodes['distributor']
         
-        print("INFO: Digital Twin initialized with the Beer Game supply chain.")
+        logger.info("Digital Twin initialized with the Beer Game supply chain.")
 
+    @timed("digital_twin_step_seconds")
     def step(self):
         """
         Advances the simulation by one time step, processing all events for the period.
         This includes moving shipments, delivering goods, and fulfilling new orders.
         """
         self.current_step += 1
-        print(f"\n--- Advancing simulation to step {self.current_step} ---")
+        logger.info("--- Advancing simulation to step %d ---", self.current_step)
+        event_log = self.event_log
+        if event_log is not None:
+            event_log.emit(StepAdvanced(self.current_step))
 
         # Update the ETA for all shipments currently in transit.
         arrived_shipments = []
+        in_transit = []
         for shipment in self.shipments_in_transit:
             shipment.eta -= 1
             if shipment.eta <= 0:
                 arrived_shipments.append(shipment)
+            else:
+                in_transit.append(shipment)
+        # Rebuilding the list keeps the step linear in the number of shipments, unlike removing each arrival.
+        self.shipments_in_transit = in_transit
 
         # Process and deliver all shipments that have arrived at their destination.
         for shipment in arrived_shipments:
-            destination_node = self.nodes.get(shipment.destination_node.lower())
+            destination_node = self.nodes.get(shipment.destination_node)
             if destination_node:
                 destination_node.receive_shipment(shipment)
-            self.shipments_in_transit.remove(shipment)
+            if event_log is not None:
+                event_log.emit(ShipmentArrived(self.current_step, render_shipment_id(shipment.shipment_id), shipment.destination_node,
+                                               shipment.product_id, shipment.quantity))
+
+        # Producing nodes with a finite capacity run their production orders first, so the output can ship in this step.
+        for node in self.nodes.values():
+            if node.production is not None:
+                for order, quantity in node.produce():
+                    if event_log is not None:
+                        event_log.emit(ProductionCompleted(self.current_step, render_order_id(order.order_id), node.name,
+                                                           order.product_id, quantity))
 
         # Instruct each node to attempt to fulfill any pending incoming orders.
+        new_shipments = []
         for node in self.nodes.values():
             # Iterate over a copy of the list to allow for modification during iteration.
             for order in list(node.incoming_orders):
-                if order.status == "PENDING":
+                # Production orders are completed by `produce`, never shipped from the node's own inventory.
+                if order.status == "PENDING" and order.source_node != order.destination_node:
                     new_shipment = node.fulfill_order(order)
                     if new_shipment:
                         self.shipments_in_transit.append(new_shipment)
+                        new_shipments.append(new_shipment)
+                        if event_log is not None:
+                            event_log.emit(OrderFulfilled(self.current_step, render_order_id(order.order_id), node.name,
+                                                          order.product_id, order.quantity))
+
+        # Consolidate the new shipments into the vehicles of their lanes, which sets their ETAs.
+        dispatches = self.logistics.dispatch(new_shipments)
+        if event_log is not None:
+            for shipment in new_shipments:
+                event_log.emit(ShipmentCreated(self.current_step, render_shipment_id(shipment.shipment_id),
+                                               render_order_id(shipment.order_id), shipment.product_id, shipment.quantity,
+                                               shipment.source_node, shipment.destination_node, shipment.eta))
+            for dispatch in dispatches:
+                event_log.emit(VehiclesDispatched(self.current_step, *dispatch))
+
+        if self.checkpointer:
+            self.checkpointer.record_step(self, new_shipments)
+
+    @timed("digital_twin_advance_seconds")
+    def advance(self, n_steps: int = 1, until: Optional[Callable] = None, policy: Optional[Callable] = None) -> TwinAdvanceResult:
+        """
+        Advances the simulation by several steps in one call, with logging suppressed.
+
+        Args:
+            n_steps: The maximum number of steps to advance.
+            until: An optional stopping condition, called after each step with any of the arguments in CONDITION_ARGUMENTS;
+                the advance stops at the first step where it returns True.
+            policy: An optional standing ordering policy, called before each step for every node with a supplier or a production
+                capacity and every product with any of the arguments in POLICY_ARGUMENTS; it returns the quantity the node orders.
+
+        Returns:
+            A TwinAdvanceResult with a per-step summary of the trajectory.
+        """
+        condition = _with_arguments(until, CONDITION_ARGUMENTS) if until else None
+        policy = _with_arguments(policy, POLICY_ARGUMENTS) if policy else None
+        start_step = self.current_step
+        trajectory = []
+        condition_met = False
+
+        # Step 1: Run the steps in a tight loop; the per-step and per-order log messages would dominate its cost.
+        with quiet():
+            for _ in range(n_steps):
+                placed = self._apply_policy(policy, *self._positions()) if policy else 0
+                self.step()
+                inventory, backlog, pipeline = self._positions()
+                trajectory.append(TwinStepSummary(
+                    step=self.current_step,
+                    inventory={node: sum(quantities.values()) for node, quantities in inventory.items()},
+                    backlog={node: sum(quantities.values()) for node, quantities in backlog.items()},
+                    pipeline={node: sum(quantities.values()) for node, quantities in pipeline.items()},
+                    orders_placed=placed,
+                ))
+                if condition and condition(step=self.current_step, inventory=inventory, backlog=backlog, pipeline=pipeline):
+                    condition_met = True
+                    break
+
+        # Step 2: Log one summary for the whole advance.
+        result = TwinAdvanceResult(
+            start_step=start_step,
+            end_step=self.current_step,
+            condition_met=condition_met,
+            orders_placed=sum(summary.orders_placed for summary in trajectory),
+            trajectory=trajectory,
+        )
+        logger.info("Advanced the Digital Twin from step %d to %d (condition met: %s, orders placed: %d).",
+                    start_step, self.current_step, condition_met, result.orders_placed,
+                    extra={"fields": {"event": "twin_advance", "start_step": start_step, "end_step": self.current_step,
+                                      "condition_met": condition_met, "orders_placed": result.orders_placed}})
+        return result
+
+    def _apply_policy(self, policy: Callable, inventory: Positions, backlog: Positions, pipeline: Positions) -> int:
+        """Places the orders of a standing policy for every node that can order, based on the positions at the start of the step."""
+        placed = 0
+        for node in self.nodes.values():
+            supplier = node.upstream_node or (node if node.production is not None else None)
+            if supplier is None:
+                continue
+            for product_id in sorted(set(inventory[node.name]) | set(backlog[node.name])):
+                quantity = int(round(float(policy(
+                    node_name=node.name, product_id=product_id, inventory=inventory[node.name].get(product_id, 0),
+                    pipeline=pipeline[node.name].get(product_id, 0), backlog=backlog[node.name].get(product_id, 0),
+                ))))
+                if quantity > 0 and self._place_order(node, OrderRecord(ORDER_IDS.next(), product_id, quantity, supplier.name, node.name)):
+                    placed += 1
+        return placed
+
+    def _positions(self) -> Tuple[Positions, Positions, Positions]:
+        """
+        Returns the inventory, backlog and pipeline of every node and product.
+        The backlog is the pending quantity ordered from the node by other nodes; the pipeline is the pending
+        quantity the node has ordered (including its own production orders) plus the quantity in transit towards it.
+        """
+        inventory = {name: dict(node.inventory) for name, node in self.nodes.items()}
+        backlog: Positions = {name: {} for name in self.nodes}
+        pipeline: Positions = {name: {} for name in self.nodes}
+        for name, node in self.nodes.items():
+            for order in node.incoming_orders:
+                if order.status == "PENDING" and order.source_node != order.destination_node:
+                    backlog[name][order.product_id] = backlog[name].get(order.product_id, 0) + order.quantity
+            for order in node.outgoing_orders:
+                if order.status == "PENDING":
+                    pipeline[name][order.product_id] = pipeline[name].get(order.product_id, 0) + order.quantity
+        for shipment in self.shipments_in_transit:
+            totals = pipeline.get(shipment.destination_node)
+            if totals is not None:
+                totals[shipment.product_id] = totals.get(shipment.product_id, 0) + shipment.quantity
+        return inventory, backlog, pipeline
 
     def get_node_state(self, node_name: str) -> SupplyChainNodeStatus:
         """
@@ -89,14 +281,29 @@ class DigitalTwin(metaclass=SingletonMeta):
         Returns:
             A SupplyChainNodeStatus object for the requested node, or None if not found.
         """
-        node = self.nodes.get(node_name.lower())
+        node = self.nodes.get(NODE_NAMES.canonical(node_name))
         if not node:
             return None
-        return SupplyChainNodeStatus(
+        return self._node_status(node, {})
+
+    def _node_status(self, node: SupplyChainNode, models: Dict[int, Order]) -> SupplyChainNodeStatus:
+        """
+        Converts the internal records of a node into a SupplyChainNodeStatus.
+        `models` maps already converted records to their Order models, so that an order shared
+        by two nodes is also shared by their statuses.
+        """
+        def model(order: OrderRecord) -> Order:
+            converted = models.get(id(order))
+            if converted is None:
+                converted = models[id(order)] = order.to_model()
+            return converted
+
+        # The converted orders are already validated models; model_construct skips validating them again.
+        return SupplyChainNodeStatus.model_construct(
             name=node.name,
-            inventory=node.inventory,
-            incoming_orders=node.incoming_orders,
-            outgoing_orders=node.outgoing_orders,
+            inventory=dict(node.inventory),
+            incoming_orders=[model(o) for o in node.incoming_orders],
+            outgoing_orders=[model(o) for o in node.outgoing_orders],
         )
 
     def place_order(self, order: Order) -> SupplyChainNodeStatus:
@@ -104,17 +311,264 @@ class DigitalTwin(metaclass=SingletonMeta):
         Allows an agent to place an order on behalf of a downstream node.
         This is the primary mechanism for agents to interact with and control the supply chain.
         """
-        node = self.nodes.get(order.destination_node.lower())
+        node = self.nodes.get(NODE_NAMES.canonical(order.destination_node))
         if not node:
             return None
         
-        node.place_order(order)
-        return self.get_node_state(order.destination_node.lower())
+        self._place_order(node, OrderRecord.from_model(order))
+        return self.get_node_state(node.name)
+
+    def cancel_order(self, order_id: str) -> bool:
+        """
+        Cancels a pending order, so that its supplier no longer fulfills it.
+
+        Args:
+            order_id: The ID of the order to cancel.
+
+        Returns:
+            True if the order was cancelled, False if no pending order has this ID.
+        """
+        order = self._find_order(order_key(order_id))
+        if order is None or order.status != "PENDING":
+            return False
+        self._cancel_order(order)
+        return True
+
+    def amend_order(self, order_id: str, quantity: int) -> bool:
+        """
+        Changes the quantity of a pending order.
+
+        Args:
+            order_id: The ID of the order to amend.
+            quantity: The new quantity, which must be positive (and, for a production order, fit in one period).
+
+        Returns:
+            True if the order was amended, False if no pending order has this ID or the quantity is invalid.
+        """
+        order = self._find_order(order_key(order_id))
+        if order is None or order.status != "PENDING" or quantity <= 0 or self._exceeds_production(order, quantity):
+            return False
+        self._amend_order(order, quantity)
+        return True
+
+    @timed("digital_twin_order_batch_seconds")
+    def apply_order_batch(self, batch: OrderBatch) -> OrderBatchResult:
+        """
+        Places, cancels and amends many orders in one call.
+        All operations are validated in one pass before any is applied, taking the effect of the
+        earlier operations of the batch into account (e.g., an order placed and then amended).
+
+        Args:
+            batch: The OrderBatch to apply.
+
+        Returns:
+            An OrderBatchResult with the number of applied operations, the rejected ones, and the pending quantities per node.
+        """
+        # Step 1: Index every order once by its internal ID; each order is in the outgoing orders of the node that placed it.
+        orders: Dict[RecordId, OrderRecord] = {o.order_id: o for node in self.nodes.values() for o in node.outgoing_orders}
+        pending = {key for key, order in orders.items() if order.status == "PENDING"}
+
+        # Step 2: Validate every operation against the state left by the accepted operations before it.
+        accepted: List[OrderOperation] = []
+        rejected: List[RejectedOperation] = []
+        for index, operation in enumerate(batch.operations):
+            reason = self._validate_operation(operation, orders, pending)
+            if reason:
+                rejected.append(RejectedOperation(index=index, action=operation.action, reason=reason))
+                continue
+            accepted.append(operation)
+            if operation.action == 'place':
+                # The record is indexed before it is applied, so that later operations of the batch are validated against it.
+                order = OrderRecord.from_model(operation.order)
+                node = self.nodes[order.destination_node]
+                order.source_node = (node.upstream_node or node).name
+                orders[order.order_id] = order
+                pending.add(order.order_id)
+            elif operation.action == 'cancel':
+                pending.discard(order_key(operation.order_id))
+        if rejected and batch.atomic:
+            accepted = []
+
+        # Step 3: Apply the accepted operations without building a node snapshot for each of them.
+        placed_order_ids = []
+        for operation in accepted:
+            if operation.action == 'place':
+                order = orders[order_key(operation.order.order_id)]
+                self._place_order(self.nodes[order.destination_node], order)
+                placed_order_ids.append(operation.order.order_id)
+            elif operation.action == 'cancel':
+                self._cancel_order(orders[order_key(operation.order_id)])
+            else:
+                self._amend_order(orders[order_key(operation.order_id)], operation.quantity)
+
+        logger.info("Applied order batch: %d applied, %d rejected.", len(accepted), len(rejected),
+                    extra={"fields": {"event": "order_batch", "applied": len(accepted), "rejected": len(rejected),
+                                      "atomic": batch.atomic}})
+        return OrderBatchResult(
+            applied=len(accepted),
+            rejected=rejected,
+            placed_order_ids=placed_order_ids,
+            pending_quantities=self._pending_quantities(),
+        )
+
+    def _place_order(self, node: SupplyChainNode, order: OrderRecord) -> bool:
+        """Places an order on behalf of a node and records it in the event log and journal. Returns True if it was placed."""
+        order.destination_node = node.name
+        if not node.place_order(order):
+            return False
+        if self.event_log is not None:
+            self.event_log.emit(OrderPlaced(self.current_step, render_order_id(order.order_id), order.product_id, order.quantity,
+                                            order.source_node, node.name))
+        if self.checkpointer:
+            self.checkpointer.record_order(self, order)
+        return True
+
+    def configure_production(self, node_name: str, capacity: Optional[ProductionCapacity]):
+        """
+        Gives a producing node a finite production capacity, or removes it.
+        With a capacity, the node places production orders with itself; each step, it produces the pending
+        production orders that fit in the capacity, in the order they were placed.
+
+        Args:
+            node_name: The name of a node without an upstream supplier (e.g., 'brewery').
+            capacity: The ProductionCapacity, or None to stop producing.
+
+        Raises:
+            ValueError: If the node is unknown, has a supplier, a single batch does not fit in the capacity,
+                or a pending production order is larger than the new capacity can produce in one period.
+        """
+        node = self.nodes.get(NODE_NAMES.canonical(node_name))
+        if node is None:
+            raise ValueError(f"Unknown node '{node_name}'.")
+        if node.upstream_node is not None:
+            raise ValueError(f"Node '{node.name}' orders from '{node.upstream_node.name}'; only a node without a supplier produces.")
+        if capacity is not None:
+            # A pending order that no longer fits would block all production behind it.
+            limit = max_batch_quantity(capacity)
+            largest = max((o.quantity for o in node.incoming_orders if o.status == "PENDING" and o.source_node == o.destination_node),
+                          default=0)
+            if largest > limit:
+                raise ValueError(f"Node '{node.name}' has a pending production order of {largest} units, "
+                                 f"more than it can produce in one period with this capacity ({limit}).")
+        node.production = capacity
+        if self.event_log is not None:
+            self.event_log.emit(ProductionConfigured(self.current_step, node.name, *(
+                (capacity.capacity, capacity.setup_time, capacity.batch_size, capacity.setup_cost) if capacity else (None, 0.0, 1, 0.0))))
+        if self.checkpointer:
+            self.checkpointer.record_production(self, node.name, capacity)
+        logger.info("Configured the production capacity of '%s': %s.", node.name, capacity,
+                    extra={"fields": {"event": "twin_production_configured", "node": node.name,
+                                      "capacity": capacity.model_dump() if capacity else None}})
+
+    def configure_lane(self, lane: Lane):
+        """
+        Adds a transport lane between two nodes, or replaces the existing one.
+        From the next step on, the shipments created on the lane are consolidated into its vehicles and
+        take the transit time drawn for their vehicle as their ETA.
+
+        Args:
+            lane: The Lane to configure.
+
+        Raises:
+            ValueError: If either node is unknown.
+        """
+        unknown = [name for name in (lane.origin, lane.destination) if NODE_NAMES.canonical(name) not in self.nodes]
+        if unknown:
+            raise ValueError(f"Unknown node(s) {unknown}.")
+        self.logistics.set_lane(lane)
+        if self.event_log is not None:
+            self.event_log.emit(LaneConfigured(self.current_step, lane.origin, lane.destination, lane.transit_time.model_dump(),
+                                               lane.vehicle_capacity, lane.cost_per_vehicle, lane.cost_per_unit))
+        if self.checkpointer:
+            self.checkpointer.record_lane(self, lane)
+        logger.info("Configured the lane from '%s' to '%s'.", lane.origin, lane.destination,
+                    extra={"fields": {"event": "twin_lane_configured", "lane": lane.model_dump()}})
+
+    def _cancel_order(self, order: OrderRecord):
+        order.status = "CANCELLED"
+        if self.event_log is not None:
+            self.event_log.emit(OrderCancelled(self.current_step, render_order_id(order.order_id)))
+        if self.checkpointer:
+            self.checkpointer.record_cancel(self, render_order_id(order.order_id))
+
+    def _amend_order(self, order: OrderRecord, quantity: int):
+        order.quantity = quantity
+        if self.event_log is not None:
+            self.event_log.emit(OrderAmended(self.current_step, render_order_id(order.order_id), quantity))
+        if self.checkpointer:
+            self.checkpointer.record_amend(self, render_order_id(order.order_id), quantity)
+
+    def _find_order(self, key: RecordId) -> Optional[OrderRecord]:
+        for node in self.nodes.values():
+            for order in node.outgoing_orders:
+                if order.order_id == key:
+                    return order
+        return None
+
+    def _validate_operation(self, operation: OrderOperation, orders: Dict[RecordId, OrderRecord], pending: set) -> Optional[str]:
+        """Returns why an operation is invalid given the current orders, or None if it is valid."""
+        if operation.action == 'place':
+            order = operation.order
+            if order is None:
+                return "A 'place' operation needs an order."
+            node = self.nodes.get(NODE_NAMES.canonical(order.destination_node))
+            if node is None:
+                return f"Unknown node '{order.destination_node}'."
+            if node.upstream_node is None and node.production is None:
+                return f"Node '{node.name}' has no upstream node to order from."
+            if order.quantity <= 0:
+                return "The order quantity must be positive."
+            if node.upstream_node is None and order.quantity > max_batch_quantity(node.production):
+                return f"Node '{node.name}' cannot produce {order.quantity} units in one period."
+            if order_key(order.order_id) in orders:
+                return f"An order with ID '{order.order_id}' already exists."
+            return None
+
+        if not operation.order_id:
+            return f"A '{operation.action}' operation needs an order_id."
+        key = order_key(operation.order_id)
+        if key not in orders:
+            return f"Unknown order '{operation.order_id}'."
+        if key not in pending:
+            return f"Order '{operation.order_id}' is no longer pending."
+        if operation.action == 'amend' and (operation.quantity is None or operation.quantity <= 0):
+            return "An 'amend' operation needs a positive quantity."
+        if operation.action == 'amend' and self._exceeds_production(orders[key], operation.quantity):
+            return f"Node '{orders[key].source_node}' cannot produce {operation.quantity} units in one period."
+        return None
+
+    def _exceeds_production(self, order: OrderRecord, quantity: int) -> bool:
+        """Returns True if the order is a production order and the quantity does not fit in one period."""
+        if order.source_node != order.destination_node:
+            return False
+        production = self.nodes[order.source_node].production
+        return production is not None and quantity > max_batch_quantity(production)
+
+    def _pending_quantities(self) -> Dict[str, Dict[str, int]]:
+        """Returns the total pending order quantity of each product per ordering node."""
+        pending: Dict[str, Dict[str, int]] = {}
+        for node in self.nodes.values():
+            for order in node.outgoing_orders:
+                if order.status == "PENDING":
+                    totals = pending.setdefault(node.name, {})
+                    totals[order.product_id] = totals.get(order.product_id, 0) + order.quantity
+        return pending
 
     def get_full_state(self) -> SupplyChainStatus:
         """Returns a complete snapshot of the entire supply chain's current state."""
-        return SupplyChainStatus(
+        models: Dict[int, Order] = {}
+        return SupplyChainStatus.model_construct(
             current_step=self.current_step,
-            nodes={name: self.get_node_state(name) for name in self.nodes},
-            shipments_in_transit=self.shipments_in_transit
-        )
\ No newline at end of file
+            nodes={name: self._node_status(node, models) for name, node in self.nodes.items()},
+            shipments_in_transit=[s.to_model() for s in self.shipments_in_transit]
+        )
+
+def _with_arguments(func: Callable, available: Tuple[str, ...]) -> Callable:
+    """Wraps a function so that it can be called with all available keyword arguments and receives only the ones it accepts."""
+    parameters = inspect.signature(func).parameters
+    if any(p.kind == p.VAR_KEYWORD for p in parameters.values()):
+        return func
+    unknown = [name for name in parameters if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown arguments {unknown}; choose from {list(available)}.")
+    return lambda **arguments: func(**{name: arguments[name] for name in parameters})
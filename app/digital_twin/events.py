@@ -0,0 +1,310 @@
+from typing import Dict, List, NamedTuple, Optional, Union
+from app.data_models.logistics_models import Lane
+from app.data_models.production_models import ProductionCapacity
+from app.digital_twin.checkpoint import append_record, read_records, encode_state, decode_state
+from app.digital_twin.records import OrderRecord, ShipmentRecord, RecordId, order_key, shipment_key
+from app.utils.identifiers import NODE_NAMES, PRODUCT_NAMES
+
+# --- Event Types ---
+# Events are small immutable tuples. They are stored on disk as (type code, *fields) records.
+
+class StepAdvanced(NamedTuple):
+    """The twin advanced to `step`; the ETA of every shipment in transit decreased by one."""
+    step: int
+
+class OrderPlaced(NamedTuple):
+    """A node placed an order with its upstream supplier, or a production order with itself."""
+    step: int
+    order_id: str
+    product_id: str
+    quantity: int
+    source_node: str
+    destination_node: str
+
+class OrderFulfilled(NamedTuple):
+    """A node fulfilled a pending order from its inventory."""
+    step: int
+    order_id: str
+    node: str
+    product_id: str
+    quantity: int
+
+class ShipmentCreated(NamedTuple):
+    """A shipment left a node to fulfill an order."""
+    step: int
+    shipment_id: str
+    order_id: str
+    product_id: str
+    quantity: int
+    source_node: str
+    destination_node: str
+    eta: int
+
+class ShipmentArrived(NamedTuple):
+    """A shipment arrived at its destination node and was added to its inventory."""
+    step: int
+    shipment_id: str
+    node: str
+    product_id: str
+    quantity: int
+
+class OrderCancelled(NamedTuple):
+    """A pending order was cancelled and will not be fulfilled."""
+    step: int
+    order_id: str
+
+class OrderAmended(NamedTuple):
+    """The quantity of a pending order was changed."""
+    step: int
+    order_id: str
+    quantity: int
+
+class ProductionCompleted(NamedTuple):
+    """A producing node completed a production order and added `quantity` units, including any batch surplus, to its inventory."""
+    step: int
+    order_id: str
+    node: str
+    product_id: str
+    quantity: int
+
+class VehiclesDispatched(NamedTuple):
+    """Vehicles left `origin` for `destination` on a lane, carrying the shipments created there in `step`."""
+    step: int
+    origin: str
+    destination: str
+    vehicles: int
+    quantity: int
+    cost: float
+
+class ProductionConfigured(NamedTuple):
+    """The production capacity of a producing node was set, or removed if `capacity` is None."""
+    step: int
+    node: str
+    capacity: Optional[float]
+    setup_time: float
+    batch_size: int
+    setup_cost: float
+
+class LaneConfigured(NamedTuple):
+    """A transport lane was added or replaced; `transit_time` is the dumped LeadTimeDistribution of its vehicles."""
+    step: int
+    origin: str
+    destination: str
+    transit_time: dict
+    vehicle_capacity: Optional[int]
+    cost_per_vehicle: float
+    cost_per_unit: float
+
+TwinEvent = Union[StepAdvanced, OrderPlaced, OrderFulfilled, ShipmentCreated, ShipmentArrived, OrderCancelled, OrderAmended,
+                  ProductionCompleted, VehiclesDispatched, ProductionConfigured, LaneConfigured]
+# New event types are appended, so that the type codes of existing log files stay valid.
+EVENT_TYPES = (StepAdvanced, OrderPlaced, OrderFulfilled, ShipmentCreated, ShipmentArrived, OrderCancelled, OrderAmended,
+               ProductionCompleted, VehiclesDispatched, ProductionConfigured, LaneConfigured)
+EVENT_CODES = {event_type: code for code, event_type in enumerate(EVENT_TYPES)}
+
+class EventLog:
+    """
+    An append-only log of the typed events emitted by a Digital Twin.
+
+    The log starts from a base checkpoint of the twin taken when logging began, so that
+    the state at any later step can be rebuilt by replaying the events on top of it.
+    If a path is given, every event is also appended to that file as it is emitted.
+    """
+
+    def __init__(self, base: bytes, path: Optional[str] = None):
+        """
+        Initializes an event log.
+
+        Args:
+            base: A binary checkpoint (see `encode_state`) of the twin when logging began.
+            path: An optional file to which the base and all events are appended.
+        """
+        self.base = base
+        self.path = path
+        self.events: List[TwinEvent] = []
+        # Maps each step to the index of its StepAdvanced event for constant-time seeking.
+        self.step_offsets: Dict[int, int] = {}
+        if path:
+            open(path, 'wb').close()
+            append_record(path, ('base', base))
+
+    @classmethod
+    def for_twin(cls, twin, path: Optional[str] = None) -> 'EventLog':
+        """Creates an event log whose base is the twin's current state."""
+        return cls(encode_state(twin), path)
+
+    @classmethod
+    def load(cls, path: str) -> 'EventLog':
+        """
+        Loads an event log from a file written by a previous run.
+
+        Args:
+            path: The path of the event log file.
+
+        Returns:
+            The loaded EventLog. It is not attached to the file, so loading never modifies it.
+        """
+        records = read_records(path)
+        if not records or records[0][0] != 'base':
+            raise ValueError(f"'{path}' is not an event log.")
+        log = cls(records[0][1])
+        for code, *fields in records[1:]:
+            log._add(EVENT_TYPES[code](*fields))
+        return log
+
+    def emit(self, event: TwinEvent):
+        """Appends an event to the log and, if configured, to the log file."""
+        self._add(event)
+        if self.path:
+            append_record(self.path, (EVENT_CODES[type(event)], *event))
+
+    def _add(self, event: TwinEvent):
+        if type(event) is StepAdvanced:
+            self.step_offsets[event.step] = len(self.events)
+        self.events.append(event)
+
+    def end_of_step(self, step: int) -> int:
+        """Returns the index one past the last event that belongs to the given step."""
+        return self.step_offsets.get(step + 1, len(self.events))
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+class TwinReplayer:
+    """
+    Rebuilds Digital Twin states by applying logged events directly to the twin's data.
+
+    Replay never calls `DigitalTwin.step` or the node methods, so it runs without any of
+    their logging and without re-evaluating the fulfilment logic. While replaying, the replayer
+    keeps a checkpoint every `snapshot_every` steps, so that a later `state_at` starts from the
+    nearest checkpoint before its step instead of from the base of the log.
+    """
+
+    def __init__(self, event_log: EventLog, snapshot_every: int = 50):
+        """
+        Initializes the replayer.
+
+        Args:
+            event_log: The event log to replay.
+            snapshot_every: The number of steps between the checkpoints kept while replaying.
+        """
+        self.event_log = event_log
+        self.snapshot_every = snapshot_every
+        # Maps a step to a binary checkpoint (see `encode_state`) of the twin at the end of that step.
+        self.snapshots: Dict[int, bytes] = {}
+
+    def state_at(self, step: int):
+        """
+        Rebuilds the twin as it was at the end of the given step.
+        Only the events after the nearest checkpoint at or before the step are replayed.
+
+        Args:
+            step: The step to rebuild.
+
+        Returns:
+            A detached DigitalTwin in the state at the end of that step.
+        """
+        # Late import to prevent circular dependency
+        from app.digital_twin.digital_twin import DigitalTwin
+
+        log = self.event_log
+        twin = DigitalTwin.detached()
+        start = max((s for s in self.snapshots if s <= step), default=None)
+        decode_state(twin, log.base if start is None else self.snapshots[start])
+        position = 0 if start is None else log.end_of_step(start)
+
+        # Keep a checkpoint at every multiple of `snapshot_every` passed on the way. Only complete steps are
+        # kept, because the events of the last step of a live log may still grow.
+        replayed = start if start is not None else min(log.step_offsets, default=step + 1) - 1
+        checkpoint = (replayed // self.snapshot_every + 1) * self.snapshot_every
+        while checkpoint <= step and checkpoint + 1 in log.step_offsets:
+            end = log.end_of_step(checkpoint)
+            self.fast_forward(twin, position, end)
+            position = end
+            self.snapshots[checkpoint] = encode_state(twin)
+            checkpoint += self.snapshot_every
+        self.fast_forward(twin, position, log.end_of_step(step))
+        return twin
+
+    def fast_forward(self, twin, start: int, end: int):
+        """
+        Applies the events in `[start, end)` of the log to the twin in a tight loop.
+
+        Args:
+            twin: The DigitalTwin to mutate.
+            start: The index of the first event to apply.
+            end: The index one past the last event to apply.
+        """
+        # Events hold rendered IDs; the records are indexed by their internal IDs.
+        orders: Dict[RecordId, OrderRecord] = {}
+        for node in twin.nodes.values():
+            for order in node.incoming_orders + node.outgoing_orders:
+                orders[order.order_id] = order
+        in_transit: Dict[RecordId, ShipmentRecord] = {s.shipment_id: s for s in twin.shipments_in_transit}
+        nodes = twin.nodes
+
+        for event in self.event_log.events[start:end]:
+            kind = type(event)
+            if kind is StepAdvanced:
+                twin.current_step = event.step
+                for shipment in in_transit.values():
+                    shipment.eta -= 1
+            elif kind is OrderPlaced:
+                order = OrderRecord(order_key(event.order_id), PRODUCT_NAMES.canonical(event.product_id), event.quantity,
+                                    NODE_NAMES.canonical(event.source_node), NODE_NAMES.canonical(event.destination_node))
+                orders[order.order_id] = order
+                nodes[event.destination_node].outgoing_orders.append(order)
+                nodes[event.source_node].incoming_orders.append(order)
+            elif kind is OrderFulfilled:
+                orders[order_key(event.order_id)].status = "FULFILLED"
+                inventory = nodes[event.node].inventory
+                inventory[event.product_id] = inventory.get(event.product_id, 0) - event.quantity
+            elif kind is ShipmentCreated:
+                shipment = ShipmentRecord(shipment_key(event.shipment_id), order_key(event.order_id),
+                                          PRODUCT_NAMES.canonical(event.product_id), event.quantity,
+                                          NODE_NAMES.canonical(event.source_node), NODE_NAMES.canonical(event.destination_node), event.eta)
+                in_transit[shipment.shipment_id] = shipment
+            elif kind is OrderCancelled:
+                orders[order_key(event.order_id)].status = "CANCELLED"
+            elif kind is OrderAmended:
+                orders[order_key(event.order_id)].quantity = event.quantity
+            elif kind is ProductionCompleted:
+                orders[order_key(event.order_id)].status = "FULFILLED"
+                inventory = nodes[event.node].inventory
+                inventory[event.product_id] = inventory.get(event.product_id, 0) + event.quantity
+            elif kind is VehiclesDispatched:
+                twin.logistics.vehicles_dispatched += event.vehicles
+                twin.logistics.freight_cost += event.cost
+            elif kind is ProductionConfigured:
+                nodes[event.node].production = None if event.capacity is None else ProductionCapacity(
+                    capacity=event.capacity, setup_time=event.setup_time, batch_size=event.batch_size, setup_cost=event.setup_cost)
+            elif kind is LaneConfigured:
+                twin.logistics.set_lane(Lane(origin=event.origin, destination=event.destination, transit_time=event.transit_time,
+                                             vehicle_capacity=event.vehicle_capacity, cost_per_vehicle=event.cost_per_vehicle,
+                                             cost_per_unit=event.cost_per_unit))
+            elif kind is ShipmentArrived:
+                in_transit.pop(shipment_key(event.shipment_id), None)
+                node = nodes.get(event.node)
+                if node:
+                    node.inventory[event.product_id] = node.inventory.get(event.product_id, 0) + event.quantity
+
+        twin.shipments_in_transit = list(in_transit.values())
+
+    def branch(self, step: int, path: Optional[str] = None):
+        """
+        Creates an independent twin at the given step that can continue with different decisions.
+        The branch gets its own event log, seeded with the history up to the branching point.
+
+        Args:
+            step: The step to branch from.
+            path: An optional file for the branch's event log.
+
+        Returns:
+            A detached DigitalTwin with an attached event log.
+        """
+        twin = self.state_at(step)
+        branch_log = EventLog(self.event_log.base, path)
+        for event in self.event_log.events[:self.event_log.end_of_step(step)]:
+            branch_log.emit(event)
+        twin.event_log = branch_log
+        return twin
@@ -0,0 +1,100 @@
+import math
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from app.data_models.logistics_models import Lane
+from app.digital_twin.records import ShipmentRecord
+from app.simulations.random_generators import LeadTimeGenerator
+from app.utils.identifiers import NODE_NAMES
+
+class Dispatch(NamedTuple):
+    """The vehicles dispatched on one lane in one step."""
+    origin: str
+    destination: str
+    vehicles: int
+    quantity: int
+    cost: float
+
+class LaneNetwork:
+    """
+    The transport lanes of a Digital Twin.
+
+    Each step, the shipments created on a lane are consolidated: they are loaded first-fit decreasing
+    into the lane's vehicles, every vehicle draws its own transit time, and each shipment takes the ETA
+    of its vehicle. A shipment larger than a vehicle travels on dedicated vehicles. Shipments on
+    routes without a lane keep the twin's default ETA.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        """
+        Initializes a network without lanes.
+
+        Args:
+            seed: The seed of the transit-time draws, or None for fresh OS entropy.
+        """
+        self.lanes: Dict[Tuple[str, str], Lane] = {}
+        self._generators: Dict[Tuple[str, str], LeadTimeGenerator] = {}
+        self.rng = np.random.default_rng(seed)
+        self.vehicles_dispatched = 0
+        self.freight_cost = 0.0
+
+    def set_lane(self, lane: Lane):
+        """Adds a lane, or replaces the lane between the same two nodes."""
+        key = (NODE_NAMES.canonical(lane.origin), NODE_NAMES.canonical(lane.destination))
+        self._generators[key] = LeadTimeGenerator(lane.transit_time)
+        self.lanes[key] = lane
+
+    def dispatch(self, shipments: List[ShipmentRecord]) -> List[Dispatch]:
+        """
+        Consolidates the shipments created in one step into vehicles and sets their ETAs.
+
+        Args:
+            shipments: The new shipments; their `eta` is overwritten if they travel on a lane.
+
+        Returns:
+            The vehicles dispatched on each lane.
+        """
+        if not self.lanes:
+            return []
+        by_lane: Dict[Tuple[str, str], List[ShipmentRecord]] = {}
+        for shipment in shipments:
+            key = (shipment.source_node, shipment.destination_node)
+            if key in self.lanes:
+                by_lane.setdefault(key, []).append(shipment)
+
+        dispatches = []
+        for key, lane_shipments in by_lane.items():
+            lane = self.lanes[key]
+            vehicles = self._load(lane_shipments, lane.vehicle_capacity)
+            transit_times = self._generators[key].sample(self.rng, (len(vehicles),))
+            for (_, loaded), transit_time in zip(vehicles, transit_times):
+                for shipment in loaded:
+                    shipment.eta = int(transit_time)
+            count = sum(size for size, _ in vehicles)
+            quantity = sum(s.quantity for s in lane_shipments)
+            cost = lane.cost_per_vehicle * count + lane.cost_per_unit * quantity
+            self.vehicles_dispatched += count
+            self.freight_cost += cost
+            dispatches.append(Dispatch(key[0], key[1], count, quantity, cost))
+        return dispatches
+
+    @staticmethod
+    def _load(shipments: List[ShipmentRecord], capacity: Optional[int]) -> List[Tuple[int, List[ShipmentRecord]]]:
+        """Loads shipments first-fit decreasing into vehicles; returns each load with the number of vehicles it takes."""
+        if capacity is None:
+            return [(1, shipments)]
+        vehicles: List[Tuple[int, List[ShipmentRecord]]] = []
+        space: List[int] = []
+        for shipment in sorted(shipments, key=lambda s: -s.quantity):
+            if shipment.quantity > capacity:
+                vehicles.append((math.ceil(shipment.quantity / capacity), [shipment]))
+                space.append(0)
+                continue
+            for v, free in enumerate(space):
+                if shipment.quantity <= free:
+                    vehicles[v][1].append(shipment)
+                    space[v] -= shipment.quantity
+                    break
+            else:
+                vehicles.append((1, [shipment]))
+                space.append(capacity - shipment.quantity)
+        return vehicles
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from typing import Union
+from app.data_models.supply_chain_models import Order, Shipment
+from app.utils.identifiers import ORDER_IDS, SHIPMENT_IDS, NODE_NAMES, PRODUCT_NAMES
+
+# An internal ID: the integer of an ID generated by this process's sequence, or the original string of any other ID.
+RecordId = Union[int, str]
+
+def order_key(order_id: str) -> RecordId:
+    """Converts a rendered order ID into its internal ID."""
+    value = ORDER_IDS.parse(order_id)
+    return order_id if value is None else value
+
+def render_order_id(key: RecordId) -> str:
+    """Renders an internal order ID as it appears in the Order model."""
+    return ORDER_IDS.render(key) if type(key) is int else key
+
+def shipment_key(shipment_id: str) -> RecordId:
+    """Converts a rendered shipment ID into its internal ID."""
+    value = SHIPMENT_IDS.parse(shipment_id)
+    return shipment_id if value is None else value
+
+def render_shipment_id(key: RecordId) -> str:
+    """Renders an internal shipment ID as it appears in the Shipment model."""
+    return SHIPMENT_IDS.render(key) if type(key) is int else key
+
+@dataclass(slots=True)
+class OrderRecord:
+    """
+    The Digital Twin's internal representation of an order, with the fields of the Order model.
+
+    Records have no per-instance `__dict__` and skip validation; their names are interned and their
+    IDs are integers when generated by the twin. They are converted to Order models only when the
+    twin's state leaves it (tools, MCP servers, persisted records).
+    """
+    order_id: RecordId
+    product_id: str
+    quantity: int
+    source_node: str
+    destination_node: str
+    status: str = "PENDING"
+
+    @classmethod
+    def from_model(cls, order: Order) -> 'OrderRecord':
+        """Creates a record from an Order model."""
+        return cls(order_key(order.order_id), PRODUCT_NAMES.canonical(order.product_id), order.quantity,
+                   NODE_NAMES.canonical(order.source_node), NODE_NAMES.canonical(order.destination_node), order.status)
+
+    def to_model(self) -> Order:
+        """Returns the record as an Order model."""
+        # Validating the plain fields is faster than model_construct, which also resolves defaults and the fields set.
+        return Order(order_id=render_order_id(self.order_id), product_id=self.product_id, quantity=self.quantity,
+                     source_node=self.source_node, destination_node=self.destination_node, status=self.status)
+
+@dataclass(slots=True)
+class ShipmentRecord:
+    """The Digital Twin's internal representation of a shipment, with the fields of the Shipment model (see OrderRecord)."""
+    shipment_id: RecordId
+    order_id: RecordId
+    product_id: str
+    quantity: int
+    source_node: str
+    destination_node: str
+    eta: int
+
+    @classmethod
+    def from_model(cls, shipment: Shipment) -> 'ShipmentRecord':
+        """Creates a record from a Shipment model."""
+        return cls(shipment_key(shipment.shipment_id), order_key(shipment.order_id), PRODUCT_NAMES.canonical(shipment.product_id),
+                   shipment.quantity, NODE_NAMES.canonical(shipment.source_node), NODE_NAMES.canonical(shipment.destination_node),
+                   shipment.eta)
+
+    def to_model(self) -> Shipment:
+        """Returns the record as a Shipment model."""
+        return Shipment(shipment_id=render_shipment_id(self.shipment_id), order_id=render_order_id(self.order_id),
+                        product_id=self.product_id, quantity=self.quantity, source_node=self.source_node,
+                        destination_node=self.destination_node, eta=self.eta)
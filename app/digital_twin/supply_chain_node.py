@@ -1,6 +1,15 @@
-from typing import List, Dict, Optional
-import uuid
-from app.data_models.supply_chain_models import Order, Shipment
+from typing import List, Dict, Optional, Tuple
+from logging import INFO, WARNING
+import numpy as np
+from app.data_models.production_models import ProductionCapacity
+from app.optimizations.production_scheduling import batch_quantity, capacity_load, max_batch_quantity
+from app.digital_twin.records import OrderRecord, ShipmentRecord, render_order_id, render_shipment_id
+from app.utils.identifiers import ORDER_IDS, SHIPMENT_IDS, NODE_NAMES
+from app.utils.logging_utils import get_logger, get_event_logger
+
+logger = get_logger("digital_twin.node")
+# Per-order and per-shipment messages go through a sampled logger.
+event_logger = get_event_logger("digital_twin.node")
 
 class SupplyChainNode:
     """
@@ -18,46 +27,59 @@ class SupplyChainNode:
             node_type: The type of the node (e.g., 'Retailer').
             initial_inventory: A dictionary mapping product IDs to their starting inventory levels.
         """
-        self.name = name.lower()
+        self.name = NODE_NAMES.canonical(name)
         self.node_type = node_type
         self.inventory: Dict[str, int] = initial_inventory or {}
-        self.incoming_orders: List[Order] = []  # Orders received from the downstream node.
-        self.outgoing_orders: List[Order] = []  # Orders placed with the upstream node.
-        self.incoming_shipments: List[Shipment] = [] # Shipments arriving at this node.
+        self.incoming_orders: List[OrderRecord] = []  # Orders received from the downstream node.
+        self.outgoing_orders: List[OrderRecord] = []  # Orders placed with the upstream node.
+        self.incoming_shipments: List[ShipmentRecord] = [] # Shipments arriving at this node.
         self.upstream_node: Optional['SupplyChainNode'] = None
         self.downstream_node: Optional['SupplyChainNode'] = None
+        # The finite production capacity of a producing node; None if the node does not produce.
+        self.production: Optional[ProductionCapacity] = None
 
-    def place_order(self, order: Order):
+    def place_order(self, order: OrderRecord) -> bool:
         """
         Places a new order with this node's upstream supplier.
         The order is added to this node's outgoing orders and the upstream node's incoming orders.
+        A producing node without a supplier places production orders with itself instead.
+
+        Returns:
+            True if the order was placed, False if the node has nowhere to order from or the production order is too large.
         """
-        if not self.upstream_node:
-            print(f"ERROR: Node '{self.name}' has no upstream node to order from.")
-            return
+        supplier = self.upstream_node
+        if supplier is None and self.production is not None:
+            if order.quantity > max_batch_quantity(self.production):
+                logger.error("Node '%s' cannot produce %d units in one period.", self.name, order.quantity)
+                return False
+            supplier = self
+        if supplier is None:
+            logger.error("Node '%s' has no upstream node to order from.", self.name)
+            return False
         
         if not order.order_id:
-            order.order_id = str(uuid.uuid4())
+            order.order_id = ORDER_IDS.next()
 
         self.outgoing_orders.append(order)
-        order.source_node = self.upstream_node.name.lower()
-        self.upstream_node.receive_order(order)
+        order.source_node = supplier.name
+        supplier.receive_order(order)
+        return True
 
-    def receive_order(self, order: Order):
+    def receive_order(self, order: OrderRecord):
         """Receives an order from a downstream node and adds it to the incoming order queue."""
         self.incoming_orders.append(order)
 
-    def fulfill_order(self, order: Order) -> Optional[Shipment]:
+    def fulfill_order(self, order: OrderRecord) -> Optional[ShipmentRecord]:
         """
         Attempts to fulfill a pending incoming order.
         If inventory is sufficient, it decrements the stock, marks the order as fulfilled,
         and creates a new shipment. Otherwise, it does nothing.
 
         Args:
-            order: The Order object to be fulfilled.
+            order: The order to be fulfilled.
 
         Returns:
-            A new Shipment object if the order was fulfilled, otherwise None.
+            A new ShipmentRecord if the order was fulfilled, otherwise None.
         """
         if order.status != "PENDING":
             return None
@@ -69,28 +91,71 @@ class SupplyChainNode:
             self.inventory[product_id] -= quantity_ordered
             order.status = "FULFILLED"
             
-            new_shipment = Shipment(
+            new_shipment = ShipmentRecord(
+                shipment_id=SHIPMENT_IDS.next(),
                 order_id=order.order_id,
                 product_id=product_id,
                 quantity=quantity_ordered,
                 source_node=self.name,
-                destination_node=order.destination_node.lower(),
+                destination_node=order.destination_node,
                 eta=2  # Simulate a 2-step transit time
             )
-            print(f"INFO: Node '{self.name}' fulfilled order {order.order_id} and created shipment {new_shipment.shipment_id}.")
+            if event_logger.isEnabledFor(INFO):
+                event_logger.info("Node '%s' fulfilled order %s and created shipment %s.", self.name,
+                                  render_order_id(order.order_id), render_shipment_id(new_shipment.shipment_id))
             return new_shipment
         else:
-            print(f"WARN: Node '{self.name}' has insufficient inventory to fulfill order {order.order_id}.")
+            if event_logger.isEnabledFor(WARNING):
+                event_logger.warning("Node '%s' has insufficient inventory to fulfill order %s.", self.name, render_order_id(order.order_id))
             return None
 
-    def receive_shipment(self, shipment: Shipment):
+    def produce(self) -> List[Tuple[OrderRecord, int]]:
+        """
+        Runs the pending production orders of one period in the order they were placed, as far as the capacity allows.
+        Each product produced in the period costs one setup and is produced in whole batches; the surplus of the
+        last batch is added to the inventory with the last order of the product. Production stops at the first
+        order that no longer fits, so that orders are never overtaken.
+
+        Returns:
+            The completed production orders with the quantity each added to the inventory.
+        """
+        if self.production is None:
+            return []
+        planned: Dict[str, int] = {}
+        started: List[OrderRecord] = []
+        for order in self.incoming_orders:
+            if order.status != "PENDING" or order.source_node != order.destination_node:
+                continue
+            totals = dict(planned)
+            totals[order.product_id] = totals.get(order.product_id, 0) + order.quantity
+            if capacity_load(np.fromiter(totals.values(), dtype=float), self.production) > self.production.capacity:
+                break
+            planned = totals
+            started.append(order)
+
+        last = {order.product_id: order for order in started}
+        completed = []
+        for order in started:
+            quantity = order.quantity
+            if last[order.product_id] is order:
+                quantity += int(batch_quantity(planned[order.product_id], self.production)) - planned[order.product_id]
+            self.inventory[order.product_id] = self.inventory.get(order.product_id, 0) + quantity
+            order.status = "FULFILLED"
+            completed.append((order, quantity))
+        if completed and event_logger.isEnabledFor(INFO):
+            event_logger.info("Node '%s' completed %d production orders.", self.name, len(completed))
+        return completed
+
+    def receive_shipment(self, shipment: ShipmentRecord):
         """
         Receives an incoming shipment from an upstream node and adds the quantity to the inventory.
         """
         product_id = shipment.product_id
         self.inventory[product_id] = self.inventory.get(product_id, 0) + shipment.quantity
         self.incoming_shipments = [s for s in self.incoming_shipments if s.shipment_id != shipment.shipment_id]
-        print(f"INFO: Node '{self.name}' received shipment {shipment.shipment_id} of {shipment.quantity} {product_id}.")
+        if event_logger.isEnabledFor(INFO):
+            event_logger.info("Node '%s' received shipment %s of %d %s.", self.name, render_shipment_id(shipment.shipment_id),
+                              shipment.quantity, product_id)
 
     def __repr__(self):
         return f"SupplyChainNode(name='{self.name}', type='{self.node_type}', inventory={self.inventory})"
\ No newline at end of file
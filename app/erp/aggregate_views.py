@@ -0,0 +1,185 @@
+from collections import deque
+from typing import Dict, Optional, Sequence, Set
+from app.data_models.erp_models import HistoricalData, RollingSummary, ProductAggregates, HistoryAggregates
+
+# The default number of periods in the rolling window (e.g., four weekly periods).
+DEFAULT_WINDOW = 4
+
+class RollingStatistic:
+    """
+    The mean and variance of a series over all values and over the last `window` values.
+    Each new value is added in O(1): the all-time moments use Welford's method, and the
+    window keeps running sums of its values and their squares.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._values = deque(maxlen=window)
+        self._sum = 0.0
+        self._sum_squares = 0.0
+
+    def add(self, value: float):
+        """Adds the value of the next period."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+        if len(self._values) == self.window:
+            oldest = self._values[0]
+            self._sum -= oldest
+            self._sum_squares -= oldest * oldest
+        self._values.append(value)
+        self._sum += value
+        self._sum_squares += value * value
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def rolling_mean(self) -> float:
+        return self._sum / len(self._values) if self._values else 0.0
+
+    @property
+    def rolling_variance(self) -> float:
+        if not self._values:
+            return 0.0
+        # Running sums can leave a tiny negative residue for constant series.
+        return max(self._sum_squares / len(self._values) - self.rolling_mean ** 2, 0.0)
+
+    def summary(self) -> RollingSummary:
+        values = self._values
+        trend = (values[-1] - values[0]) / (len(values) - 1) if len(values) > 1 else 0.0
+        return RollingSummary(
+            count=self.count, mean=self.mean, variance=self.variance,
+            rolling_mean=self.rolling_mean, rolling_variance=self.rolling_variance,
+            rolling_trend=trend, last=values[-1] if values else 0.0,
+        )
+
+class ProductView:
+    """The incrementally maintained series and fill counters of one product at one node."""
+
+    def __init__(self, window: int):
+        self.inventory = RollingStatistic(window)
+        self.orders_placed = RollingStatistic(window)
+        self.orders_received = RollingStatistic(window)
+        self.received_quantity = 0
+        self.fulfilled_quantity = 0
+        self.on_time_quantity = 0
+
+    def summary(self) -> ProductAggregates:
+        placed, received = self.orders_placed, self.orders_received
+        return ProductAggregates(
+            inventory=self.inventory.summary(),
+            orders_placed=placed.summary(),
+            orders_received=received.summary(),
+            bullwhip_ratio=_ratio(placed.variance, received.variance),
+            rolling_bullwhip_ratio=_ratio(placed.rolling_variance, received.rolling_variance),
+            fill_rate=_ratio(self.fulfilled_quantity, self.received_quantity),
+            on_time_fill_rate=_ratio(self.on_time_quantity, self.received_quantity),
+        )
+
+class AggregateViews:
+    """
+    Materialised aggregate views over the ERP history, updated as each period is recorded.
+
+    An order counts towards a period's placed or received quantity in the first period it appears,
+    and towards the fulfilled quantity in the first period it appears with the status FULFILLED.
+    Reading the views costs O(nodes × products), independent of the length of the history.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        """
+        Initializes empty views.
+
+        Args:
+            window: The number of periods in the rolling window.
+        """
+        self.window = window
+        self.num_periods = 0
+        self.last_period: Optional[int] = None
+        self.last_record: Optional[HistoricalData] = None
+        self.views: Dict[str, Dict[str, ProductView]] = {}
+        self._seen_orders: Set[str] = set()
+        self._fulfilled_orders: Set[str] = set()
+
+    def update(self, record: HistoricalData):
+        """
+        Adds a recorded period to the views.
+
+        Args:
+            record: The historical record of the period.
+        """
+        for name, status in record.nodes.items():
+            node_views = self.views.setdefault(name, {})
+            placed = self._new_quantities(status.outgoing_orders)
+            received: Dict[str, int] = {}
+            for order in status.incoming_orders:
+                view = self._product(node_views, order.product_id)
+                if order.order_id not in self._seen_orders:
+                    received[order.product_id] = received.get(order.product_id, 0) + order.quantity
+                    view.received_quantity += order.quantity
+                    if order.status == "FULFILLED":
+                        view.on_time_quantity += order.quantity
+                if order.status == "FULFILLED" and order.order_id not in self._fulfilled_orders:
+                    view.fulfilled_quantity += order.quantity
+                    self._fulfilled_orders.add(order.order_id)
+
+            products = set(status.inventory) | set(placed) | set(received) | set(node_views)
+            for product in products:
+                view = self._product(node_views, product)
+                view.inventory.add(status.inventory.get(product, 0))
+                view.orders_placed.add(placed.get(product, 0))
+                view.orders_received.add(received.get(product, 0))
+
+        # Orders are marked as seen only after all nodes are processed, since each order appears at two nodes.
+        for status in record.nodes.values():
+            self._seen_orders.update(o.order_id for o in status.incoming_orders)
+            self._seen_orders.update(o.order_id for o in status.outgoing_orders)
+        self.num_periods += 1
+        self.last_period = record.period
+        self.last_record = record
+
+    def summary(self, nodes: Optional[Sequence[str]] = None, products: Optional[Sequence[str]] = None) -> HistoryAggregates:
+        """
+        Returns the current aggregates.
+
+        Args:
+            nodes: The nodes to include, or None for all nodes.
+            products: The products to include, or None for all products.
+
+        Returns:
+            A HistoryAggregates object.
+        """
+        return HistoryAggregates(
+            window=self.window,
+            num_periods=self.num_periods,
+            last_period=self.last_period,
+            nodes={name: {product: view.summary() for product, view in node_views.items() if not products or product in products}
+                   for name, node_views in self.views.items() if not nodes or name in nodes},
+        )
+
+    def _product(self, node_views: Dict[str, ProductView], product: str) -> ProductView:
+        """Returns the view of a product, creating it with zero values for the periods before it first appeared."""
+        view = node_views.get(product)
+        if view is None:
+            view = node_views[product] = ProductView(self.window)
+            for _ in range(self.num_periods):
+                for series in (view.inventory, view.orders_placed, view.orders_received):
+                    series.add(0)
+        return view
+
+    def _new_quantities(self, orders) -> Dict[str, int]:
+        """Sums the quantities of the orders that were not seen before, per product."""
+        totals: Dict[str, int] = {}
+        for order in orders:
+            if order.order_id not in self._seen_orders:
+                totals[order.product_id] = totals.get(order.product_id, 0) + order.quantity
+        return totals
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    return numerator / denominator if denominator else None
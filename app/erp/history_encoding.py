@@ -0,0 +1,217 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from app.data_models.erp_models import (
+    HistoricalData, NodeDelta, PeriodDelta, NodeColumns, HistoryColumns, SeriesSummary, NodeHistorySummary, HistorySummary
+)
+from app.data_models.supply_chain_models import SupplyChainNodeStatus
+
+# The fields of a historical record that can be projected.
+HISTORY_FIELDS = ('inventory', 'incoming_orders', 'outgoing_orders', 'shipments_in_transit')
+
+# The per-node quantity columns, and the node status field each one is derived from.
+NODE_QUANTITIES = {'inventory': 'inventory', 'incoming_quantity': 'incoming_orders', 'outgoing_quantity': 'outgoing_orders'}
+
+def select_fields(fields: Optional[Sequence[str]]) -> List[str]:
+    """
+    Validates a field projection.
+
+    Args:
+        fields: The requested fields, or None for all fields.
+
+    Returns:
+        The selected fields, in the order of HISTORY_FIELDS.
+    """
+    if not fields:
+        return list(HISTORY_FIELDS)
+    unknown = set(fields) - set(HISTORY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown history fields {sorted(unknown)}; choose from {list(HISTORY_FIELDS)}.")
+    return [f for f in HISTORY_FIELDS if f in fields]
+
+def project(history: Iterable[HistoricalData], fields: Optional[Sequence[str]] = None,
+            nodes: Optional[Sequence[str]] = None) -> List[dict]:
+    """
+    Returns the historical records as JSON-compatible dicts restricted to the selected fields and nodes.
+
+    Args:
+        history: The historical records.
+        fields: The fields to keep (see HISTORY_FIELDS), or None for all fields.
+        nodes: The nodes to keep, or None for all nodes.
+
+    Returns:
+        One dict per period.
+    """
+    fields = select_fields(fields)
+    node_fields = {'name'} | {f for f in fields if f != 'shipments_in_transit'}
+    records = []
+    for record in history:
+        entry = {
+            'period': record.period,
+            'nodes': {name: status.model_dump(mode='json', include=node_fields)
+                      for name, status in _select_nodes(record, nodes).items()},
+        }
+        if 'shipments_in_transit' in fields:
+            entry['shipments_in_transit'] = [s.model_dump(mode='json') for s in record.shipments_in_transit]
+        records.append(entry)
+    return records
+
+def encode_deltas(history: Iterable[HistoricalData], fields: Optional[Sequence[str]] = None,
+                  nodes: Optional[Sequence[str]] = None) -> List[PeriodDelta]:
+    """
+    Delta-encodes the history: each period only holds what changed since the previous period.
+    The first period is encoded relative to an empty supply chain, so it holds the full state.
+
+    Args:
+        history: The historical records, in period order.
+        fields: The fields to encode (see HISTORY_FIELDS), or None for all fields.
+        nodes: The nodes to encode, or None for all nodes.
+
+    Returns:
+        One PeriodDelta per period.
+    """
+    fields = select_fields(fields)
+    deltas = []
+    previous_nodes: Dict[str, SupplyChainNodeStatus] = {}
+    previous_shipments = {}
+    for record in history:
+        delta = PeriodDelta(period=record.period)
+        for name, status in _select_nodes(record, nodes).items():
+            node_delta = _node_delta(previous_nodes.get(name), status, fields)
+            # A node is always listed in the period it first appears, so that it is rebuilt even if it is empty.
+            if name not in previous_nodes or node_delta != NodeDelta():
+                delta.nodes[name] = node_delta
+        if 'shipments_in_transit' in fields:
+            shipments = {s.shipment_id: s for s in record.shipments_in_transit}
+            # A shipment whose ETA changed is sent again in full, like an order whose status changed.
+            delta.added_shipments = [s for sid, s in shipments.items() if previous_shipments.get(sid) != s]
+            delta.removed_shipments = [sid for sid in previous_shipments if sid not in shipments]
+            previous_shipments = shipments
+        previous_nodes = record.nodes
+        deltas.append(delta)
+    return deltas
+
+def decode_deltas(deltas: Iterable[PeriodDelta]) -> List[HistoricalData]:
+    """
+    Rebuilds the historical records from a delta-encoded history of all fields.
+
+    Args:
+        deltas: The period deltas returned by `encode_deltas`.
+
+    Returns:
+        The historical records.
+    """
+    history = []
+    nodes: Dict[str, dict] = {}
+    shipments = {}
+    for delta in deltas:
+        for name, node_delta in delta.nodes.items():
+            node = nodes.setdefault(name, {'inventory': {}, 'incoming_orders': {}, 'outgoing_orders': {}})
+            node['inventory'].update(node_delta.inventory)
+            for direction in ('incoming', 'outgoing'):
+                orders = node[f'{direction}_orders']
+                for order_id in getattr(node_delta, f'removed_{direction}_orders'):
+                    orders.pop(order_id, None)
+                orders.update({o.order_id: o for o in getattr(node_delta, f'added_{direction}_orders')})
+        for shipment_id in delta.removed_shipments:
+            shipments.pop(shipment_id, None)
+        shipments.update({s.shipment_id: s for s in delta.added_shipments})
+        history.append(HistoricalData(
+            period=delta.period,
+            nodes={name: SupplyChainNodeStatus(name=name, inventory=dict(node['inventory']),
+                                               incoming_orders=list(node['incoming_orders'].values()),
+                                               outgoing_orders=list(node['outgoing_orders'].values()))
+                   for name, node in nodes.items()},
+            shipments_in_transit=list(shipments.values()),
+        ))
+    return history
+
+def to_columns(history: Sequence[HistoricalData], fields: Optional[Sequence[str]] = None,
+               nodes: Optional[Sequence[str]] = None) -> HistoryColumns:
+    """
+    Converts the history into per-period arrays of quantities by node and product.
+    Orders and shipments are reduced to their total open quantity per product.
+
+    Args:
+        history: The historical records, in period order.
+        fields: The fields to convert (see HISTORY_FIELDS), or None for all fields.
+        nodes: The nodes to convert, or None for all nodes.
+
+    Returns:
+        A HistoryColumns object.
+    """
+    fields = select_fields(fields)
+    columns = HistoryColumns(periods=[record.period for record in history])
+    for t, record in enumerate(history):
+        for name, status in _select_nodes(record, nodes).items():
+            node_columns = columns.nodes.setdefault(name, NodeColumns())
+            for column, field in NODE_QUANTITIES.items():
+                if field not in fields:
+                    continue
+                quantities = status.inventory if field == 'inventory' else _order_quantities(getattr(status, field))
+                _set(getattr(node_columns, column), quantities, t, len(history))
+        if 'shipments_in_transit' in fields:
+            _set(columns.in_transit_quantity, _order_quantities(record.shipments_in_transit), t, len(history))
+    return columns
+
+def summarise(history: Sequence[HistoricalData], fields: Optional[Sequence[str]] = None,
+              nodes: Optional[Sequence[str]] = None) -> HistorySummary:
+    """
+    Summarises the per-period quantities of every node and product over the history.
+
+    Args:
+        history: The historical records, in period order.
+        fields: The fields to summarise (see HISTORY_FIELDS), or None for all fields.
+        nodes: The nodes to summarise, or None for all nodes.
+
+    Returns:
+        A HistorySummary object.
+    """
+    columns = to_columns(history, fields, nodes)
+    summarise_columns = lambda series: {product: _series_summary(values) for product, values in series.items()}
+    return HistorySummary(
+        first_period=columns.periods[0] if columns.periods else None,
+        last_period=columns.periods[-1] if columns.periods else None,
+        num_periods=len(columns.periods),
+        nodes={name: NodeHistorySummary(**{column: summarise_columns(getattr(node_columns, column)) for column in NODE_QUANTITIES})
+               for name, node_columns in columns.nodes.items()},
+        in_transit_quantity=summarise_columns(columns.in_transit_quantity),
+    )
+
+def _select_nodes(record: HistoricalData, nodes: Optional[Sequence[str]]) -> Dict[str, SupplyChainNodeStatus]:
+    if not nodes:
+        return record.nodes
+    return {name: status for name, status in record.nodes.items() if name in nodes}
+
+def _node_delta(previous: Optional[SupplyChainNodeStatus], current: SupplyChainNodeStatus, fields: List[str]) -> NodeDelta:
+    """Returns the changes of a node between two periods, restricted to the selected fields."""
+    delta = NodeDelta()
+    if 'inventory' in fields:
+        before = previous.inventory if previous else {}
+        delta.inventory = {p: q for p, q in current.inventory.items() if before.get(p) != q}
+    for direction in ('incoming', 'outgoing'):
+        field = f'{direction}_orders'
+        if field not in fields:
+            continue
+        before = {o.order_id: o for o in getattr(previous, field)} if previous else {}
+        after = {o.order_id: o for o in getattr(current, field)}
+        # An order whose status changed is sent again in full; its ID is not reported as removed.
+        setattr(delta, f'added_{field}', [o for oid, o in after.items() if before.get(oid) != o])
+        setattr(delta, f'removed_{field}', [oid for oid in before if oid not in after])
+    return delta
+
+def _order_quantities(items: Iterable) -> Dict[str, int]:
+    """Sums the quantities of orders or shipments per product."""
+    totals: Dict[str, int] = {}
+    for item in items:
+        totals[item.product_id] = totals.get(item.product_id, 0) + item.quantity
+    return totals
+
+def _set(series: Dict[str, List[int]], quantities: Dict[str, int], t: int, length: int):
+    """Writes the quantities of one period into per-product arrays, creating zero-filled arrays for new products."""
+    for product, quantity in quantities.items():
+        series.setdefault(product, [0] * length)[t] = quantity
+
+def _series_summary(values: List[int]) -> SeriesSummary:
+    array = np.asarray(values, dtype=float)
+    return SeriesSummary(mean=float(array.mean()), std=float(array.std()), min=float(array.min()),
+                         max=float(array.max()), last=float(array[-1]))
@@ -1,5 +1,8 @@
+import json
+import os
 import pytest
 import sys
+from app.utils.metrics import METRICS, profile
 
 def run_all_tests():
     """
@@ -21,9 +24,18 @@ def run_all_tests():
     
     # Execute pytest on the specified files
     # The '-v' flag is for verbose output, and '-s' is to show print statements.
-    result_code = pytest.main(["-v", "-s"] + test_files)
+    # Set PROFILE=cprofile (or pyinstrument) to capture a CPU profile of the whole run.
+    with profile(output_path=os.getenv("PROFILE_OUTPUT")):
+        result_code = pytest.main(["-v", "-s"] + test_files)
     
     print("--- All Demonstrations Complete ---")
+
+    # Report where the time went: LLM calls, tool and MCP calls, the solver and the simulation.
+    print("--- Performance Summary ---")
+    print(json.dumps(METRICS.summary(), indent=2))
+    if os.getenv("METRICS_PATH"):
+        with open(os.getenv("METRICS_PATH"), "w", encoding="utf-8") as f:
+            f.write(METRICS.export_prometheus())
     
     # Exit with the appropriate code to indicate success or failure
     if result_code == 0:
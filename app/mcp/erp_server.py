@@ -1,21 +1,45 @@
-from typing import List
+import threading
+from typing import Dict, List, Literal, Optional, Tuple
+import anyio
+import pydantic_core
+from pydantic import TypeAdapter
 from mcp.server.fastmcp import FastMCP
-from app.data_models.erp_models import Product, Supplier, HistoricalData, StatusResponse
+from mcp.types import CallToolResult, TextContent
+from app.data_models.erp_models import Product, Supplier, HistoricalData, HistoryAggregates, StatusResponse
 from app.data_models.supply_chain_models import SupplyChainStatus, SupplyChainNodeStatus, Order, Shipment
+from app.erp import history_encoding
+from app.erp.aggregate_views import AggregateViews
+from app.utils.concurrency import RequestLimiter
+from app.utils.metrics import METRICS
 
 # This server simulates a basic ERP system.
 mcp = FastMCP("ERP", port=8000, host="127.0.0.1")
 
+# Several crews share this server; requests beyond these bounds are rejected as busy instead of queueing without limit.
+LIMITER = RequestLimiter("erp", max_concurrency=8, max_queued=64, queue_timeout=10.0)
+
+HISTORY_ADAPTER = TypeAdapter(List[HistoricalData])
+
 class Database:
-    """A simple in-memory database using Pydantic models."""
+    """
+    A simple in-memory database using Pydantic models.
+
+    The history is an append-only log: writers append under a lock, and readers take a snapshot
+    of the records present at that moment without locking. Records are never modified once
+    appended, so a snapshot stays consistent while later periods are being recorded.
+    Aggregate views (rolling statistics, bullwhip ratios and fill rates) are updated with each append. Reading them
+    takes the write lock, because they are caught up with the history first, so the server reads them in a worker thread.
+    """
     def __init__(self):
+        self._write_lock = threading.Lock()
+        self.views = AggregateViews()
         self.products = {
             "beer": Product(name="Premium Lager", cost=10, lead_time=7)
         }
         self.suppliers = {
             "beer": [
-                Supplier(name="Brewery A", reliability_score=0.95, price=9.5),
-                Supplier(name="Brewery B", reliability_score=0.88, price=8.9),
+                Supplier(name="Brewery A", reliability_score=0.95, price=9.5, lead_time=5),
+                Supplier(name="Brewery B", reliability_score=0.88, price=8.9, lead_time=8),
             ]
         }
         self.history = [
@@ -44,35 +68,164 @@ class Database:
             )
         ]
 
+    def snapshot(self) -> Tuple[HistoricalData, ...]:
+        """Returns the historical records present at this moment; later appends do not affect it."""
+        return tuple(self.history)
+
+    def record(self, period_data: SupplyChainStatus) -> HistoricalData:
+        """
+        Appends the state of a period to the history.
+
+        Args:
+            period_data: The state of the supply chain at the end of the period.
+
+        Returns:
+            The appended historical record.
+        """
+        # Convert the live status object to a historical record
+        historical_entry = HistoricalData(
+            period=period_data.current_step,
+            nodes=period_data.nodes,
+            shipments_in_transit=period_data.shipments_in_transit
+        )
+        with self._write_lock:
+            self.history.append(historical_entry)
+            self._sync_views()
+        return historical_entry
+
+    def aggregates(self, nodes: Optional[List[str]] = None, products: Optional[List[str]] = None) -> HistoryAggregates:
+        """
+        Returns the aggregate views of the history.
+
+        Args:
+            nodes: The nodes to include, or None for all nodes.
+            products: The products to include, or None for all products.
+
+        Returns:
+            A HistoryAggregates object.
+        """
+        with self._write_lock:
+            self._sync_views()
+            return self.views.summary(nodes, products)
+
+    def _sync_views(self):
+        """Adds the records the views have not seen yet, or rebuilds the views if the history was replaced directly."""
+        processed = self.views.num_periods
+        if processed > len(self.history) or (processed and self.history[processed - 1] is not self.views.last_record):
+            self.views = AggregateViews(self.views.window)
+            processed = 0
+        for record in self.history[processed:]:
+            self.views.update(record)
+
 # Create a single instance of the database
 DB = Database()
 
+def history_result(history: Tuple[HistoricalData, ...], mode: str = "full", fields: Optional[List[str]] = None,
+                   nodes: Optional[List[str]] = None) -> CallToolResult:
+    """
+    Serialises a history snapshot into a tool result with both structured and text content.
+
+    Args:
+        history: The historical records to return.
+        mode: 'full' for complete records, 'delta' for the changes between periods, 'columnar' for
+            per-period arrays of quantities, or 'summary' for per-node statistics.
+        fields: The fields to include (see HISTORY_FIELDS), or None for all fields.
+        nodes: The nodes to include, or None for all nodes.
+
+    Returns:
+        A CallToolResult holding the encoded history under the 'result' key.
+    """
+    if mode == "full" and not fields and not nodes:
+        structured = HISTORY_ADAPTER.dump_python(list(history), mode="json")
+    elif mode == "full":
+        structured = history_encoding.project(history, fields, nodes)
+    elif mode == "delta":
+        structured = [d.model_dump(mode="json", exclude_defaults=True) for d in history_encoding.encode_deltas(history, fields, nodes)]
+    elif mode == "columnar":
+        structured = history_encoding.to_columns(history, fields, nodes).model_dump(mode="json", exclude_defaults=True)
+    elif mode == "summary":
+        structured = history_encoding.summarise(history, fields, nodes).model_dump(mode="json", exclude_defaults=True)
+    else:
+        raise ValueError(f"Unknown history mode '{mode}'; choose from 'full', 'delta', 'columnar' or 'summary'.")
+    # The compact modes are meant for prompts, so their text is not indented.
+    text = pydantic_core.to_json(structured, indent=2 if mode == "full" else None).decode()
+    METRICS.increment("erp_history_bytes_total", len(text), mode=mode)
+    return CallToolResult(content=[TextContent(type="text", text=text)], structuredContent={"result": structured})
+
 @mcp.tool()
-def get_product_info(product_id: str) -> Product:
+@LIMITER.limit
+async def get_product_info(product_id: str) -> Product:
     """Returns information about a specific product."""
     return DB.products.get(product_id)
 
 @mcp.tool()
-def get_supplier_info(product_id: str) -> List[Supplier]:
+@LIMITER.limit
+async def get_supplier_info(product_id: str) -> List[Supplier]:
     """Returns a list of suppliers for a specific product."""
     return DB.suppliers.get(product_id, [])
 
 @mcp.tool()
-def get_historical_data() -> List[HistoricalData]:
-    """Returns historical order and inventory data."""
-    return DB.history
+@LIMITER.limit
+async def get_historical_data(
+    mode: Literal["full", "delta", "columnar", "summary"] = "full",
+    fields: Optional[List[str]] = None,
+    nodes: Optional[List[str]] = None,
+    start_period: Optional[int] = None,
+    end_period: Optional[int] = None,
+) -> CallToolResult:
+    """
+    Returns historical order and inventory data under the 'result' key.
+
+    The default 'full' mode returns a list of complete period records. For long histories use a compact mode:
+    'delta' returns only what changed in each period, 'columnar' returns one array of quantities per node and
+    product, and 'summary' returns the mean, std, min, max and last value of each quantity per node.
+    `fields` restricts the output to any of 'inventory', 'incoming_orders', 'outgoing_orders' and
+    'shipments_in_transit', `nodes` to the given nodes, and `start_period`/`end_period` to a range of periods.
+    """
+    history = tuple(record for record in DB.snapshot()
+                    if (start_period is None or record.period >= start_period) and (end_period is None or record.period <= end_period))
+    # Serialising a long history is slow, so it runs in a worker thread on a snapshot and the server keeps serving other requests.
+    return await anyio.to_thread.run_sync(history_result, history, mode, fields, nodes)
+
+@mcp.tool()
+@LIMITER.limit
+async def get_aggregate_views(nodes: Optional[List[str]] = None, products: Optional[List[str]] = None) -> HistoryAggregates:
+    """
+    Returns precomputed statistics of the history per node and product, without reading the history itself.
+    For the inventory level and the quantities of orders placed and received per period it gives the mean
+    and variance over all periods and over a rolling window, the trend over the window, and the last value.
+    It also gives each node's bullwhip ratio (variance of orders placed / variance of orders received) and fill rates.
+    """
+    # Catching the views up with the history takes the write lock, so it runs in a worker thread like the history reads.
+    return await anyio.to_thread.run_sync(DB.aggregates, nodes, products)
+
+@mcp.tool()
+@LIMITER.limit
+async def get_bullwhip_ratios() -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Returns the bullwhip ratio of every node and product: the variance of the orders a node places divided by
+    the variance of the orders it receives. Values above 1 mean the node amplifies demand variability;
+    None means the node receives no orders (e.g., the retailer, whose customer demand is not recorded).
+    """
+    aggregates = await anyio.to_thread.run_sync(DB.aggregates)
+    return {node: {product: a.bullwhip_ratio for product, a in products.items()} for node, products in aggregates.nodes.items()}
 
 @mcp.tool()
-def record_period_data(period_data: SupplyChainStatus) -> StatusResponse:
+@LIMITER.limit
+async def get_fill_rates() -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Returns the fill rate of every node and product: the fraction of the order quantity it received that it has
+    fulfilled. None means the node has received no orders.
+    """
+    aggregates = await anyio.to_thread.run_sync(DB.aggregates)
+    return {node: {product: a.fill_rate for product, a in products.items()} for node, products in aggregates.nodes.items()}
+
+@mcp.tool()
+@LIMITER.limit
+async def record_period_data(period_data: SupplyChainStatus) -> StatusResponse:
     """Records the state of the Digital Twin for a given period."""
     try:
-        # Convert the live status object to a historical record
-        historical_entry = HistoricalData(
-            period=period_data.current_step,
-            nodes=period_data.nodes,
-            shipments_in_transit=period_data.shipments_in_transit
-        )
-        DB.history.append(historical_entry)
+        DB.record(period_data)
         return StatusResponse(status="success", message=f"Data for period {period_data.current_step} recorded.")
     except Exception as e:
         return StatusResponse(status="error", message=str(e))
@@ -0,0 +1,60 @@
+import os
+import random
+import threading
+from typing import Callable, Dict, List, Optional
+from app.utils.cache import TTLCache
+
+# Feed results are cached for this many seconds, so repeated lookups of a location or topic within a run agree.
+DEFAULT_TTL_SECONDS = float(os.getenv("FEED_TTL_SECONDS", "300"))
+
+def feed_seed() -> Optional[int]:
+    """Returns the seed of the mock feeds from the FEED_SEED environment variable, or None for random feeds."""
+    value = os.getenv("FEED_SEED")
+    return int(value) if value not in (None, "") else None
+
+class SignalFeed:
+    """
+    A mock feed of disruption signals (e.g., weather forecasts or news headlines), one per key.
+
+    Each lookup is cached for a TTL. With a seed, the n-th draw for a key depends only on the seed,
+    the feed, the key and n, so runs that look up the same keys get the same signals regardless of
+    the order of the lookups or how they are batched.
+    """
+
+    def __init__(self, name: str, draw: Callable[[random.Random, str], str], seed: Optional[int] = None,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = 1024):
+        """
+        Initializes the feed.
+
+        Args:
+            name: The name of the feed (e.g., 'weather').
+            draw: A function that draws the signal of a key from a random generator.
+            seed: The seed of the draws, or None for non-reproducible draws.
+            ttl_seconds: How long a drawn signal is served from the cache; 0 disables caching.
+            max_entries: The maximum number of cached keys.
+        """
+        self.name = name
+        self.draw = draw
+        self.seed = seed
+        self.cache = TTLCache(f"{name}_feed", ttl_seconds, max_entries)
+        self._random = random.Random()
+        self._draws: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str:
+        """Returns the signal of a key, from the cache if it is still fresh."""
+        normalised = key.strip().lower()
+        return self.cache.get_or_compute(normalised, lambda: self._draw(normalised))
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Returns the signals of many keys in one call, looking up each distinct key once."""
+        return {key: self.get(key) for key in dict.fromkeys(keys)}
+
+    def _draw(self, key: str) -> str:
+        if self.seed is None:
+            return self.draw(self._random, key)
+        with self._lock:
+            n = self._draws.get(key, 0)
+            self._draws[key] = n + 1
+        # String seeds are hashed with SHA-512 by `random`, so the draw is stable across processes.
+        return self.draw(random.Random(f"{self.seed}:{self.name}:{key}:{n}"), key)
@@ -1,6 +1,7 @@
 import json
-import random
+from typing import List
 from mcp.server.fastmcp import FastMCP
+from app.mcp.feeds import SignalFeed, feed_seed
 
 # This server simulates a basic news feed service.
 mcp = FastMCP("News")
@@ -21,17 +22,23 @@ NEWS_HEADLINES = {
     ]
 }
 
+# Headlines are cached per topic and reproducible when FEED_SEED is set.
+FEED = SignalFeed("news", lambda rng, topic: rng.choice(NEWS_HEADLINES.get(topic, NEWS_HEADLINES["default"])), seed=feed_seed())
+
 @mcp.tool()
 def get_latest_news(topic: str) -> str:
     """Returns mock news headlines for a given topic."""
-    headlines = NEWS_HEADLINES.get(topic.lower(), NEWS_HEADLINES["default"])
-    selected_headline = random.choice(headlines)
-    
     response = {
         "topic": topic,
-        "headline": selected_headline
+        "headline": FEED.get(topic)
     }
     return json.dumps(response, indent=2)
 
+@mcp.tool()
+def get_latest_news_batch(topics: List[str]) -> str:
+    """Returns mock news headlines for many topics in one call."""
+    response = [{"topic": topic, "headline": headline} for topic, headline in FEED.get_many(topics).items()]
+    return json.dumps(response)
+
 if __name__ == "__main__":
     mcp.run()
\ No newline at end of file
@@ -1,21 +1,30 @@
 import json
-import random
+from typing import List
 from mcp.server.fastmcp import FastMCP
+from app.mcp.feeds import SignalFeed, feed_seed
 
 # This server simulates a basic weather forecast service.
 mcp = FastMCP("Weather")
 
+POSSIBLE_FORECASTS = ["Sunny", "Cloudy", "Rain", "Heavy Rain", "Snow"]
+
+# Forecasts are cached per location and reproducible when FEED_SEED is set.
+FEED = SignalFeed("weather", lambda rng, location: rng.choice(POSSIBLE_FORECASTS), seed=feed_seed())
+
 @mcp.tool()
 def get_weather_forecast(location: str) -> str:
     """Returns a mock weather forecast for a given location."""
-    possible_forecasts = ["Sunny", "Cloudy", "Rain", "Heavy Rain", "Snow"]
-    forecast = random.choice(possible_forecasts)
-    
     response = {
         "location": location,
-        "forecast": forecast
+        "forecast": FEED.get(location)
     }
     return json.dumps(response, indent=2)
 
+@mcp.tool()
+def get_weather_forecasts(locations: List[str]) -> str:
+    """Returns mock weather forecasts for many locations in one call (e.g., every location along the supply chain's lanes)."""
+    response = [{"location": location, "forecast": forecast} for location, forecast in FEED.get_many(locations).items()]
+    return json.dumps(response)
+
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    mcp.run()
@@ -0,0 +1,240 @@
+import math
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.data_models.logistics_models import LoadPlanningRequest, LoadPlan, VehicleRoute
+from app.utils.logging_utils import get_logger
+from app.utils.metrics import timed
+
+logger = get_logger("load_planning")
+
+# A route is the list of the location indices it visits; index 0 is the depot, which every route starts and ends at.
+Route = List[int]
+
+class LoadPlanner:
+    """
+    Builds vehicle loads and routes from one depot (the capacitated vehicle routing problem).
+
+    The loads for each destination are consolidated first, and every full vehicle they fill is sent
+    directly. The remaining loads are routed with the Clarke-Wright savings or the sweep heuristic,
+    and the routes are then improved with 2-opt moves within a route and relocate moves between routes.
+    """
+
+    def __init__(self, request: LoadPlanningRequest):
+        """
+        Initializes the planner.
+
+        Args:
+            request: The LoadPlanningRequest describing the loads, locations and vehicles.
+
+        Raises:
+            ValueError: If the depot or a destination has no coordinates.
+        """
+        missing = sorted(({request.depot} | {load.destination for load in request.loads}) - set(request.coordinates))
+        if missing:
+            raise ValueError(f"No coordinates for {missing}.")
+        self.request = request
+        self.capacity = request.vehicle_capacity
+        self.max_stops = request.max_stops or math.inf
+
+        # Step 1: Consolidate the loads by destination; index 0 is the depot.
+        self.locations = [request.depot]
+        quantities: Dict[str, float] = {}
+        self.shipments: Dict[str, List[Tuple[Optional[str], float]]] = {}
+        for load in request.loads:
+            if load.destination not in quantities:
+                self.locations.append(load.destination)
+                quantities[load.destination] = 0.0
+                self.shipments[load.destination] = []
+            quantities[load.destination] += load.quantity
+            self.shipments[load.destination].append((load.shipment_id, load.quantity))
+        self.quantities = np.array([0.0] + [quantities[name] for name in self.locations[1:]])
+
+        # Step 2: Precompute the Euclidean distance matrix of all locations.
+        xy = np.array([request.coordinates[name][:2] for name in self.locations], dtype=float)
+        self.distances = np.linalg.norm(xy[:, None, :] - xy[None, :, :], axis=2)
+        self.angles = np.arctan2(xy[:, 1] - xy[0, 1], xy[:, 0] - xy[0, 0])
+
+    @timed("load_planning_seconds")
+    def plan(self) -> LoadPlan:
+        """
+        Builds the load plan with the requested heuristic.
+
+        Returns:
+            A LoadPlan with the route of every vehicle and the total distance and cost.
+        """
+        # Step 1: Send a direct vehicle for every full truckload; only the remainders are routed.
+        full_loads = np.floor(self.quantities / self.capacity + 1e-9)
+        remaining = self.quantities - full_loads * self.capacity
+        customers = [i for i in range(1, len(self.locations)) if remaining[i] > 1e-9]
+
+        # Step 2: Construct the routes and improve them.
+        construct = self._savings if self.request.method == 'savings' else self._sweep
+        routes = construct(customers, remaining)
+        if self.request.local_search:
+            routes = self._improve(routes, remaining)
+
+        # Step 3: Collect the direct and routed vehicles into the plan.
+        loaded = {i: self._assign_shipments(i, int(full_loads[i]), remaining[i] > 1e-9) for i in range(1, len(self.locations))}
+        vehicles = [self._vehicle([i], self.capacity, loaded[i][k])
+                    for i in range(1, len(self.locations)) for k in range(int(full_loads[i]))]
+        vehicles += [self._vehicle(route, float(remaining[route].sum()), [s for i in route for s in loaded[i][-1]]) for route in routes]
+        total_distance = sum(vehicle.distance for vehicle in vehicles)
+        direct_distance = float(2 * (self.distances[0] * np.ceil(self.quantities / self.capacity - 1e-9)).sum())
+        plan = LoadPlan(
+            method=self.request.method,
+            routes=vehicles,
+            vehicles=len(vehicles),
+            full_truckloads=int(full_loads.sum()),
+            total_distance=total_distance,
+            direct_distance=direct_distance,
+            total_cost=self.request.cost_per_vehicle * len(vehicles) + self.request.cost_per_distance * total_distance,
+        )
+        logger.info(
+            "Load plan: method=%s loads=%d vehicles=%d distance=%.2f direct_distance=%.2f",
+            self.request.method, len(self.request.loads), plan.vehicles, plan.total_distance, plan.direct_distance,
+            extra={"fields": {"event": "load_plan", "method": self.request.method, "loads": len(self.request.loads),
+                              "vehicles": plan.vehicles, "total_distance": plan.total_distance,
+                              "direct_distance": plan.direct_distance}}
+        )
+        return plan
+
+    def _savings(self, customers: List[int], quantities: np.ndarray) -> List[Route]:
+        """Builds routes with the parallel Clarke-Wright savings heuristic."""
+        routes: Dict[int, Route] = {i: [i] for i in customers}
+        route_of = {i: i for i in customers}
+        loads = {i: float(quantities[i]) for i in customers}
+        if len(customers) < 2:
+            return list(routes.values())
+
+        # Joining i and j into one route saves the trips from the depot to j and from i back to the depot.
+        index = np.array(customers)
+        d = self.distances
+        savings = d[0, index][:, None] + d[0, index][None, :] - d[np.ix_(index, index)]
+        first, second = np.triu_indices(len(index), k=1)
+        for k in np.argsort(-savings[first, second], kind='stable'):
+            if savings[first[k], second[k]] <= 0:
+                break
+            i, j = int(index[first[k]]), int(index[second[k]])
+            ri, rj = route_of[i], route_of[j]
+            if ri == rj or loads[ri] + loads[rj] > self.capacity + 1e-9 or len(routes[ri]) + len(routes[rj]) > self.max_stops:
+                continue
+            a, b = routes[ri], routes[rj]
+            # Both customers must be at an end of their routes; the routes are turned so that i is last and j first.
+            if a[-1] != i:
+                if a[0] != i:
+                    continue
+                a.reverse()
+            if b[0] != j:
+                if b[-1] != j:
+                    continue
+                b.reverse()
+            a.extend(b)
+            loads[ri] += loads.pop(rj)
+            del routes[rj]
+            for customer in b:
+                route_of[customer] = ri
+        return list(routes.values())
+
+    def _sweep(self, customers: List[int], quantities: np.ndarray) -> List[Route]:
+        """Builds routes by sweeping around the depot by angle and starting a new vehicle whenever one is full."""
+        routes: List[Route] = []
+        route: Route = []
+        load = 0.0
+        for i in sorted(customers, key=lambda c: self.angles[c]):
+            if route and (load + quantities[i] > self.capacity + 1e-9 or len(route) >= self.max_stops):
+                routes.append(route)
+                route, load = [], 0.0
+            route.append(i)
+            load += quantities[i]
+        if route:
+            routes.append(route)
+        return routes
+
+    def _improve(self, routes: List[Route], quantities: np.ndarray) -> List[Route]:
+        """Improves the routes with first-improvement 2-opt and relocate moves until no move helps."""
+        routes = [list(route) for route in routes]
+        loads = [float(quantities[route].sum()) for route in routes]
+        for _ in range(self.request.max_iterations):
+            improved = False
+            for route in routes:
+                improved |= self._two_opt(route)
+            improved |= self._relocate(routes, loads, quantities)
+            if not improved:
+                break
+        return [route for route in routes if route]
+
+    def _two_opt(self, route: Route) -> bool:
+        """Reverses segments of a route while that shortens it. Returns True if the route changed."""
+        d = self.distances
+        path = [0] + route + [0]
+        changed = False
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, len(path) - 2):
+                for j in range(i + 1, len(path) - 1):
+                    delta = d[path[i - 1], path[j]] + d[path[i], path[j + 1]] - d[path[i - 1], path[i]] - d[path[j], path[j + 1]]
+                    if delta < -1e-9:
+                        path[i:j + 1] = path[i:j + 1][::-1]
+                        improved = changed = True
+        route[:] = path[1:-1]
+        return changed
+
+    def _relocate(self, routes: List[Route], loads: List[float], quantities: np.ndarray) -> bool:
+        """Moves single customers to the cheapest position in another route while that shortens the total. Returns True on any move."""
+        d = self.distances
+        changed = False
+        for a, source in enumerate(routes):
+            position = 0
+            while position < len(source):
+                customer = source[position]
+                before = source[position - 1] if position > 0 else 0
+                after = source[position + 1] if position + 1 < len(source) else 0
+                removal_gain = d[before, customer] + d[customer, after] - d[before, after]
+                best: Tuple[float, int, int] = (-1e-9, -1, -1)
+                for b, target in enumerate(routes):
+                    if b == a or not target or loads[b] + quantities[customer] > self.capacity + 1e-9 or len(target) >= self.max_stops:
+                        continue
+                    path = [0] + target + [0]
+                    costs = d[path[:-1], customer] + d[customer, path[1:]] - d[path[:-1], path[1:]]
+                    k = int(np.argmin(costs))
+                    gain = costs[k] - removal_gain
+                    if gain < best[0]:
+                        best = (gain, b, k)
+                if best[1] < 0:
+                    position += 1
+                    continue
+                _, b, k = best
+                routes[b].insert(k, source.pop(position))
+                loads[a] -= quantities[customer]
+                loads[b] += quantities[customer]
+                changed = True
+        return changed
+
+    def _assign_shipments(self, location: int, full_loads: int, has_remainder: bool) -> List[List[str]]:
+        """
+        Assigns the shipments for a location to its vehicles: the full truckloads in turn, then the routed remainder.
+        The shipments fill the vehicles in the order they were given, and each one is listed once, on the vehicle
+        that loads its first unit, even if it is split over several vehicles.
+
+        Returns:
+            The shipment IDs loaded on each vehicle of the location.
+        """
+        vehicles = [[] for _ in range(full_loads + has_remainder)]
+        loaded = 0.0
+        for shipment_id, quantity in self.shipments[self.locations[location]]:
+            if shipment_id:
+                vehicles[min(int(loaded / self.capacity + 1e-9), len(vehicles) - 1)].append(shipment_id)
+            loaded += quantity
+        return vehicles
+
+    def _vehicle(self, route: Route, quantity: float, shipment_ids: List[str]) -> VehicleRoute:
+        """Describes the vehicle that drives a route."""
+        path = [0] + route + [0]
+        return VehicleRoute(
+            stops=[self.locations[i] for i in route],
+            quantity=quantity,
+            distance=float(self.distances[path[:-1], path[1:]].sum()),
+            utilisation=quantity / self.capacity,
+            shipment_ids=shipment_ids,
+        )
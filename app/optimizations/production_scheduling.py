@@ -0,0 +1,205 @@
+import math
+from typing import Tuple
+import numpy as np
+import pulp
+from app.data_models.production_models import ProductionCapacity, ProductionScheduleRequest, ProductionSchedule
+from app.utils.logging_utils import get_logger
+from app.utils.metrics import timed
+
+logger = get_logger("production_scheduling")
+
+def max_batch_quantity(config: ProductionCapacity) -> float:
+    """
+    Returns the largest quantity of a single product that fits in one period after its setup.
+
+    Raises:
+        ValueError: If not even one batch fits.
+    """
+    quantity = math.floor((config.capacity - config.setup_time) / config.batch_size) * config.batch_size
+    if quantity <= 0:
+        raise ValueError(f"A capacity of {config.capacity} cannot fit a setup of {config.setup_time} and a batch of {config.batch_size}.")
+    return float(quantity)
+
+def batch_quantity(quantity: float, config: ProductionCapacity) -> float:
+    """Rounds a requested quantity up to whole batches."""
+    return float(math.ceil(quantity / config.batch_size - 1e-9) * config.batch_size) if quantity > 0 else 0.0
+
+def capacity_load(quantities: np.ndarray, config: ProductionCapacity) -> float:
+    """Returns the capacity used by producing the given quantities of each product in one period, including setups."""
+    produced = quantities > 0
+    batches = np.ceil(quantities[produced] / config.batch_size - 1e-9) * config.batch_size
+    return float(batches.sum() + config.setup_time * np.count_nonzero(produced))
+
+def allocate_capacity(requested: np.ndarray, config: ProductionCapacity, priority: np.ndarray = None) -> np.ndarray:
+    """
+    Splits one period's capacity over the requested quantities of each product.
+    Products are served in order of decreasing priority (by default, the largest request first). Each product
+    that is produced costs one setup, and its quantity is rounded up to whole batches if that fits, otherwise
+    it gets as many whole batches as the remaining capacity allows.
+
+    Args:
+        requested: The requested quantity of each product.
+        config: The production capacity.
+        priority: An optional priority of each product.
+
+    Returns:
+        The quantity of each product produced in the period.
+    """
+    produced = np.zeros_like(requested, dtype=float)
+    remaining = config.capacity
+    for j in np.argsort(-(requested if priority is None else priority), kind='stable'):
+        available = remaining - config.setup_time
+        if requested[j] <= 0 or available < config.batch_size:
+            continue
+        produced[j] = min(batch_quantity(requested[j], config), math.floor(available / config.batch_size) * config.batch_size)
+        remaining -= config.setup_time + produced[j]
+    return produced
+
+class ProductionScheduler:
+    """
+    Schedules the production of several products on one capacity-constrained resource over several periods
+    (the capacitated lot-sizing problem with setup times and batch sizes).
+
+    The heuristic pre-builds the requirements that overload a period in earlier periods, moving the products
+    that are cheapest to hold first, merges small lots into the period before when that saves a setup, and then
+    allocates each period's capacity with `allocate_capacity`.
+    The MILP solves the same problem exactly with PuLP and CBC.
+    """
+
+    def __init__(self, request: ProductionScheduleRequest):
+        """
+        Initializes the scheduler.
+
+        Args:
+            request: The ProductionScheduleRequest describing the requirements, capacity and costs.
+
+        Raises:
+            ValueError: If no product is given or a single batch does not fit in the capacity.
+        """
+        if not request.demand:
+            raise ValueError("The schedule needs the demand of at least one product.")
+        self.request = request
+        self.config = request.capacity
+        self.max_quantity = max_batch_quantity(self.config)
+        self.products = list(request.demand)
+        self.periods = max(len(d) for d in request.demand.values())
+        # Demand is a products × periods matrix; shorter series are padded with zeros.
+        self.demand = np.zeros((len(self.products), self.periods))
+        for j, product in enumerate(self.products):
+            self.demand[j, :len(request.demand[product])] = request.demand[product]
+        self.initial_inventory = np.array([request.initial_inventory.get(p, 0.0) for p in self.products])
+        self.holding_costs = np.array([request.holding_costs.get(p, request.default_holding_cost) for p in self.products])
+        self.backorder_costs = np.array([request.backorder_costs.get(p, request.default_backorder_cost) for p in self.products])
+
+    @timed("production_schedule_seconds")
+    def schedule(self) -> ProductionSchedule:
+        """
+        Builds the production schedule with the requested method.
+
+        Returns:
+            A ProductionSchedule with the production quantities, the resulting inventory and backlog, and the costs.
+        """
+        if self.request.method == 'milp':
+            production, status = self._milp()
+        else:
+            production, status = self._heuristic(), "Heuristic"
+        schedule = self._evaluate(production, status)
+        logger.info(
+            "Production schedule: method=%s status=%s periods=%d products=%d total_cost=%.2f",
+            self.request.method, status, self.periods, len(self.products), schedule.total_cost,
+            extra={"fields": {"event": "production_schedule", "method": self.request.method, "status": status,
+                              "periods": self.periods, "products": len(self.products), "total_cost": schedule.total_cost}}
+        )
+        return schedule
+
+    def _heuristic(self) -> np.ndarray:
+        """Returns the production quantities of the pre-build heuristic as a products × periods matrix."""
+        # Step 1: Net the requirements against the initial inventory.
+        plan = np.zeros_like(self.demand)
+        stock = self.initial_inventory.copy()
+        for t in range(self.periods):
+            used = np.minimum(stock, self.demand[:, t])
+            stock -= used
+            plan[:, t] = self.demand[:, t] - used
+
+        # Step 2: Walking backwards, move the overload of each period to the period before, cheapest to hold first.
+        for t in range(self.periods - 1, 0, -1):
+            for j in np.argsort(self.holding_costs, kind='stable'):
+                excess = capacity_load(plan[:, t], self.config) - self.config.capacity
+                if excess <= 0:
+                    break
+                moved = min(plan[j, t], excess)
+                plan[j, t] -= moved
+                plan[j, t - 1] += moved
+
+        # Step 3: Walking forwards, pull a later requirement into the period before whenever holding it for one period
+        # costs less than the setup it saves and the capacity allows it.
+        for t in range(self.periods - 1):
+            for j in range(len(self.products)):
+                if plan[j, t] <= 0 or plan[j, t + 1] <= 0 or self.holding_costs[j] * plan[j, t + 1] >= self.config.setup_cost:
+                    continue
+                merged = plan[:, t].copy()
+                merged[j] += plan[j, t + 1]
+                if capacity_load(merged, self.config) <= self.config.capacity:
+                    plan[j, t], plan[j, t + 1] = merged[j], 0
+
+        # Step 4: Walking forwards, produce towards the cumulative plan; shortfalls carry over and batch surpluses are netted.
+        planned = np.cumsum(plan, axis=1)
+        produced = np.zeros(len(self.products))
+        production = np.zeros_like(self.demand)
+        for t in range(self.periods):
+            requested = np.maximum(planned[:, t] - produced, 0)
+            production[:, t] = allocate_capacity(requested, self.config, priority=self.backorder_costs)
+            produced += production[:, t]
+        return production
+
+    def _milp(self) -> Tuple[np.ndarray, str]:
+        """Solves the lot-sizing MILP and returns the production quantities and the solver status."""
+        P, T, config = range(len(self.products)), range(self.periods), self.config
+        max_batches = self.max_quantity / config.batch_size
+        model = pulp.LpProblem("production_scheduling", pulp.LpMinimize)
+        batches = pulp.LpVariable.dicts("batches", (P, T), lowBound=0, upBound=max_batches, cat="Integer")
+        setup = pulp.LpVariable.dicts("setup", (P, T), cat="Binary")
+        inventory = pulp.LpVariable.dicts("inventory", (P, T), lowBound=0)
+        backlog = pulp.LpVariable.dicts("backlog", (P, T), lowBound=0)
+
+        model += pulp.lpSum(self.holding_costs[j] * inventory[j][t] + self.backorder_costs[j] * backlog[j][t]
+                            + config.setup_cost * setup[j][t] for j in P for t in T)
+        for t in T:
+            model += pulp.lpSum(config.batch_size * batches[j][t] + config.setup_time * setup[j][t] for j in P) <= config.capacity
+            for j in P:
+                previous = self.initial_inventory[j] if t == 0 else inventory[j][t - 1] - backlog[j][t - 1]
+                model += inventory[j][t] - backlog[j][t] == previous + config.batch_size * batches[j][t] - self.demand[j, t]
+                model += batches[j][t] <= max_batches * setup[j][t]
+
+        model.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=self.request.time_limit))
+        status = pulp.LpStatus[model.status]
+        if batches[0][0].varValue is None:
+            raise ValueError(f"The MILP found no solution (status: {status}).")
+        production = np.array([[config.batch_size * round(batches[j][t].varValue) for t in T] for j in P], dtype=float)
+        return production, status
+
+    def _evaluate(self, production: np.ndarray, status: str) -> ProductionSchedule:
+        """Computes the inventory, backlog, capacity utilisation and costs that result from the production quantities."""
+        net = self.initial_inventory[:, None] + np.cumsum(production - self.demand, axis=1)
+        inventory, backlog = np.maximum(net, 0), np.maximum(-net, 0)
+        produced = production > 0
+        setups = int(np.count_nonzero(produced))
+        holding_cost = float((self.holding_costs[:, None] * inventory).sum())
+        backorder_cost = float((self.backorder_costs[:, None] * backlog).sum())
+        setup_cost = setups * self.config.setup_cost
+        load = production.sum(axis=0) + self.config.setup_time * produced.sum(axis=0)
+        as_dict = lambda matrix: {p: [float(v) for v in row] for p, row in zip(self.products, matrix)}
+        return ProductionSchedule(
+            method=self.request.method,
+            status=status,
+            production=as_dict(production),
+            inventory=as_dict(inventory),
+            backlog=as_dict(backlog),
+            utilisation=[float(u) for u in load / self.config.capacity],
+            setups=setups,
+            holding_cost=holding_cost,
+            backorder_cost=backorder_cost,
+            setup_cost=setup_cost,
+            total_cost=holding_cost + backorder_cost + setup_cost,
+        )
@@ -0,0 +1,161 @@
+from typing import List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+from app.data_models.supplier_models import SourcingRequest, SourcingPlan, SupplierScore, SupplierAllocation
+from app.utils.logging_utils import get_logger
+from app.utils.metrics import timed
+
+logger = get_logger("supplier_allocation")
+
+# The disruption risk signalled by each forecast of the weather feed.
+WEATHER_RISK = {'sunny': 0.0, 'cloudy': 0.05, 'rain': 0.2, 'heavy rain': 0.5, 'snow': 0.6}
+
+# The disruption risk signalled by keywords in the headlines of the news feed.
+NEWS_RISK_KEYWORDS = {'strike': 0.6, 'instability': 0.5, 'delay': 0.4, 'tariff': 0.3, 'surge': 0.3, 'regulation': 0.2, 'stalemate': 0.2}
+
+def disruption_risk(weather_forecast: Optional[str], news_headlines: List[str]) -> float:
+    """
+    Derives a disruption risk between 0 and 1 from a weather forecast and news headlines.
+    Each signal is treated as an independent chance of disruption, so the risks combine as 1 - Π(1 - r).
+
+    Args:
+        weather_forecast: The forecast from the weather feed, or None.
+        news_headlines: The headlines from the news feed.
+
+    Returns:
+        The combined disruption risk.
+    """
+    survival = 1.0 - WEATHER_RISK.get((weather_forecast or '').strip().lower(), 0.0)
+    for headline in news_headlines:
+        text = headline.lower()
+        survival *= 1.0 - max((r for keyword, r in NEWS_RISK_KEYWORDS.items() if keyword in text), default=0.0)
+    return 1.0 - survival
+
+class SupplierSourcingEngine:
+    """
+    Scores all suppliers of all products in one vectorised pass and allocates the demand of each product across them.
+
+    Every criterion is normalised among the suppliers of the same product, so a supplier is only compared
+    with its competitors. The allocation is a linear program that minimises the risk-adjusted cost
+    (price plus the expected cost of unreliability, lead time and disruption risk), subject to the
+    supplier capacities and a maximum share per supplier, which enforces split sourcing.
+    """
+
+    def __init__(self, request: SourcingRequest):
+        """
+        Initializes the engine.
+
+        Args:
+            request: The SourcingRequest with the candidate suppliers and the demand.
+
+        Raises:
+            ValueError: If no supplier is given.
+        """
+        if not request.suppliers:
+            raise ValueError("At least one supplier is needed.")
+        self.request = request
+        suppliers = request.suppliers
+        # Products are coded as integers so that the per-product statistics are grouped reductions over flat arrays.
+        self.products, self.codes = np.unique([s.product_id for s in suppliers], return_inverse=True)
+        self.price = np.array([s.price for s in suppliers], dtype=float)
+        self.reliability = np.clip(np.array([s.reliability_score for s in suppliers], dtype=float), 0, 1)
+        self.lead_time = np.array([request.default_lead_time if s.lead_time is None else s.lead_time for s in suppliers], dtype=float)
+        self.capacity = np.array([np.inf if s.capacity is None else s.capacity for s in suppliers], dtype=float)
+        self.risk = np.array([s.risk if s.risk is not None else disruption_risk(s.weather_forecast, s.news_headlines)
+                              for s in suppliers], dtype=float)
+        self.price_score = self._lower_is_better(self.price)
+        self.lead_time_score = self._lower_is_better(self.lead_time)
+
+    @timed("supplier_sourcing_seconds")
+    def run(self) -> SourcingPlan:
+        """
+        Scores the suppliers and, if a demand is given, allocates it.
+
+        Returns:
+            A SourcingPlan with the scores, the allocations and the cost.
+        """
+        scores, unit_cost = self._score()
+        plan = SourcingPlan(scores=self._score_models(scores, unit_cost))
+        if self.request.demand:
+            self._allocate(plan, scores, unit_cost)
+        logger.info(
+            "Supplier sourcing: suppliers=%d products=%d status=%s total_cost=%.2f",
+            len(self.price), len(self.products), plan.status, plan.total_cost,
+            extra={"fields": {"event": "supplier_sourcing", "suppliers": len(self.price), "products": len(self.products),
+                              "status": plan.status, "total_cost": plan.total_cost, "unmet_demand": plan.unmet_demand}}
+        )
+        return plan
+
+    def _score(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the weighted score and the risk-adjusted unit cost of every supplier as arrays."""
+        weights = self.request.weights
+        total = weights.price + weights.reliability + weights.lead_time + weights.risk or 1.0
+        scores = (weights.price * self.price_score + weights.reliability * self.reliability
+                  + weights.lead_time * self.lead_time_score + weights.risk * (1 - self.risk)) / total
+        request = self.request
+        unit_cost = (self.price + request.reliability_penalty * (1 - self.reliability)
+                     + request.lead_time_cost * self.lead_time + request.risk_penalty * self.risk)
+        return scores, unit_cost
+
+    def _lower_is_better(self, values: np.ndarray) -> np.ndarray:
+        """Scales values to [0, 1] among the suppliers of the same product, 1 being the lowest value."""
+        low = np.full(len(self.products), np.inf)
+        high = np.full(len(self.products), -np.inf)
+        np.minimum.at(low, self.codes, values)
+        np.maximum.at(high, self.codes, values)
+        span = (high - low)[self.codes]
+        # If all suppliers of a product are equal on a criterion, they all get the full score.
+        return np.where(span > 0, (high[self.codes] - values) / np.where(span > 0, span, 1), 1.0)
+
+    def _ranks(self, scores: np.ndarray) -> np.ndarray:
+        """Returns the rank of every supplier among the suppliers of its product, 1 being the best score."""
+        order = np.lexsort((-scores, self.codes))
+        ranks = np.empty(len(scores), dtype=int)
+        group_start = np.searchsorted(self.codes[order], self.codes[order], side='left')
+        ranks[order] = np.arange(len(scores)) - group_start + 1
+        return ranks
+
+    def _score_models(self, scores: np.ndarray, unit_cost: np.ndarray) -> List[SupplierScore]:
+        """Builds the score models, ordered by product and rank."""
+        ranks = self._ranks(scores)
+        suppliers = self.request.suppliers
+        return [
+            SupplierScore(name=suppliers[i].name, product_id=suppliers[i].product_id, score=float(scores[i]), rank=int(ranks[i]),
+                          price_score=float(self.price_score[i]), lead_time_score=float(self.lead_time_score[i]),
+                          reliability_score=float(self.reliability[i]), risk=float(self.risk[i]), unit_cost=float(unit_cost[i]))
+            for i in np.lexsort((ranks, self.codes))
+        ]
+
+    def _allocate(self, plan: SourcingPlan, scores: np.ndarray, unit_cost: np.ndarray):
+        """Solves the split-sourcing LP and records the allocations, cost and unmet demand in the plan."""
+        request = self.request
+        demand = np.array([request.demand.get(p, 0.0) for p in self.products], dtype=float)
+        unknown = sorted(set(request.demand) - set(self.products))
+        n, m = len(self.price), len(self.products)
+
+        # Step 1: One variable per supplier plus one shortage variable per product, whose cost exceeds every supplier's.
+        eligible = scores >= request.min_score
+        upper = np.where(eligible, np.minimum(self.capacity, request.max_share * demand[self.codes]), 0.0)
+        shortage_cost = 10 * (unit_cost.max() + 1)
+        cost = np.concatenate([unit_cost, np.full(m, shortage_cost)])
+        # Each product's suppliers and its shortage add up to its demand.
+        equality = sparse.hstack([sparse.csr_matrix((np.ones(n), (self.codes, np.arange(n))), shape=(m, n)), sparse.identity(m)])
+        bounds = np.column_stack([np.zeros(n + m), np.concatenate([upper, demand])])
+
+        # Step 2: Solve with HiGHS and read off the allocation.
+        result = linprog(cost, A_eq=equality, b_eq=demand, bounds=bounds, method='highs')
+        plan.status = "Optimal" if result.status == 0 else result.message
+        if result.status != 0:
+            return
+        quantities, shortage = result.x[:n], result.x[n:]
+        plan.total_cost = float(unit_cost @ quantities)
+        plan.unmet_demand = {str(p): float(s) for p, s in zip(self.products, shortage) if s > 1e-9}
+        plan.unmet_demand.update({p: float(request.demand[p]) for p in unknown})
+        suppliers = request.suppliers
+        allocated = np.flatnonzero(quantities > 1e-9)
+        plan.allocations = [
+            SupplierAllocation(name=suppliers[i].name, product_id=suppliers[i].product_id, quantity=float(quantities[i]),
+                               share=float(quantities[i] / demand[self.codes[i]]), unit_cost=float(unit_cost[i]))
+            for i in allocated[np.lexsort((-quantities[allocated], self.codes[allocated]))]
+        ]
@@ -4,12 +4,14 @@ import sys
 from app.data_models.optimization_models import OptimizationProblem, OptimizationResult
 from app.utils.llm_utils import get_llm
 from app.utils.config import get_prompts_config
+from app.utils.metrics import timed
 
 class SupplyChainOptimizer:
     """
     Handles the dynamic generation and execution of the PuLP optimization model.
     """
 
+    @timed("optimizer_solve_seconds")
     def solve(self, optimization_problem: OptimizationProblem) -> OptimizationResult:
         """
         Generates, executes, and parses the result of the optimization script.
@@ -26,18 +28,20 @@ class SupplyChainOptimizer:
         self._log_problem(optimization_problem)
 
         # Step 1: Use the LLM to generate the Python script from the problem description.
-        script_code = self._generate_pulp_script(optimization_problem.problem_description)
+        with timed("optimizer_stage_seconds", stage="generate_script"):
+            script_code = self._generate_pulp_script(optimization_problem.problem_description)
         self._log_script(script_code)
 
         try:
             # Step 2: Execute the dynamically generated script in a sandboxed subprocess.
             # This is a critical security measure to prevent arbitrary code execution.
-            result = subprocess.run(
-                [sys.executable, "-c", script_code],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            with timed("optimizer_stage_seconds", stage="execute_script"):
+                result = subprocess.run(
+                    [sys.executable, "-c", script_code],
+                    capture_output=True,
+                    text=True,
+                    check=True
+                )
 
             # Step 3: Parse the JSON output from the script's stdout.
             output = json.loads(result.stdout)
@@ -0,0 +1,280 @@
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+from app.data_models.sustainability_report_models import (
+    CheckResult, EvaluationSection, Recommendation, SustainabilityReport,
+    GuideRule, ListedSupplier, ProposedAction
+)
+
+GUIDE_PATH = 'knowledge/sustainability_guide.md'
+
+# Patterns used to parse the markdown guide.
+RULE_PATTERN = re.compile(r"^- \*\*(Rule|Regulation) (\d+\.\d+) \(([^)]+)\):\*\*\s*(.+)$")
+SUPPLIER_PATTERN = re.compile(r"^- \*\*([^*]+)\*\*\s*$")
+SUPPLIER_FIELD_PATTERN = re.compile(r"^\s+- \*\*(\w+):\*\*\s*(.+)$")
+EMBARGO_PATTERN = re.compile(r"^- \*\*Embargoed:\*\*\s*(.+)$")
+
+# Patterns used to extract facts from a free-text proposed action.
+SOURCING_PATTERN = re.compile(r"\b(source|sourcing|buy|purchase|procure|order)\b", re.IGNORECASE)
+SUPPLIER_NAME_PATTERN = re.compile(r"supplier\s+'([^']+?)'", re.IGNORECASE)
+QUANTITY_PATTERN = re.compile(r"(\d+)\s+units?\s+of\s+'?([\w\- ]+?)'?\s+(?:from|to|by|for)\b", re.IGNORECASE)
+LOCATION_PATTERN = re.compile(r"\b(?:based|located)\s+in\s+([A-Z][\w\-]*(?:\s+[A-Z][\w\-]*)*)")
+LOW_EMISSION_MODES = ("low-emission", "electric", "rail", "sea freight", "barge")
+HIGH_EMISSION_MODES = ("air freight", "air cargo", "express air", "diesel")
+
+# A predicate returns the check result and its justification for a parsed action.
+Predicate = Callable[['SustainabilityRuleEngine', ProposedAction], Tuple[str, str]]
+PREDICATES: Dict[str, Predicate] = {}
+
+def predicate(rule_id: str):
+    """Registers a deterministic predicate for the rule with the given ID (e.g., 'Rule 1.3')."""
+    def decorator(func: Predicate) -> Predicate:
+        PREDICATES[rule_id] = func
+        return func
+    return decorator
+
+class SustainabilityRuleEngine:
+    """
+    A deterministic pre-filter for the sustainability and compliance evaluation.
+
+    The rules in the sustainability guide are compiled once into predicates over a
+    structured `ProposedAction`. Actions that the predicates decide conclusively are
+    answered directly, so that only incomplete or ambiguous cases need the LLM flow.
+    """
+
+    def __init__(self, guide_path: str = GUIDE_PATH):
+        """
+        Loads and compiles the rules from the sustainability guide.
+
+        Args:
+            guide_path: The path to the markdown guide containing the rules.
+        """
+        self.guide_path = guide_path
+        self.rules: List[GuideRule] = []
+        self.suppliers: Dict[str, ListedSupplier] = {}
+        self.embargoed_regions: List[str] = []
+        self._mtime: float = 0.0
+        self._compiled: List[Tuple[GuideRule, Optional[Predicate]]] = []
+        self._supplier_pattern: Optional[re.Pattern] = None
+        self._embargo_pattern: Optional[re.Pattern] = None
+        self.load()
+
+    def load(self):
+        """Parses the guide into rules, listed suppliers and restricted regions, and compiles the predicates."""
+        with open(self.guide_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self._mtime = os.path.getmtime(self.guide_path)
+
+        rules, suppliers, embargoed = [], {}, []
+        current_supplier = None
+        for line in lines:
+            if match := RULE_PATTERN.match(line):
+                kind, number, name, text = match.groups()
+                section = 'sustainability' if kind == 'Rule' else 'compliance'
+                rules.append(GuideRule(rule_id=f"{kind} {number}", name=name, text=text, section=section))
+                current_supplier = None
+            elif match := EMBARGO_PATTERN.match(line):
+                embargoed.extend(region.strip() for region in match.group(1).split(',') if region.strip())
+                current_supplier = None
+            elif match := SUPPLIER_PATTERN.match(line):
+                current_supplier = ListedSupplier(name=match.group(1).strip())
+                suppliers[current_supplier.name.lower()] = current_supplier
+            elif current_supplier and (match := SUPPLIER_FIELD_PATTERN.match(line)):
+                field, value = match.group(1).lower(), match.group(2).replace('*', '').strip()
+                if field in ('location', 'status', 'notes'):
+                    setattr(current_supplier, field, value)
+
+        self.rules, self.suppliers, self.embargoed_regions = rules, suppliers, embargoed
+        self._compiled = [(rule, PREDICATES.get(rule.rule_id)) for rule in rules]
+        # A single alternation lets listed suppliers be found by name anywhere in the action.
+        names = sorted((s.name for s in suppliers.values()), key=len, reverse=True)
+        self._supplier_pattern = re.compile("|".join(re.escape(n) for n in names), re.IGNORECASE) if names else None
+        # Regions only match as whole words, so that e.g. 'Tirana' does not match 'Iran'.
+        regions = "|".join(re.escape(r) for r in embargoed)
+        self._embargo_pattern = re.compile(rf"\b(?:{regions})\b", re.IGNORECASE) if embargoed else None
+
+    def reload_if_changed(self):
+        """Recompiles the rules if the guide has been modified since it was last loaded."""
+        if os.path.getmtime(self.guide_path) != self._mtime:
+            self.load()
+
+    def parse_action(self, proposed_action: str) -> ProposedAction:
+        """
+        Extracts the structured facts the predicates operate on from a free-text action.
+
+        Args:
+            proposed_action: The proposed supply chain action.
+
+        Returns:
+            A ProposedAction object with the extracted facts.
+        """
+        action = ProposedAction(text=proposed_action, is_sourcing=bool(SOURCING_PATTERN.search(proposed_action)))
+
+        if match := SUPPLIER_NAME_PATTERN.search(proposed_action):
+            action.supplier = match.group(1).strip()
+        elif self._supplier_pattern and (match := self._supplier_pattern.search(proposed_action)):
+            action.supplier = match.group(0)
+
+        if match := QUANTITY_PATTERN.search(proposed_action):
+            action.quantity, action.product = int(match.group(1)), match.group(2).strip()
+        if match := LOCATION_PATTERN.search(proposed_action):
+            action.location = match.group(1)
+
+        lowered = proposed_action.lower()
+        for mode in HIGH_EMISSION_MODES + LOW_EMISSION_MODES:
+            if mode in lowered:
+                action.transport_mode = mode
+                break
+        return action
+
+    def listed_supplier(self, action: ProposedAction) -> Optional[ListedSupplier]:
+        """Returns the Ethical Suppliers List entry for the action's supplier, if it is listed."""
+        if not action.supplier:
+            return None
+        return self.suppliers.get(action.supplier.lower())
+
+    def is_embargoed(self, region: Optional[str]) -> bool:
+        """Checks whether a location or text names one of the restricted regions as a whole word."""
+        if not region or self._embargo_pattern is None:
+            return False
+        return bool(self._embargo_pattern.search(region))
+
+    def evaluate_checks(self, proposed_action: str) -> Dict[str, List[CheckResult]]:
+        """
+        Runs every compiled rule against the proposed action.
+        Rules without a deterministic predicate are reported as INCOMPLETE.
+
+        Args:
+            proposed_action: The proposed supply chain action.
+
+        Returns:
+            A dictionary mapping the section name ('sustainability', 'compliance') to its checks.
+        """
+        self.reload_if_changed()
+        action = self.parse_action(proposed_action)
+        checks = {'sustainability': [], 'compliance': []}
+        for rule, rule_predicate in self._compiled:
+            if rule_predicate is None:
+                result, reason = 'INCOMPLETE', "No deterministic predicate exists for this rule; it requires a manual review."
+            else:
+                result, reason = rule_predicate(self, action)
+            checks[rule.section].append(CheckResult(check_name=rule.name, rule=rule.rule_id, result=result, reason=reason))
+        return checks
+
+    def evaluate(self, proposed_action: str) -> Optional[SustainabilityReport]:
+        """
+        Evaluates a proposed action and returns a report if the rules decide it conclusively.
+
+        An action is approved if every check passes, and rejected as soon as any check fails.
+        If neither holds, some checks are INCOMPLETE and the LLM flow must make the decision.
+
+        Args:
+            proposed_action: The proposed supply chain action.
+
+        Returns:
+            A SustainabilityReport object, or None if the action needs the LLM evaluation flow.
+        """
+        checks = self.evaluate_checks(proposed_action)
+        all_checks = checks['sustainability'] + checks['compliance']
+        failed = [check for check in all_checks if check.result == 'FAIL']
+
+        if failed:
+            decision = 'REJECT'
+            justification = "Rejected by the deterministic rule engine: " + "; ".join(f"{c.rule} ({c.check_name}): {c.reason}" for c in failed)
+        elif all(check.result == 'PASS' for check in all_checks):
+            decision = 'APPROVE'
+            justification = "Approved by the deterministic rule engine: all sustainability rules and compliance regulations pass."
+        else:
+            return None
+
+        return SustainabilityReport(
+            sustainability_check=self._section(checks['sustainability']),
+            compliance_check=self._section(checks['compliance']),
+            recommendation=Recommendation(decision=decision, justification=justification)
+        )
+
+    @staticmethod
+    def _section(checks: List[CheckResult]) -> EvaluationSection:
+        """Builds an evaluation section that passes only if all of its checks pass."""
+        status = 'PASS' if all(check.result == 'PASS' for check in checks) else 'FAIL'
+        return EvaluationSection(status=status, checks=checks)
+
+# --- Rule Predicates ---
+# Each predicate maps a rule of the guide onto the facts extracted from the proposed action.
+
+@predicate("Rule 1.1")
+def carbon_footprint(engine: SustainabilityRuleEngine, action: ProposedAction) -> Tuple[str, str]:
+    if action.transport_mode is None:
+        return 'PASS', "The action does not involve a carrier selection."
+    if action.transport_mode in LOW_EMISSION_MODES:
+        return 'PASS', f"The action uses a low-emission transport option ({action.transport_mode})."
+    return 'INCOMPLETE', f"The action uses a high-emission transport option ({action.transport_mode}); alternatives must be assessed."
+
+@predicate("Rule 1.2")
+def waste_reduction(engine: SustainabilityRuleEngine, action: ProposedAction) -> Tuple[str, str]:
+    if not action.is_sourcing:
+        return 'PASS', "The action does not involve sourcing from a supplier."
+    supplier = engine.listed_supplier(action)
+    if supplier and 'recyclable packaging' in supplier.notes.lower():
+        return 'PASS', f"'{supplier.name}' uses recyclable packaging."
+    return 'INCOMPLETE', "The packaging practices of the supplier are unknown."
+
+@predicate("Rule 1.3")
+def ethical_sourcing(engine: SustainabilityRuleEngine, action: ProposedAction) -> Tuple[str, str]:
+    if not action.is_sourcing:
+        return 'PASS', "The action does not involve sourcing from a supplier."
+    if not action.supplier:
+        return 'INCOMPLETE', "The supplier could not be identified from the proposed action."
+    supplier = engine.listed_supplier(action)
+    if supplier is None:
+        return 'FAIL', f"'{action.supplier}' is not on the Ethical Suppliers List."
+    if supplier.status.lower() != 'approved':
+        return 'FAIL', f"'{supplier.name}' is listed with status '{supplier.status}', not 'Approved'."
+    return 'PASS', f"'{supplier.name}' is an approved supplier on the Ethical Suppliers List."
+
+@predicate("Regulation 2.1")
+def international_trade(engine: SustainabilityRuleEngine, action: ProposedAction) -> Tuple[str, str]:
+    supplier = engine.listed_supplier(action)
+    locations = [loc for loc in (action.location, supplier.location if supplier else None) if loc]
+    for location in locations:
+        if engine.is_embargoed(location):
+            return 'FAIL', f"'{location}' is an embargoed region."
+    # A mention elsewhere in the text may be a transit route or an exclusion, so only the parsed locations decide a FAIL.
+    if engine.is_embargoed(action.text):
+        return 'INCOMPLETE', "The action mentions an embargoed region outside its origin; its role must be reviewed."
+    if locations:
+        return 'PASS', f"'{locations[0]}' is not subject to any trade embargo."
+    if not action.is_sourcing:
+        return 'PASS', "The action does not involve cross-border sourcing."
+    return 'INCOMPLETE', "The origin of the goods is unknown."
+
+@predicate("Regulation 2.2")
+def food_safety(engine: SustainabilityRuleEngine, action: ProposedAction) -> Tuple[str, str]:
+    if not action.is_sourcing:
+        return 'PASS', "The action does not involve sourcing from a supplier."
+    supplier = engine.listed_supplier(action)
+    if supplier and 'certified' in supplier.notes.lower():
+        return 'PASS', f"'{supplier.name}' holds a recognised certification."
+    return 'INCOMPLETE', "The food safety certification of the supplier is unknown."
+
+@predicate("Regulation 2.3")
+def labor_laws(engine: SustainabilityRuleEngine, action: ProposedAction) -> Tuple[str, str]:
+    if not action.is_sourcing:
+        return 'PASS', "The action does not involve sourcing from a supplier."
+    supplier = engine.listed_supplier(action)
+    notes = supplier.notes.lower() if supplier else ""
+    if 'labor' in notes and 'violat' in notes:
+        return 'FAIL', f"'{supplier.name}' has a recorded labor law violation."
+    if 'labor' in notes and 'passed' in notes:
+        return 'PASS', f"'{supplier.name}' has passed its labor audits."
+    return 'INCOMPLETE', "The labor record of the supplier is unknown."
+
+# Create a single, lazily reloaded instance of the rule engine.
+_rule_engine: Optional[SustainabilityRuleEngine] = None
+
+def get_rule_engine() -> SustainabilityRuleEngine:
+    """Returns the shared rule engine, compiling the guide on first use."""
+    global _rule_engine
+    if _rule_engine is None:
+        _rule_engine = SustainabilityRuleEngine()
+    return _rule_engine
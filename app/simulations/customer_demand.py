@@ -0,0 +1,259 @@
+from typing import List, Optional, Tuple
+import numpy as np
+from app.data_models.erp_models import HistoricalData
+from app.data_models.customer_models import (
+    CustomerSegment, CustomerDemandModel, PricingPlan, DemandModelFit, DemandScenarioRequest, DemandScenarioResult, SegmentOutlook
+)
+from app.utils.logging_utils import get_logger
+from app.utils.metrics import timed
+
+logger = get_logger("customer_demand")
+
+# The prior segments of a beer retailer, used when no model is given and as the starting point of a fit.
+# Their base demands add up to the Beer Game's mean demand of 20 units per step.
+DEFAULT_SEGMENTS = [
+    CustomerSegment(name='loyal', base_demand=10.0, price_elasticity=-0.5, promotion_lift=0.1, backorder_fraction=0.9),
+    CustomerSegment(name='price_sensitive', base_demand=6.0, price_elasticity=-2.5, promotion_lift=0.6, backorder_fraction=0.3),
+    CustomerSegment(name='occasional', base_demand=4.0, price_elasticity=-1.2, promotion_lift=1.0, backorder_fraction=0.0),
+]
+
+def observed_demand(history: List[HistoricalData], node: str = 'retailer', product_id: str = 'beer') -> List[float]:
+    """
+    Extracts the observed demand per period from ERP history.
+    The demand of a period is the quantity the node ordered from its supplier in that period. A record holds
+    every order of the node placed so far, so each order only counts in the first period its ID appears in.
+
+    Args:
+        history: The historical records returned by the ERP server.
+        node: The node whose orders approximate customer demand.
+        product_id: The product to extract.
+
+    Returns:
+        The demand of every period in which the node was recorded.
+    """
+    seen = set()
+    demand = []
+    for record in history:
+        if node not in record.nodes:
+            continue
+        quantity = 0
+        for order in record.nodes[node].outgoing_orders:
+            if order.order_id not in seen:
+                seen.add(order.order_id)
+                if order.product_id == product_id:
+                    quantity += order.quantity
+        demand.append(float(quantity))
+    return demand
+
+def plan_arrays(model: CustomerDemandModel, plan: PricingPlan, steps: int, start: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the price and the promotion flag of every step of a pricing plan.
+
+    Args:
+        model: The customer demand model, whose reference price is the default price.
+        plan: The pricing plan.
+        steps: The number of steps.
+        start: The first step.
+
+    Returns:
+        A float array of prices and a boolean array of promotions, one entry per step.
+    """
+    t = np.arange(start, start + steps)
+    change_steps = np.array(sorted(plan.price_changes), dtype=int)
+    change_prices = np.array([plan.price_changes[s] for s in change_steps], dtype=float)
+    # Each step takes the price of the latest change at or before it, or the initial price before the first change.
+    latest = np.searchsorted(change_steps, t, side='right') - 1
+    base = plan.price if plan.price is not None else model.reference_price
+    prices = np.where(latest >= 0, change_prices[np.maximum(latest, 0)] if len(change_prices) else base, base)
+    promotions = np.isin(t, plan.promotion_steps)
+    return prices, promotions
+
+def segment_means(model: CustomerDemandModel, prices: np.ndarray, promotions: np.ndarray) -> np.ndarray:
+    """Returns the mean demand of every segment per step (step x segment) at the given prices and promotions."""
+    base = np.array([s.base_demand for s in model.segments], dtype=float)
+    elasticity = np.array([s.price_elasticity for s in model.segments], dtype=float)
+    lift = np.array([s.promotion_lift for s in model.segments], dtype=float)
+    relative_price = (np.asarray(prices, dtype=float) / model.reference_price)[:, None]
+    return base * relative_price ** elasticity * (1 + lift * np.asarray(promotions, dtype=float)[:, None])
+
+def backorder_fraction(model: CustomerDemandModel, means: np.ndarray) -> np.ndarray:
+    """Returns the fraction of unmet demand that waits, weighted by the segments' mean demands (one value per row of `means`)."""
+    fractions = np.array([s.backorder_fraction for s in model.segments], dtype=float)
+    total = means.sum(axis=-1)
+    return np.divide(means @ fractions, total, out=np.ones_like(total), where=total > 0)
+
+def draw_segment_demand(rng: np.random.Generator, model: CustomerDemandModel, means: np.ndarray) -> np.ndarray:
+    """
+    Draws the demand of every segment for an array of means whose last axis is the segment.
+    Segments with a dispersion are negative binomial, drawn as a gamma-Poisson mixture, and the others Poisson.
+    The same number of draws is consumed either way, which keeps the streams of two runs aligned.
+    """
+    dispersion = np.array([s.dispersion or 0.0 for s in model.segments], dtype=float)
+    mixed = dispersion > 0
+    shape = np.where(mixed, dispersion, 1.0)
+    gamma = rng.gamma(np.broadcast_to(shape, means.shape), 1.0, size=means.shape)
+    rates = np.where(mixed, means * gamma / shape, means)
+    return rng.poisson(rates).astype(float)
+
+def generate_demand(model: CustomerDemandModel, plan: PricingPlan, steps: int, scenarios: int,
+                    rng: np.random.Generator) -> np.ndarray:
+    """
+    Generates many demand scenarios under a pricing plan in one vectorised draw.
+
+    Args:
+        model: The customer demand model.
+        plan: The price and promotion decisions.
+        steps: The number of steps per scenario.
+        scenarios: The number of scenarios.
+        rng: The random generator.
+
+    Returns:
+        An array of the demand of every segment, shaped scenario x step x segment.
+    """
+    means = segment_means(model, *plan_arrays(model, plan, steps))
+    return draw_segment_demand(rng, model, np.broadcast_to(means, (scenarios,) + means.shape))
+
+def fit_demand_model(demand: List[float], prices: Optional[List[float]] = None, promotions: Optional[List[bool]] = None,
+                     prior: Optional[CustomerDemandModel] = None, max_iterations: int = 25) -> DemandModelFit:
+    """
+    Fits a customer demand model to observed demand with a Poisson regression of the demand on the log
+    relative price and the promotion flag, solved by iteratively reweighted least squares.
+
+    Aggregate demand cannot tell the segments apart, so the prior segments keep their shares, the spread
+    of their elasticities, the ratios of their lifts and their backorder fractions; the fit rescales them
+    so that their demand-weighted totals match the estimated base demand, elasticity and lift. The price elasticity and the
+    promotion lift are only estimated if the prices and promotions vary over the observed periods.
+
+    Args:
+        demand: The observed demand per period.
+        prices: The price in each period, if known.
+        promotions: Whether each period had a promotion, if known.
+        prior: The prior model. Defaults to the default segments.
+        max_iterations: The maximum number of reweighting iterations.
+
+    Returns:
+        A DemandModelFit with the fitted model and the estimates.
+
+    Raises:
+        ValueError: If no demand is observed, or the prices or promotions are not aligned with it.
+    """
+    prior = prior or CustomerDemandModel(segments=DEFAULT_SEGMENTS)
+    y = np.asarray(demand, dtype=float)
+    if len(y) == 0:
+        raise ValueError("At least one observed period is needed.")
+    for name, values in (('prices', prices), ('promotions', promotions)):
+        if values and len(values) != len(y):
+            raise ValueError(f"The observed {name} must have one value per observed period.")
+    base = np.array([s.base_demand for s in prior.segments], dtype=float)
+    shares = base / base.sum() if base.sum() > 0 else np.full(len(base), 1 / len(base))
+    prior_elasticity = float(shares @ [s.price_elasticity for s in prior.segments])
+    prior_lift = float(shares @ [s.promotion_lift for s in prior.segments])
+
+    # Step 1: Only the regressors that vary over the observed periods can be estimated.
+    columns, estimated = [np.ones(len(y))], ['base_demand']
+    if prices and np.ptp(prices) > 0:
+        columns.append(np.log(np.asarray(prices, dtype=float) / prior.reference_price))
+        estimated.append('price_elasticity')
+    if promotions and 0 < sum(promotions) < len(y):
+        columns.append(np.asarray(promotions, dtype=float))
+        estimated.append('promotion_lift')
+    X = np.column_stack(columns)
+
+    # Step 2: Poisson regression by IRLS, starting from the mean demand.
+    beta = np.zeros(X.shape[1])
+    beta[0] = np.log(max(y.mean(), 1e-9))
+    for _ in range(max_iterations):
+        mu = np.exp(X @ beta)
+        z = X @ beta + (y - mu) / mu
+        step = np.linalg.lstsq(X * np.sqrt(mu)[:, None], z * np.sqrt(mu), rcond=None)[0]
+        converged = np.allclose(step, beta, atol=1e-8)
+        beta = step
+        if converged:
+            break
+    coefficients = dict(zip(estimated, beta))
+    base_demand = float(np.exp(coefficients['base_demand']))
+    elasticity = float(min(coefficients.get('price_elasticity', prior_elasticity), 0.0))
+    lift = float(max(np.expm1(coefficients['promotion_lift']), 0.0)) if 'promotion_lift' in coefficients else prior_lift
+
+    # Step 3: The overdispersion of the residuals gives the negative binomial dispersion, if any.
+    mu = np.exp(X @ beta)
+    excess = float(np.mean((y - mu) ** 2 - mu))
+    dispersion = float(np.mean(mu ** 2) / excess) if len(y) > len(estimated) and excess > 0 else None
+
+    # Step 4: Rescale the prior segments to the estimates. Splitting the dispersion by share keeps the total negative binomial.
+    segments = []
+    for segment, share in zip(prior.segments, shares):
+        segment_lift = segment.promotion_lift * lift / prior_lift if prior_lift > 0 else lift
+        segments.append(segment.model_copy(update={
+            'base_demand': base_demand * share,
+            'price_elasticity': min(segment.price_elasticity + elasticity - prior_elasticity, 0.0),
+            'promotion_lift': segment_lift,
+            'dispersion': dispersion * share if dispersion and share > 0 else None,
+        }))
+    model = prior.model_copy(update={'segments': segments})
+    return DemandModelFit(model=model, observations=len(y), base_demand=base_demand, price_elasticity=elasticity,
+                          promotion_lift=lift, dispersion=dispersion, estimated=estimated)
+
+class CustomerDemandEngine:
+    """
+    Fits the customer demand model if observed demand is given, and generates a batch of demand
+    scenarios under a pricing plan, summarised per step and per segment.
+    """
+
+    def __init__(self, request: DemandScenarioRequest):
+        """
+        Initializes the engine.
+
+        Args:
+            request: The DemandScenarioRequest with the model or the observations, and the pricing plan.
+        """
+        self.request = request
+
+    @timed("customer_demand_seconds")
+    def run(self) -> DemandScenarioResult:
+        """
+        Generates the demand scenarios.
+
+        Returns:
+            A DemandScenarioResult with the expected demand, its spread and the expected revenue.
+
+        Raises:
+            ValueError: If the observations cannot be fitted.
+        """
+        # Step 1: Fit the model to the observed demand, starting from the given model or the default segments.
+        request = self.request
+        demand = request.observed_demand or (observed_demand(request.history, request.node, request.product_id) if request.history else [])
+        fit = None
+        model = request.model or CustomerDemandModel(segments=DEFAULT_SEGMENTS)
+        if demand:
+            fit = fit_demand_model(demand, request.observed_prices, request.observed_promotions, prior=model)
+            model = fit.model
+
+        # Step 2: Generate all scenarios in one draw and summarise them.
+        draws = generate_demand(model, request.plan, request.steps, request.scenarios, np.random.default_rng(request.seed))
+        prices, promotions = plan_arrays(model, request.plan, request.steps)
+        means = segment_means(model, prices, promotions)
+        totals = draws.sum(axis=2)
+        fractions = np.array([s.backorder_fraction for s in model.segments])
+        result = DemandScenarioResult(
+            prices=prices.tolist(),
+            promotions=promotions.tolist(),
+            mean_demand=totals.mean(axis=0).tolist(),
+            p10_demand=np.percentile(totals, 10, axis=0).tolist(),
+            p90_demand=np.percentile(totals, 90, axis=0).tolist(),
+            expected_revenue=float(totals.mean(axis=0) @ prices),
+            backorder_fraction=float(backorder_fraction(model, means.sum(axis=0))),
+            segments=[SegmentOutlook(name=s.name, mean_demand=draws[:, :, k].mean(axis=0).tolist(),
+                                     total_demand=float(draws[:, :, k].sum(axis=1).mean()), backorder_fraction=float(fractions[k]))
+                      for k, s in enumerate(model.segments)],
+            fit=fit,
+            model=model,
+        )
+        logger.info(
+            "Customer demand: segments=%d steps=%d scenarios=%d fitted=%s mean_total=%.1f",
+            len(model.segments), request.steps, request.scenarios, fit is not None, float(totals.sum(axis=1).mean()),
+            extra={"fields": {"event": "customer_demand", "segments": len(model.segments), "steps": request.steps,
+                              "scenarios": request.scenarios, "fitted": fit is not None,
+                              "expected_revenue": result.expected_revenue}}
+        )
+        return result
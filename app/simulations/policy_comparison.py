@@ -0,0 +1,213 @@
+import math
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from app.data_models.simulation_models import (
+    SimulationRequest, PolicyComparisonRequest, PolicyComparisonEntry, PolicyComparisonResult
+)
+from app.simulations.policy_optimization import confidence_interval
+from app.simulations.supply_chain_simulation import SupplyChainSimulation
+from app.utils.logging_utils import get_logger, quiet
+from app.utils.metrics import timed
+
+logger = get_logger("policy_comparison")
+
+class PolicyComparator:
+    """
+    Compares ordering policies with as few simulation runs as the comparison needs.
+
+    Replications are added in rounds, and every policy runs the same replication indices with common
+    random numbers, so that the cost differences are paired. Policies that are clearly worse than the
+    leader are eliminated early (racing or successive halving), and their runs stop as soon as their
+    cost exceeds a multiple of the leader's mean cost.
+    """
+
+    def __init__(self, request: PolicyComparisonRequest):
+        """
+        Initializes the comparator.
+
+        Args:
+            request: The PolicyComparisonRequest describing the scenario and the policies to compare.
+        """
+        if len(request.policies) < 2:
+            raise ValueError("A comparison needs at least two policies.")
+        self.request = request
+        self.names = list(request.policies)
+        # costs[name][r] is the total cost of the policy on replication r.
+        self.costs: Dict[str, List[float]] = {name: [] for name in self.names}
+        self.terminated: Dict[str, Set[int]] = {name: set() for name in self.names}
+        self.eliminated: Dict[str, int] = {}
+        self.total_runs = 0
+        self.simulated_steps = 0
+        self._scenario = SimulationRequest(**request.model_dump(include=set(SimulationRequest.model_fields)))
+
+    @timed("policy_comparison_seconds")
+    def compare(self) -> PolicyComparisonResult:
+        """
+        Runs the comparison until a single policy remains, the intervals are tight enough, or the budget is spent.
+
+        Returns:
+            A PolicyComparisonResult with the best policy and the outcome of every policy.
+        """
+        with quiet():
+            if self.request.elimination == 'racing':
+                rounds, converged = self._race()
+            else:
+                rounds, converged = self._successive_halving()
+            best = self._leader([name for name in self.names if name not in self.eliminated])
+
+        result = PolicyComparisonResult(
+            best_policy=best,
+            ordering_policy_str=self.request.policies[best],
+            policies={name: self._entry(name, best) for name in self.names},
+            rounds=rounds,
+            total_runs=self.total_runs,
+            simulated_steps=self.simulated_steps,
+            converged=converged,
+        )
+        logger.info(
+            "Policy comparison: best='%s' rounds=%d runs=%d simulated_steps=%d converged=%s",
+            best, rounds, self.total_runs, self.simulated_steps, converged,
+            extra={"fields": {"event": "policy_comparison", "best_policy": best, "rounds": rounds,
+                              "runs": self.total_runs, "simulated_steps": self.simulated_steps,
+                              "eliminated": self.eliminated, "converged": converged}}
+        )
+        return result
+
+    # --- Elimination Strategies ---
+
+    def _race(self) -> Tuple[int, bool]:
+        """
+        Adds a batch of replications to every surviving policy per round, and eliminates each policy whose
+        paired cost difference to the leader is significantly positive.
+
+        Returns:
+            A tuple of the number of rounds and whether the comparison converged.
+        """
+        alive = list(self.names)
+        self._extend(alive, self.request.initial_replications)
+        rounds = 0
+        while True:
+            rounds += 1
+            leader = self._leader(alive)
+            for name in [n for n in alive if n != leader]:
+                low, _ = self._difference(name, leader)[1]
+                if low > 0:
+                    self._eliminate(name, rounds)
+            alive = [name for name in alive if name not in self.eliminated]
+
+            if len(alive) == 1 or self._is_precise(alive, leader):
+                return rounds, True
+            replications = max(len(self.costs[name]) for name in alive)
+            if replications >= self.request.max_replications:
+                return rounds, False
+            self._extend(alive, min(replications + self.request.batch_size, self.request.max_replications))
+
+    def _successive_halving(self) -> Tuple[int, bool]:
+        """
+        Keeps the better half of the surviving policies each round, doubling their replications, until one remains.
+
+        Returns:
+            A tuple of the number of rounds and whether the comparison converged.
+        """
+        alive = list(self.names)
+        replications = self.request.initial_replications
+        rounds = 0
+        while True:
+            self._extend(alive, replications)
+            rounds += 1
+            self._leader(alive)
+            ranked = sorted(alive, key=self._mean)
+            for name in ranked[math.ceil(len(ranked) / 2):]:
+                self._eliminate(name, rounds)
+            alive = [name for name in ranked if name not in self.eliminated]
+
+            if len(alive) == 1:
+                return rounds, True
+            if replications >= self.request.max_replications:
+                return rounds, False
+            replications = min(2 * replications, self.request.max_replications)
+
+    # --- Simulation Runs ---
+
+    def _extend(self, names: List[str], replications: int):
+        """
+        Runs the given policies until each has `replications` replications.
+        The leader runs first and without a ceiling, so that the ceiling of the others reflects its cost.
+        """
+        for name in sorted(names, key=lambda n: self._mean(n) if self.costs[n] else math.inf):
+            leader = self._leader(names, uncensor=False)
+            ceiling = None
+            if leader is not None and name != leader and self.request.cost_ceiling_factor is not None:
+                ceiling = self.request.cost_ceiling_factor * self._mean(leader)
+            for replication in range(len(self.costs[name]), replications):
+                self.costs[name].append(self._run(name, replication, ceiling))
+
+    def _run(self, name: str, replication: int, ceiling: Optional[float]) -> float:
+        """Simulates one replication of a policy and returns its total cost, recording early terminations."""
+        scenario = self._scenario.model_copy(update={
+            "ordering_policy_str": self.request.policies[name], "scenario_name": name, "replication": replication,
+            "common_random_numbers": True, "record_history": False, "cost_ceiling": ceiling,
+        })
+        results = SupplyChainSimulation(scenario).run()
+        self.total_runs += 1
+        self.simulated_steps += results.steps_completed
+        if results.terminated_early:
+            self.terminated[name].add(replication)
+        else:
+            self.terminated[name].discard(replication)
+        return results.total_cost
+
+    def _leader(self, names: List[str], uncensor: bool = True) -> Optional[str]:
+        """
+        Returns the policy with the lowest mean cost among `names`.
+        With `uncensor`, the leader's runs that were stopped at a ceiling are first run to completion,
+        because a truncated cost would flatter the policy that every other policy is measured against.
+        """
+        while True:
+            candidates = [name for name in names if self.costs[name]]
+            if not candidates:
+                return None
+            leader = min(candidates, key=self._mean)
+            if not uncensor or not self.terminated[leader]:
+                return leader
+            for replication in sorted(self.terminated[leader]):
+                self.costs[leader][replication] = self._run(leader, replication, None)
+
+    # --- Statistics ---
+
+    def _mean(self, name: str) -> float:
+        return float(np.mean(self.costs[name]))
+
+    def _difference(self, name: str, reference: str) -> Tuple[float, List[float]]:
+        """Returns the mean and confidence interval of the paired cost difference between two policies."""
+        n = min(len(self.costs[name]), len(self.costs[reference]))
+        differences = np.array(self.costs[name][:n]) - np.array(self.costs[reference][:n])
+        return confidence_interval(differences, self.request.confidence)
+
+    def _is_precise(self, names: List[str], leader: str) -> bool:
+        """Returns whether every difference to the leader is estimated within the requested relative precision."""
+        tolerance = self.request.relative_precision * abs(self._mean(leader))
+        for name in names:
+            if name == leader:
+                continue
+            low, high = self._difference(name, leader)[1]
+            if (high - low) / 2 > tolerance:
+                return False
+        return True
+
+    def _eliminate(self, name: str, round_number: int):
+        self.eliminated[name] = round_number
+        logger.debug("Eliminated policy '%s' in round %d after %d replications.", name, round_number, len(self.costs[name]))
+
+    def _entry(self, name: str, best: str) -> PolicyComparisonEntry:
+        """Summarises the replications of a policy and its difference to the best policy."""
+        mean_cost, cost_interval = confidence_interval(self.costs[name], self.request.confidence)
+        difference_interval = [0.0, 0.0] if name == best else self._difference(name, best)[1]
+        return PolicyComparisonEntry(
+            mean_cost=mean_cost,
+            cost_interval=cost_interval,
+            difference_interval=difference_interval,
+            replications=len(self.costs[name]),
+            terminated_runs=len(self.terminated[name]),
+            eliminated_in_round=self.eliminated.get(name),
+        )
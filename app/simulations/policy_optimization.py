@@ -0,0 +1,253 @@
+import math
+from typing import Dict, List, Tuple
+import numpy as np
+from scipy import stats
+from app.data_models.simulation_models import SimulationRequest, PolicySearchRequest, PolicySearchResult
+from app.simulations.customer_demand import plan_arrays, segment_means
+from app.simulations.supply_chain_simulation import SupplyChainSimulation
+from app.utils.logging_utils import get_logger, quiet
+from app.utils.metrics import timed
+
+logger = get_logger("policy_optimization")
+
+# The parameter names of each policy family, in the order they are stored per node.
+POLICY_PARAMETERS = {
+    'base_stock': ('S',),
+    's_S': ('s', 'S'),
+    'R_Q': ('R', 'Q'),
+}
+
+# Each family orders from the inventory position (on hand + in transit - backordered) of every product.
+INVENTORY_POSITION = "(inventory + pipeline - backlog)"
+POLICY_TEMPLATES = {
+    'base_stock': "lambda node_name, inventory, pipeline, backlog: np.maximum(0, {S}[node_name] - {ip})",
+    's_S': "lambda node_name, inventory, pipeline, backlog: np.where({ip} <= {s}[node_name], {S}[node_name] - {ip}, 0)",
+    'R_Q': ("lambda node_name, inventory, pipeline, backlog: np.where({ip} <= {R}[node_name], "
+            "{Q}[node_name] * np.ceil(({R}[node_name] - {ip} + 1) / {Q}[node_name]), 0)"),
+}
+
+def policy_string(family: str, parameters: Dict[str, Dict[str, float]]) -> str:
+    """
+    Renders the parameters of a policy family as an ordering policy lambda for the simulation.
+
+    Args:
+        family: The policy family ('base_stock', 's_S' or 'R_Q').
+        parameters: The parameters per node (e.g., {'retailer': {'S': 80}}).
+
+    Returns:
+        The ordering policy as a lambda string.
+    """
+    tables = {name: repr({node: values[name] for node, values in parameters.items()}) for name in POLICY_PARAMETERS[family]}
+    return POLICY_TEMPLATES[family].format(ip=INVENTORY_POSITION, **tables)
+
+def confidence_interval(samples: np.ndarray, confidence: float) -> Tuple[float, List[float]]:
+    """
+    Computes the mean of a sample and its Student-t confidence interval.
+
+    Args:
+        samples: The observations (e.g., the total costs of independent replications).
+        confidence: The confidence level (e.g., 0.95).
+
+    Returns:
+        A tuple of the mean and the interval [low, high].
+    """
+    samples = np.asarray(samples, dtype=float)
+    mean = float(samples.mean())
+    if len(samples) < 2:
+        return mean, [mean, mean]
+    half_width = stats.t.ppf((1 + confidence) / 2, len(samples) - 1) * samples.std(ddof=1) / math.sqrt(len(samples))
+    return mean, [mean - float(half_width), mean + float(half_width)]
+
+class PolicyOptimizer:
+    """
+    Searches the parameters of an ordering policy family by simulation.
+
+    Every candidate is evaluated on the same replications (common random numbers), so that
+    differences between candidates reflect the policy rather than the noise of the draws.
+    The best policy is then re-evaluated on fresh replications to report confidence intervals.
+    """
+
+    def __init__(self, request: PolicySearchRequest):
+        """
+        Initializes the optimizer.
+
+        Args:
+            request: The PolicySearchRequest describing the scenario and the search.
+        """
+        self.request = request
+        self.family = request.policy_family
+        self.names = POLICY_PARAMETERS[self.family]
+        self.nodes = list(request.initial_state.nodes)
+        self.evaluations = 0
+        self._cache: Dict[Tuple[int, ...], float] = {}
+        self._scenario = SimulationRequest(**request.model_dump(include=set(SimulationRequest.model_fields)))
+
+    @timed("policy_search_seconds")
+    def optimize(self) -> PolicySearchResult:
+        """
+        Runs the search and validates the best policy.
+
+        Returns:
+            A PolicySearchResult with the best parameters, their policy string, and confidence intervals.
+        """
+        start, step = self._initial_point()
+        search = self._coordinate_search if self.request.method == 'coordinate' else self._spsa
+        with quiet():
+            best, trajectory = search(start, step)
+            best_costs = self._costs(best, self._validation_replications())
+            baseline_costs = self._costs(start, self._validation_replications())
+
+        mean_cost, cost_interval = confidence_interval(best_costs, self.request.confidence)
+        _, improvement_interval = confidence_interval(baseline_costs - best_costs, self.request.confidence)
+        result = PolicySearchResult(
+            policy_family=self.family,
+            parameters=self._parameters(best),
+            ordering_policy_str=policy_string(self.family, self._parameters(best)),
+            mean_cost=mean_cost,
+            cost_interval=cost_interval,
+            baseline_cost=float(baseline_costs.mean()),
+            improvement_interval=improvement_interval,
+            evaluations=self.evaluations,
+            trajectory=trajectory,
+        )
+        logger.info(
+            "Policy search: family=%s method=%s evaluations=%d mean_cost=%.2f interval=[%.2f, %.2f]",
+            self.family, self.request.method, self.evaluations, mean_cost, *cost_interval,
+            extra={"fields": {"event": "policy_search", "family": self.family, "method": self.request.method,
+                              "evaluations": self.evaluations, "mean_cost": mean_cost, "parameters": result.parameters}}
+        )
+        return result
+
+    # --- Search Methods ---
+
+    def _coordinate_search(self, start: np.ndarray, step: np.ndarray) -> Tuple[np.ndarray, List[float]]:
+        """
+        Moves one parameter at a time to the first improving neighbour, halving the step sizes
+        when no neighbour improves, until the steps reach one unit or the budget is spent.
+        """
+        best = self._project(start)
+        best_cost = self._mean_cost(best)
+        trajectory = [best_cost]
+        while self._has_budget(2) and step.max() >= 1:
+            improved = False
+            for k in range(len(best)):
+                for direction in (1, -1):
+                    candidate = best.copy()
+                    candidate[k] += direction * step[k]
+                    candidate = self._project(candidate)
+                    if np.array_equal(candidate, best) or not self._has_budget(1):
+                        continue
+                    cost = self._mean_cost(candidate)
+                    if cost < best_cost:
+                        best, best_cost, improved = candidate, cost, True
+                        break
+            if not improved:
+                step = np.floor(step / 2)
+            trajectory.append(best_cost)
+        return best, trajectory
+
+    def _spsa(self, start: np.ndarray, step: np.ndarray) -> Tuple[np.ndarray, List[float]]:
+        """
+        Estimates the gradient from two paired evaluations along a random ±1 direction per iteration,
+        and takes a normalised step against it with the standard decaying gain sequences.
+        """
+        rng = np.random.default_rng(self.request.seed)
+        theta = start.astype(float)
+        best = self._project(theta)
+        best_cost = self._mean_cost(best)
+        trajectory = [best_cost]
+        iteration = 0
+        while self._has_budget(3):
+            iteration += 1
+            gain = 1.0 / iteration ** 0.602
+            perturbation = np.maximum(step / iteration ** 0.101, 1.0)
+            delta = rng.choice([-1.0, 1.0], size=len(theta))
+            plus = self._mean_cost(self._project(theta + perturbation * delta))
+            minus = self._mean_cost(self._project(theta - perturbation * delta))
+            gradient = (plus - minus) / (2 * perturbation * delta)
+            scale = np.abs(gradient).max()
+            if scale > 0:
+                theta = self._project(theta - gain * step * gradient / scale).astype(float)
+            cost = self._mean_cost(self._project(theta))
+            if cost < best_cost:
+                best, best_cost = self._project(theta), cost
+            trajectory.append(best_cost)
+        return best, trajectory
+
+    # --- Evaluation ---
+
+    def _has_budget(self, candidates: int) -> bool:
+        """Returns whether `candidates` more evaluations fit in the simulation budget."""
+        return self.evaluations + candidates * self.request.replications <= self.request.budget
+
+    def _mean_cost(self, theta: np.ndarray) -> float:
+        """Returns the mean cost of a candidate over the search replications, caching repeated candidates."""
+        key = tuple(int(v) for v in theta)
+        if key not in self._cache:
+            costs = self._costs(theta, range(self.request.replications))
+            self.evaluations += len(costs)
+            self._cache[key] = float(costs.mean())
+        return self._cache[key]
+
+    def _costs(self, theta: np.ndarray, replications) -> np.ndarray:
+        """Simulates a candidate on the given replications and returns the total cost of each run."""
+        policy = policy_string(self.family, self._parameters(theta))
+        costs = []
+        for replication in replications:
+            scenario = self._scenario.model_copy(update={
+                "ordering_policy_str": policy, "replication": replication,
+                "common_random_numbers": True, "record_history": False,
+            })
+            costs.append(SupplyChainSimulation(scenario).run().total_cost)
+        return np.array(costs)
+
+    def _validation_replications(self) -> range:
+        """Returns replication indices that are disjoint from the ones used during the search."""
+        offset = self.request.replications
+        return range(offset, offset + self.request.validation_replications)
+
+    # --- Parameters ---
+
+    def _initial_point(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the starting parameters and step sizes, derived from the mean demand and lead time if not given."""
+        demand, lead_time = self._mean_demand(), self._mean_lead_time()
+        level = round(demand * (lead_time + 1) + demand)
+        defaults = {'base_stock': [level], 's_S': [level, level + round(demand)], 'R_Q': [level, round(demand)]}[self.family]
+        start = []
+        for node in self.nodes:
+            values = self.request.initial_parameters.get(node, defaults)
+            if len(values) != len(self.names):
+                raise ValueError(f"Node '{node}' needs {len(self.names)} initial parameters {self.names}, got {values}.")
+            start.extend(values)
+        step = np.full(len(start), max(1.0, round(demand / 2)))
+        return np.array(start, dtype=float), step
+
+    def _project(self, theta: np.ndarray) -> np.ndarray:
+        """Rounds a candidate to whole units and enforces the constraints of the family (non-negative, s <= S, Q >= 1)."""
+        theta = np.maximum(np.round(theta), 0).reshape(len(self.nodes), len(self.names))
+        if self.family == 's_S':
+            theta[:, 1] = np.maximum(theta[:, 1], theta[:, 0])
+        elif self.family == 'R_Q':
+            theta[:, 1] = np.maximum(theta[:, 1], 1)
+        return theta.ravel()
+
+    def _parameters(self, theta: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """Converts a flat parameter vector into parameters per node."""
+        values = np.asarray(theta).reshape(len(self.nodes), len(self.names))
+        return {node: {name: float(v) for name, v in zip(self.names, row)} for node, row in zip(self.nodes, values)}
+
+    def _mean_demand(self) -> float:
+        d = self.request.demand
+        if d.kind == 'uniform':
+            return (d.low + d.high) / 2
+        if d.kind == 'empirical':
+            return float(np.mean(d.samples))
+        if d.kind == 'segmented' and d.customers:
+            means = segment_means(d.customers, *plan_arrays(d.customers, d.pricing, self.request.steps)).sum(axis=1)
+            return float(means.mean() * np.mean([d.customers.product_weights.get(p, 1.0) for p in self.request.get_products()]))
+        return float(np.mean([d.product_means.get(p, d.mean) for p in self.request.get_products()]))
+
+    def _mean_lead_time(self) -> float:
+        lt = self.request.lead_time
+        return {'fixed': lt.value, 'uniform': (lt.low + lt.high) / 2, 'poisson': 1 + lt.mean,
+                'empirical': float(np.mean(lt.samples or [1]))}[lt.kind]
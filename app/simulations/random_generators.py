@@ -0,0 +1,154 @@
+import zlib
+from typing import List, Optional, Tuple
+import numpy as np
+from app.data_models.erp_models import HistoricalData
+from app.data_models.simulation_models import DemandDistribution, LeadTimeDistribution
+from app.simulations.customer_demand import backorder_fraction, draw_segment_demand, observed_demand, plan_arrays, segment_means
+
+class DemandGenerator:
+    """
+    Draws the customer demand of every demand node and product for one step at a time.
+    Each step consumes the same number of draws regardless of the policy being simulated,
+    which keeps the draws of two policies aligned under common random numbers.
+    """
+
+    def __init__(self, distribution: DemandDistribution, products: List[str]):
+        """
+        Initializes the generator.
+
+        Args:
+            distribution: The demand distribution.
+            products: The simulated products, which select the per-product means.
+        """
+        self.distribution = distribution
+        self.means = np.array([distribution.product_means.get(p, distribution.mean) for p in products], dtype=float)
+        if distribution.kind == 'empirical' and not distribution.samples:
+            raise ValueError("The empirical demand distribution needs samples (see `empirical_demand`).")
+        self.samples = np.asarray(distribution.samples, dtype=float)
+        self.customers = distribution.customers
+        if distribution.kind == 'segmented':
+            if not self.customers or not self.customers.segments:
+                raise ValueError("The segmented demand distribution needs customer segments (see the Customer Demand Tool).")
+            self.product_weights = np.array([self.customers.product_weights.get(p, 1.0) for p in products], dtype=float)
+
+    def segment_means(self, step: int) -> np.ndarray:
+        """Returns the mean demand of every segment of the segmented distribution at a step, under its pricing plan."""
+        return segment_means(self.customers, *plan_arrays(self.customers, self.distribution.pricing, 1, start=step))[0]
+
+    def backorder_fraction(self, step: int) -> float:
+        """Returns the fraction of the unmet customer demand of a step that waits; the rest is lost. Only segmented demand loses sales."""
+        if self.distribution.kind != 'segmented':
+            return 1.0
+        return float(backorder_fraction(self.customers, self.segment_means(step)))
+
+    def sample(self, rng: np.random.Generator, step: int, num_nodes: int) -> np.ndarray:
+        """
+        Draws the demand of one step.
+
+        Args:
+            rng: The random generator of the demand stream.
+            step: The current step, used by the seasonal distribution.
+            num_nodes: The number of demand nodes.
+
+        Returns:
+            An array of shape (num_nodes, num_products).
+        """
+        d = self.distribution
+        shape = (num_nodes, len(self.means))
+        if d.kind == 'uniform':
+            return rng.integers(d.low, d.high + 1, size=shape).astype(float)
+        if d.kind == 'empirical':
+            return rng.choice(self.samples, size=shape)
+        if d.kind == 'segmented':
+            # The demand of every segment, scaled per product, responds to the price and promotion of the step.
+            means = self.product_weights[:, None] * self.segment_means(step)
+            return draw_segment_demand(rng, self.customers, np.broadcast_to(means, shape + means.shape[-1:])).sum(axis=-1)
+
+        means = np.broadcast_to(self.means, shape)
+        if d.kind == 'seasonal':
+            means = means * max(0.0, 1.0 + d.amplitude * np.sin(2 * np.pi * (step - d.phase) / d.period))
+        if d.kind == 'negative_binomial' or (d.kind == 'seasonal' and d.dispersion):
+            dispersion = d.dispersion or 1.0
+            return rng.negative_binomial(dispersion, dispersion / (dispersion + np.maximum(means, 1e-9))).astype(float)
+        return rng.poisson(means).astype(float)
+
+class LeadTimeGenerator:
+    """Draws the lead time, in whole steps of at least one, of every node's shipments of every product."""
+
+    def __init__(self, distribution: LeadTimeDistribution):
+        """
+        Initializes the generator.
+
+        Args:
+            distribution: The lead-time distribution.
+        """
+        self.distribution = distribution
+        if distribution.kind == 'empirical' and not distribution.samples:
+            raise ValueError("The empirical lead-time distribution needs samples (see `empirical_lead_times`).")
+        self.samples = np.maximum(np.asarray(distribution.samples, dtype=int), 1)
+        self.fixed_value = max(distribution.value, 1)
+
+    @property
+    def is_fixed(self) -> bool:
+        return self.distribution.kind == 'fixed'
+
+    def sample(self, rng: np.random.Generator, shape: Tuple[int, ...]) -> np.ndarray:
+        """Draws an integer array of lead times with the given shape."""
+        d = self.distribution
+        if d.kind == 'fixed':
+            return np.full(shape, self.fixed_value)
+        if d.kind == 'uniform':
+            return rng.integers(max(d.low, 1), max(d.high, d.low, 1) + 1, size=shape)
+        if d.kind == 'poisson':
+            return 1 + rng.poisson(d.mean, size=shape)
+        return rng.choice(self.samples, size=shape)
+
+def scenario_streams(seed: Optional[int], scenario_name: str = "", replication: int = 0,
+                     common_random_numbers: bool = True) -> Tuple[np.random.Generator, np.random.Generator]:
+    """
+    Creates the independent demand and lead-time random streams of a scenario.
+
+    Args:
+        seed: The base seed. If None, the streams are seeded from fresh OS entropy.
+        scenario_name: The name of the scenario, mixed into the seed unless common random numbers are used.
+        replication: The replication index, which selects an independent set of streams for the same seed.
+        common_random_numbers: If True, scenarios with the same seed and replication share their draws.
+
+    Returns:
+        A tuple of the demand and lead-time random generators.
+    """
+    if seed is None:
+        sequence = np.random.SeedSequence()
+    else:
+        key = (replication,) if common_random_numbers else (replication, zlib.crc32(scenario_name.encode('utf-8')))
+        sequence = np.random.SeedSequence(seed, spawn_key=key)
+    demand_sequence, lead_time_sequence = sequence.spawn(2)
+    return np.random.default_rng(demand_sequence), np.random.default_rng(lead_time_sequence)
+
+def empirical_demand(history: List[HistoricalData], node: str = 'retailer', product_id: str = 'beer') -> DemandDistribution:
+    """
+    Builds an empirical demand distribution from ERP history.
+    The demand of a period is the quantity of the orders the node placed with its supplier in that period (see `observed_demand`).
+
+    Args:
+        history: The historical records returned by the ERP server.
+        node: The node whose orders approximate customer demand.
+        product_id: The product to extract.
+
+    Returns:
+        A DemandDistribution resampling the observed demands.
+    """
+    return DemandDistribution(kind='empirical', samples=observed_demand(history, node, product_id))
+
+def empirical_lead_times(history: List[HistoricalData]) -> LeadTimeDistribution:
+    """
+    Builds an empirical lead-time distribution from the ETAs of the shipments in transit in ERP history.
+
+    Args:
+        history: The historical records returned by the ERP server.
+
+    Returns:
+        A LeadTimeDistribution resampling the observed ETAs.
+    """
+    samples = [max(s.eta, 1) for record in history for s in record.shipments_in_transit]
+    return LeadTimeDistribution(kind='empirical', samples=samples)
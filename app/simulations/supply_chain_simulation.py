@@ -1,11 +1,28 @@
+import inspect
 import simpy
-import random
-import json
+import numpy as np
+from logging import INFO
+from typing import Dict, List
 from app.data_models.supply_chain_models import SupplyChainStatus
 from app.data_models.simulation_models import SimulationRequest, SimulationResults, SimulationStepResult
+from app.optimizations.production_scheduling import allocate_capacity, capacity_load, max_batch_quantity
+from app.simulations.random_generators import DemandGenerator, LeadTimeGenerator, scenario_streams
+from app.utils.logging_utils import get_logger
+from app.utils.metrics import timed
+
+logger = get_logger("simulation")
+
+# The arguments passed to a product-level ordering policy; each is a numpy array over the simulated products.
+PRODUCT_POLICY_ARGUMENTS = ('node_name', 'products', 'inventory', 'backlog', 'pipeline', 'demand')
 
 class SupplyChainSimulation:
-    """A SimPy-based discrete-event simulation of the Beer Distribution Game."""
+    """
+    A SimPy-based discrete-event simulation of the Beer Distribution Game.
+
+    The state of all nodes is held in dense node × product arrays (inventory, backlog and pipeline),
+    so that every product advances in one vectorised step. Within a step the nodes are processed from
+    the most downstream node upwards, so that each order reaches its supplier in the same step.
+    """
 
     def __init__(self, request: SimulationRequest):
         """
@@ -16,9 +33,23 @@ class SupplyChainSimulation:
         """
         self.env = simpy.Environment()
         self.request = request
-        self.nodes = {}
+        self.topology = request.get_topology()
+        self.products = request.get_products()
+        self.node_names: List[str] = list(request.initial_state.nodes)
+        self.node_index: Dict[str, int] = {name: i for i, name in enumerate(self.node_names)}
+        self.holding_costs, self.backorder_costs = request.get_cost_vectors(self.products)
+        self.demand_generator = DemandGenerator(request.demand, self.products)
+        self.lead_time_generator = LeadTimeGenerator(request.lead_time)
+        # Demand and lead times are drawn from separate streams, so a policy's shipments never shift the demand draws.
+        self.demand_rng, self.lead_time_rng = scenario_streams(
+            request.seed, request.scenario_name, request.replication, request.common_random_numbers
+        )
+        self.production = request.production
+        if self.production is not None:
+            max_batch_quantity(self.production)
         self.results = SimulationResults(total_cost=0, stockout_events=0, history=[])
 
+    @timed("simulation_run_seconds")
     def run(self) -> SimulationResults:
         """
         Runs the full discrete-event simulation for the supply chain.
@@ -30,159 +61,247 @@ class SupplyChainSimulation:
         self.env.process(self.setup())
         self.env.run(until=self.request.steps)
 
-        # Final cost calculation aggregates costs from all nodes
-        self.results.total_cost = sum(n['cost'] for n in self.nodes.values())
+        # Final cost calculation aggregates costs from all nodes and products
+        self.results.total_cost = float(self.node_costs.sum())
+        self.results.product_costs = {p: float(c) for p, c in zip(self.products, self.product_costs)}
+        if self.production is not None:
+            periods = max(self.results.steps_completed, 1) * np.count_nonzero(self.upstream == -1)
+            self.results.production_utilisation = self.production_load / (periods * self.production.capacity)
         self._log_results()
         return self.results
 
     def setup(self):
         """
-        Initializes the simulation environment, creating and linking all supply chain nodes.
+        Initializes the simulation state arrays from the initial state and links the nodes.
         This is a generator function required by SimPy.
         """
-        # Initialize nodes from the initial state provided in the request
+        num_nodes, num_products = len(self.node_names), len(self.products)
+        product_index = {p: j for j, p in enumerate(self.products)}
+
+        # Step 1: Build the dense node × product state from the initial state provided in the request.
+        self.inventory = np.zeros((num_nodes, num_products))
         for name, node_status in self.request.initial_state.nodes.items():
-            self.nodes[name] = {
-                "name": name,
-                "inventory": node_status.inventory.get('beer', 0),
-                "incoming_orders": [],
-                "cost": 0,
-                "downstream_node": None  # Will be linked below
-            }
-
-        # Link nodes (currently hardcoded for the Beer Game topology)
-        # TODO: Generalize this to support arbitrary supply chain topologies.
-        self.nodes['brewery']['downstream_node'] = self.nodes['distributor']
-        self.nodes['distributor']['downstream_node'] = self.nodes['wholesaler']
-        self.nodes['wholesaler']['downstream_node'] = self.nodes['retailer']
-        
-        # Start a SimPy process for each node to run its logic concurrently.
-        for name in self.nodes:
-            self.env.process(self.node_process(self.nodes[name]))
-        
+            for product, quantity in node_status.inventory.items():
+                if product in product_index:
+                    self.inventory[self.node_index[name], product_index[product]] = quantity
+        self.backlog = np.zeros((num_nodes, num_products))
+        self.pipeline = np.zeros((num_nodes, num_products))
+        self.node_costs = np.zeros(num_nodes)
+        self.product_costs = np.zeros(num_products)
+        # Orders of a producing node with finite capacity wait in its production queue until they are produced.
+        self.production_queue = np.zeros((num_nodes, num_products))
+        self.production_load = 0.0
+
+        # Step 2: Link each node to its upstream supplier and downstream customer, following the request's topology.
+        self.upstream = np.full(num_nodes, -1)
+        self.downstream = np.full(num_nodes, -1)
+        for name, upstream in self.topology.items():
+            if name not in self.node_index or (upstream and upstream not in self.node_index):
+                raise ValueError(f"The topology references a node that is not in the initial state: '{name}' -> '{upstream}'.")
+            if upstream:
+                i, u = self.node_index[name], self.node_index[upstream]
+                if self.downstream[u] != -1:
+                    raise ValueError(f"Node '{upstream}' supplies more than one node; only serial chains are supported.")
+                self.upstream[i], self.downstream[u] = u, i
+        self.demand_nodes = np.flatnonzero(self.downstream == -1)
+        self.processing_order = self._processing_order()
+
+        # Step 3: Deliveries are scheduled in a ring buffer of arrival slots, one per future step.
+        shipments = self.request.initial_state.shipments_in_transit
+        horizon = max([self.lead_time_generator.fixed_value] + [s.eta for s in shipments]) + 1
+        self.arrivals = np.zeros((horizon, num_nodes, num_products))
+        for shipment in shipments:
+            if shipment.destination_node in self.node_index and shipment.product_id in product_index:
+                destination = self.node_index[shipment.destination_node]
+                self._schedule(destination, product_index[shipment.product_id], max(shipment.eta - 1, 0), shipment.quantity)
+
+        self._policy = self._compile_policy()
+        self.env.process(self.step_process())
         yield self.env.timeout(0)
 
-    def node_process(self, node):
+    def step_process(self):
         """
-        The main process governing the behavior of a single supply chain node in each simulation step.
+        The process that advances all nodes and products by one step per simulated time unit.
         This is a generator function required by SimPy.
+        """
+        while True:
+            self.step(int(self.env.now))
+            if self.results.terminated_early:
+                return
+            yield self.env.timeout(1)
+
+    def step(self, t: int):
+        """
+        Advances every node and product by one time step.
 
         Args:
-            node: A dictionary representing the state of a supply chain node.
+            t: The current time step.
         """
-        while True:
-            # Step 1: Determine demand for the current time step.
-            if node['name'] == 'retailer':
-                # For the retailer, demand is stochastic (random) to simulate customer behavior.
-                demand = random.randint(10, 30)
-            else:
-                # For upstream nodes, demand is the sum of incoming orders from the downstream node.
-                demand = 0
-                if node.get('incoming_orders'):
-                    demand = sum(order['quantity'] for order in node['incoming_orders'])
-                    node['incoming_orders'] = []  # Clear orders after they are processed.
-
-            # Step 2: Fulfill demand based on available inventory.
-            if node['inventory'] >= demand:
-                # If there is enough inventory, fulfill the full demand.
-                node['inventory'] -= demand
-                if node['downstream_node']:
-                    # Trigger the delivery process to the downstream node.
-                    self.env.process(self.deliver(node['downstream_node'], demand))
-            else:
-                # If there is a stockout, fulfill with whatever inventory is available.
-                self.results.stockout_events += 1
-                if node['downstream_node']:
-                    self.env.process(self.deliver(node['downstream_node'], node['inventory']))
-                node['inventory'] = 0
+        # Step 1: Receive the deliveries that arrive in this step.
+        slot = t % len(self.arrivals)
+        self.inventory += self.arrivals[slot]
+        self.pipeline -= self.arrivals[slot]
+        self.arrivals[slot] = 0
 
-            # Step 3: Apply inventory holding cost for any remaining stock.
-            node['cost'] += node['inventory'] * 0.5
+        # Step 2: Customer demand is stochastic (random) at the most downstream nodes (the retailers).
+        demand = np.zeros_like(self.inventory)
+        demand[self.demand_nodes] = self.demand_generator.sample(self.demand_rng, t, len(self.demand_nodes))
+        waiting = self.demand_generator.backorder_fraction(t)
+
+        for i in self.processing_order:
+            # Step 3: Fulfill the demand and any backlog from the available inventory; the shortfall is backordered.
+            required = demand[i] + self.backlog[i]
+            shipped = np.minimum(self.inventory[i], required)
+            self.inventory[i] -= shipped
+            unmet = required - shipped
+            if waiting < 1 and self.downstream[i] == -1:
+                # The backlog is served first, so the unmet part of the new customer demand is lost unless its customers wait.
+                lost = (1 - waiting) * np.minimum(unmet, demand[i])
+                unmet -= lost
+                self.results.lost_sales += float(lost.sum())
+                lost_costs = lost * self.request.lost_sale_cost
+                self.node_costs[i] += lost_costs.sum()
+                self.product_costs += lost_costs
+            self.backlog[i] = unmet
+            self.results.stockout_events += int(np.count_nonzero(shipped < required))
+            if self.downstream[i] != -1:
+                self._ship(t, self.downstream[i], shipped)
 
             # Step 4: Place a new replenishment order based on the agent's chosen policy.
-            # The ordering policy is a callable function (e.g., a lambda) passed in the simulation request.
-            order_quantity = self.request.get_ordering_policy()(
-                node_name=node['name'],
-                current_inventory=node['inventory'],
-                demand=demand
-            )
-            
-            if node['name'] != 'brewery':
-                # All nodes except the brewery place an order with their upstream supplier.
-                upstream_node = self._get_upstream_node(node['name'])
-                if upstream_node:
-                    upstream_node['incoming_orders'].append({'quantity': order_quantity})
+            order_quantity = self._order_quantities(i, demand[i])
+            if self.upstream[i] != -1:
+                # Orders become the demand of the upstream supplier, which is processed later in this step.
+                demand[self.upstream[i]] += order_quantity
+            elif self.production is None:
+                # The producing node (e.g., the brewery) "produces" its own order, simulating a production lead time.
+                self._ship(t, i, order_quantity)
             else:
-                # The brewery "produces" its own order, simulating a production lead time.
-                self.env.process(self.deliver(node, order_quantity))
+                self._produce(t, i, order_quantity)
 
-            # Step 5: Record the state of all nodes at the end of the current time step.
-            step_state = SimulationStepResult(
-                step=self.env.now,
-                nodes={name: {"inventory": data["inventory"], "cost": data["cost"]} for name, data in self.nodes.items()}
-            )
-            self.results.history.append(step_state)
+        # Step 5: Apply the per-product holding and backorder costs.
+        step_costs = self.inventory * self.holding_costs + self.backlog * self.backorder_costs
+        self.node_costs += step_costs.sum(axis=1)
+        self.product_costs += step_costs.sum(axis=0)
+        self.results.steps_completed = t + 1
+        if self.request.cost_ceiling is not None and self.node_costs.sum() > self.request.cost_ceiling:
+            # The run can no longer beat the ceiling, so the remaining steps are skipped.
+            self.results.terminated_early = True
 
-            # Step 6: Wait for one time unit to pass before the next step.
-            yield self.env.timeout(1)
+        # Step 6: Record the state of all nodes, summed over products, at the end of the current time step.
+        if not self.request.record_history:
+            return
+        inventory, backlog = self.inventory.sum(axis=1), self.backlog.sum(axis=1)
+        self.results.history.append(SimulationStepResult(
+            step=t,
+            nodes={name: {"inventory": float(inventory[i]), "backlog": float(backlog[i]), "cost": float(self.node_costs[i])}
+                   for i, name in enumerate(self.node_names)}
+        ))
 
-    def deliver(self, target_node, quantity):
-        """
-        Simulates the lead time for a delivery between nodes.
-        This is a generator function required by SimPy.
+    def _ship(self, t: int, node: int, quantities: np.ndarray):
+        """Puts the given quantities of every product in transit to a node, arriving after a drawn lead time."""
+        if self.lead_time_generator.is_fixed:
+            self.arrivals[(t + self.lead_time_generator.fixed_value) % len(self.arrivals), node] += quantities
+        else:
+            # Every shipment draws one lead time per product, whether or not anything is shipped,
+            # so that the lead-time stream stays aligned across policies.
+            lead_times = self.lead_time_generator.sample(self.lead_time_rng, quantities.shape)
+            self._ensure_capacity(t, int(lead_times.max()))
+            self.arrivals[(t + lead_times) % len(self.arrivals), node, np.arange(len(quantities))] += quantities
+        self.pipeline[node] += quantities
 
-        Args:
-            target_node: The destination node for the delivery.
-            quantity: The number of units being delivered.
+    def _produce(self, t: int, node: int, quantities: np.ndarray):
         """
-        yield self.env.timeout(1)  # Represents a lead time of 1 simulation step.
-        target_node['inventory'] += quantity
-
-    def _get_upstream_node(self, node_name):
+        Queues a producing node's order and produces what its finite capacity allows in this step.
+        Production is rounded up to whole batches and costs one setup per product produced; the produced
+        quantities are shipped to the node itself after a drawn lead time.
         """
-        Retrieves the upstream node in the hardcoded Beer Game topology.
-        
-        Args:
-            node_name: The name of the current node.
+        queue = self.production_queue[node] + quantities
+        produced = allocate_capacity(queue, self.production)
+        self.production_queue[node] = np.maximum(queue - produced, 0)
+        # Queued production counts towards the pipeline; `_ship` adds the produced quantities back in transit.
+        self.pipeline[node] += quantities - np.minimum(produced, queue)
+        self._ship(t, node, produced)
 
-        Returns:
-            A dictionary representing the upstream node, or None if not found.
+        setup_costs = self.production.setup_cost * (produced > 0)
+        self.node_costs[node] += setup_costs.sum()
+        self.product_costs += setup_costs
+        self.production_load += capacity_load(produced, self.production)
+
+    def _ensure_capacity(self, t: int, lead_time: int):
+        """Grows the ring buffer of arrival slots so that it can hold a delivery `lead_time` steps ahead."""
+        size = len(self.arrivals)
+        if lead_time < size:
+            return
+        new_size = max(lead_time + 1, 2 * size)
+        arrivals = np.zeros((new_size,) + self.arrivals.shape[1:])
+        for step in range(t, t + size):
+            arrivals[step % new_size] = self.arrivals[step % size]
+        self.arrivals = arrivals
+
+    def _schedule(self, node: int, product: int, step: int, quantity: float):
+        """Schedules an initial shipment of a single product to arrive at a node in the given step."""
+        self.arrivals[step % len(self.arrivals), node, product] += quantity
+        self.pipeline[node, product] += quantity
+
+    def _processing_order(self) -> List[int]:
+        """Returns the node indices ordered from the most downstream node to the producing node of each chain."""
+        order = []
+        for i in self.demand_nodes:
+            while i != -1 and i not in order:
+                order.append(int(i))
+                i = self.upstream[i]
+        return order
+
+    def _compile_policy(self):
+        """
+        Evaluates the ordering policy once and wraps it as a function from a node and its demand to order quantities.
+        Product-level policies are called once per node with arrays; per-product policies once per node and product.
         """
-        # TODO: Generalize this to support arbitrary supply chain topologies.
-        if node_name == 'retailer': return self.nodes['wholesaler']
-        if node_name == 'wholesaler': return self.nodes['distributor']
-        if node_name == 'distributor': return self.nodes['brewery']
-        return None
+        policy = self.request.get_ordering_policy()
+        parameters = inspect.signature(policy).parameters
+        if 'current_inventory' in parameters:
+            def per_product(i: int, demand: np.ndarray) -> np.ndarray:
+                name, inventory = self.node_names[i], self.inventory[i]
+                return np.array([policy(node_name=name, current_inventory=float(inventory[j]), demand=float(demand[j]))
+                                 for j in range(len(self.products))], dtype=float)
+            return per_product
+
+        accepts_all = any(p.kind == p.VAR_KEYWORD for p in parameters.values())
+        names = [n for n in PRODUCT_POLICY_ARGUMENTS if accepts_all or n in parameters]
+
+        def product_level(i: int, demand: np.ndarray) -> np.ndarray:
+            arguments = {'node_name': self.node_names[i], 'products': self.products, 'inventory': self.inventory[i],
+                         'backlog': self.backlog[i], 'pipeline': self.pipeline[i], 'demand': demand}
+            return np.asarray(policy(**{n: arguments[n] for n in names}), dtype=float)
+        return product_level
+
+    def _order_quantities(self, i: int, demand: np.ndarray) -> np.ndarray:
+        """Returns the non-negative order quantity of every product for a node."""
+        return np.maximum(np.broadcast_to(self._policy(i, demand), demand.shape), 0)
 
     def _log_request(self):
-        """Prints a formatted summary of the simulation request."""
-        print("\n" + "╔" + "═" * 50 + "╗")
-        print(f"║ {'Simulation Request':^48} ║")
-        print("╠" + "═" * 50 + "╣")
-        print(f"║ Scenario: {self.request.scenario_name:<38} ║")
-        print(f"║ Steps: {self.request.steps:<41} ║")
-        print(f"║ Policy: {self.request.ordering_policy_str:<40} ║")
-        print("╚" + "═" * 50 + "╝")
+        """Logs a structured summary of the simulation request."""
+        if not logger.isEnabledFor(INFO):
+            return
+        logger.info(
+            "Simulation request: scenario='%s' steps=%d products=%d policy=%s",
+            self.request.scenario_name, self.request.steps, len(self.products), self.request.ordering_policy_str,
+            extra={"fields": {"event": "simulation_request", "scenario": self.request.scenario_name,
+                              "steps": self.request.steps, "products": len(self.products),
+                              "policy": self.request.ordering_policy_str}}
+        )
 
     def _log_results(self):
-        """Prints a formatted summary of the final simulation results."""
-        print("\n" + "╔" + "═" * 50 + "╗")
-        print(f"║ {'Simulation Results':^48} ║")
-        print("╠" + "═" * 50 + "╣")
-        print(f"║ Scenario: {self.request.scenario_name:<38} ║")
-        print("╟" + "─" * 50 + "╢")
-        print(f"║ Total Cost: {self.results.total_cost:<36.2f} ║")
-        print(f"║ Stockout Events: {self.results.stockout_events:<31} ║")
-        print("╟" + "─" * 50 + "╢")
-        print(f"║ {'Final Inventory':^48} ║")
-        print("╟" + "─" * 50 + "╢")
-
-        if not self.results.history:
-            print("║ No history recorded. {'':<30} ║")
-        else:
-            final_step = self.results.history[-1]
-            for node_name, data in final_step.nodes.items():
-                inv_str = f"{data['inventory']:.0f} units"
-                print(f"║   - {node_name.capitalize()}: {inv_str:<37} ║")
-        
-        print("╚" + "═" * 50 + "╝" + "\n")
\ No newline at end of file
+        """Logs a structured summary of the final simulation results."""
+        if not logger.isEnabledFor(INFO):
+            return
+        final_inventory = {}
+        if self.results.history:
+            final_inventory = {name: data['inventory'] for name, data in self.results.history[-1].nodes.items()}
+        logger.info(
+            "Simulation results: scenario='%s' total_cost=%.2f stockout_events=%d final_inventory=%s",
+            self.request.scenario_name, self.results.total_cost, self.results.stockout_events, final_inventory,
+            extra={"fields": {"event": "simulation_results", "scenario": self.request.scenario_name,
+                              "total_cost": self.results.total_cost, "stockout_events": self.results.stockout_events,
+                              "final_inventory": final_inventory}}
+        )
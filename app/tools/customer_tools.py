@@ -0,0 +1,45 @@
+from crewai.tools import BaseTool
+from pydantic import ValidationError
+from app.data_models.customer_models import DemandScenarioRequest, DemandScenarioResult
+from app.simulations.customer_demand import CustomerDemandEngine
+
+class CustomerDemandTool(BaseTool):
+    name: str = "Customer Demand Tool"
+    description: str = """
+    Models retail demand as customer segments that respond to price, promotions and stockouts, and generates
+    thousands of demand scenarios under a pricing 'plan' (a 'price', 'price_changes' from a given step on, and
+    'promotion_steps') in one call. Pass the ERP 'history' (from get_historical_data) or 'observed_demand', with the
+    'observed_prices' and 'observed_promotions' of those periods if known, to fit the segments to the data first;
+    otherwise give a 'model' or use the default segments. The result has the mean demand and its 10th and 90th
+    percentiles per step, the expected revenue, the demand of each segment and the share of unmet demand that waits
+    rather than being lost. Its 'model' and the plan can be passed to the simulation as a demand distribution of kind
+    'segmented' (with 'customers' and 'pricing') to test ordering policies against this demand.
+    """
+
+    def _run(self, scenario_request: DemandScenarioRequest) -> DemandScenarioResult:
+        """
+        Executes the customer demand fit and scenario generation.
+
+        Args:
+            scenario_request: A DemandScenarioRequest object with the model or observations and the pricing plan.
+
+        Returns:
+            A DemandScenarioResult object with the demand outlook, or an error message if validation fails.
+        """
+        # Ensure the input is a Pydantic model, handling the case where it's passed as a dict.
+        if isinstance(scenario_request, dict):
+            try:
+                scenario_request = DemandScenarioRequest(**scenario_request)
+            except ValidationError as e:
+                return f"Error: Invalid demand scenario request provided. Details: {e}"
+
+        try:
+            return CustomerDemandEngine(scenario_request).run()
+        except ValueError as e:
+            return f"Customer demand modelling failed: {e}"
+
+def get_customer_tools() -> list:
+    """
+    Factory function that returns a list of all available customer behaviour tools.
+    """
+    return [CustomerDemandTool()]
@@ -1,7 +1,11 @@
 import json
 from crewai.tools import BaseTool, tool
 from app.digital_twin import DigitalTwin
-from app.data_models.supply_chain_models import Order, SupplyChainNodeStatus, SupplyChainStatus
+from app.data_models.logistics_models import Lane
+from app.data_models.production_models import ProductionCapacity
+from app.data_models.supply_chain_models import (
+    Order, OrderBatch, OrderBatchResult, SupplyChainNodeStatus, SupplyChainStatus, TwinAdvanceRequest, TwinAdvanceResult
+)
 
 # Create a singleton instance of the DigitalTwin to be used by all tools.
 # This ensures that all agents interact with the same, consistent state.
@@ -33,6 +37,18 @@ def place_order_in_digital_twin(order: Order) -> SupplyChainNodeStatus:
         order = Order(**order)
     return digital_twin.place_order(order)
 
+@tool("Apply Order Batch Tool")
+def apply_order_batch_in_digital_twin(batch: OrderBatch) -> OrderBatchResult:
+    """
+    Places, cancels and amends many orders in the Digital Twin in one call.
+    Each operation has an 'action' ('place' with an 'order', 'cancel' with an 'order_id', or 'amend' with an
+    'order_id' and a new 'quantity'). With 'atomic' set (the default), nothing is applied if any operation is invalid.
+    Returns the number of applied operations, the rejected ones with their reasons, and the pending quantities per node.
+    """
+    if isinstance(batch, dict):
+        batch = OrderBatch(**batch)
+    return digital_twin.apply_order_batch(batch)
+
 @tool("Advance Simulation Tool")
 def advance_digital_twin_simulation() -> None:
     """
@@ -41,6 +57,52 @@ def advance_digital_twin_simulation() -> None:
     """
     digital_twin.step()
 
+@tool("Advance Simulation Multiple Steps Tool")
+def advance_digital_twin_steps(request: TwinAdvanceRequest) -> TwinAdvanceResult:
+    """
+    Advances the Digital Twin simulation by up to 'n_steps' steps in one call (e.g., a 13-week horizon).
+    An optional 'ordering_policy_str' lambda places orders for every node automatically before each step, and an
+    optional 'until' lambda stops the advance early. Returns a per-step summary of inventory, backlog and pipeline.
+    """
+    if isinstance(request, dict):
+        request = TwinAdvanceRequest(**request)
+    try:
+        return digital_twin.advance(request.n_steps, until=request.get_condition(), policy=request.get_ordering_policy())
+    except ValueError as e:
+        return f"Error: {e}"
+
+@tool("Configure Production Capacity Tool")
+def configure_production_in_digital_twin(node_name: str, capacity: ProductionCapacity) -> str:
+    """
+    Gives the producing node of the Digital Twin (e.g., 'brewery') a finite production capacity with a
+    'capacity' per step, a 'setup_time' per product produced in a step, a 'batch_size' and a 'setup_cost'.
+    The node then places production orders with itself (source and destination are the node), which are
+    produced in the order they were placed as far as each step's capacity allows.
+    """
+    if isinstance(capacity, dict):
+        capacity = ProductionCapacity(**capacity)
+    try:
+        digital_twin.configure_production(node_name, capacity)
+    except ValueError as e:
+        return f"Error: {e}"
+    return f"The production capacity of '{node_name}' is now {capacity.capacity} units per step."
+
+@tool("Configure Lane Tool")
+def configure_lane_in_digital_twin(lane: Lane) -> str:
+    """
+    Adds or replaces a transport lane between two nodes of the Digital Twin (e.g., 'distributor' to 'wholesaler').
+    A lane has a 'transit_time' distribution in steps, a 'vehicle_capacity' and freight costs. From the next step on,
+    the shipments created on the lane in the same step are consolidated into vehicles and take their vehicle's transit
+    time as their ETA; shipments on routes without a lane keep an ETA of 2 steps.
+    """
+    if isinstance(lane, dict):
+        lane = Lane(**lane)
+    try:
+        digital_twin.configure_lane(lane)
+    except ValueError as e:
+        return f"Error: {e}"
+    return f"The lane from '{lane.origin}' to '{lane.destination}' is configured."
+
 def get_digital_twin_tools() -> list:
     """
     Factory function that returns a list of all available Digital Twin tools.
@@ -50,5 +112,9 @@ def get_digital_twin_tools() -> list:
         get_node_state,
         get_supply_chain_state,
         place_order_in_digital_twin,
-        advance_digital_twin_simulation
+        apply_order_batch_in_digital_twin,
+        advance_digital_twin_simulation,
+        advance_digital_twin_steps,
+        configure_production_in_digital_twin,
+        configure_lane_in_digital_twin
     ]
\ No newline at end of file
@@ -0,0 +1,49 @@
+from crewai.tools import BaseTool
+from pydantic import ValidationError
+from app.data_models.disruption_models import ImpactRequest, ImpactReport
+from app.digital_twin import DigitalTwin
+from app.simulations.disruption_impact import DisruptionImpactEngine, network_from_twin
+
+class DisruptionImpactTool(BaseTool):
+    name: str = "Disruption Impact Tool"
+    description: str = """
+    Quantifies how disruptions spread downstream through the supply network. Each disruption targets a 'node'
+    (e.g., 'brewery') or the lane from an 'origin' to a 'destination', with a 'capacity_loss' (the fraction of
+    throughput lost, 1 for a full outage), a 'lead_time_delay' in steps, a 'start' (steps from now) and a 'duration'.
+    Without 'nodes', the network and its current stock, shipments and orders are taken from the Digital Twin,
+    with a customer 'demand' per step at the retailer; otherwise give every node with its 'supplier', 'inventory',
+    'demand' and 'lead_time'. The result ranks every node downstream of the disruptions by its extra cost over the
+    'horizon', with the step at which it first runs short (its time to stockout).
+    """
+
+    def _run(self, impact_request: ImpactRequest) -> ImpactReport:
+        """
+        Executes the disruption impact what-if.
+
+        Args:
+            impact_request: An ImpactRequest object with the disruptions and, optionally, the network.
+
+        Returns:
+            An ImpactReport object with the ranked impacts, or an error message if validation fails.
+        """
+        # Ensure the input is a Pydantic model, handling the case where it's passed as a dict.
+        if isinstance(impact_request, dict):
+            try:
+                impact_request = ImpactRequest(**impact_request)
+            except ValidationError as e:
+                return f"Error: Invalid impact request provided. Details: {e}"
+
+        try:
+            if not impact_request.nodes:
+                # The shared Digital Twin is the singleton instance.
+                nodes = network_from_twin(DigitalTwin(), impact_request.product_id, impact_request.demand)
+                impact_request = impact_request.model_copy(update={'nodes': nodes})
+            return DisruptionImpactEngine(impact_request).run()
+        except ValueError as e:
+            return f"Disruption impact analysis failed: {e}"
+
+def get_disruption_tools() -> list:
+    """
+    Factory function that returns a list of all available disruption tools.
+    """
+    return [DisruptionImpactTool()]
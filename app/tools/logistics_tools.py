@@ -0,0 +1,43 @@
+from crewai.tools import BaseTool
+from pydantic import ValidationError
+from app.data_models.logistics_models import LoadPlanningRequest, LoadPlan
+from app.optimizations.load_planning import LoadPlanner
+
+class LoadPlanningTool(BaseTool):
+    name: str = "Load Planning and Routing Tool"
+    description: str = """
+    Builds vehicle loads and delivery routes from one depot. You must provide the 'depot', the (x, y)
+    'coordinates' of the depot and every destination, the 'loads' (each a 'destination' and a 'quantity',
+    optionally with a 'shipment_id') and the 'vehicle_capacity'. Loads for the same destination are
+    consolidated, full truckloads are sent directly, and the rest is routed with the Clarke-Wright 'savings'
+    or the 'sweep' heuristic followed by a local search. The result lists every vehicle's stops, load and
+    distance, with the total distance and cost and the distance of delivering every load directly for comparison.
+    """
+
+    def _run(self, planning_request: LoadPlanningRequest) -> LoadPlan:
+        """
+        Executes the load planning.
+
+        Args:
+            planning_request: A LoadPlanningRequest object with the loads, locations and vehicles.
+
+        Returns:
+            A LoadPlan object with the routes, or an error message if validation or planning fails.
+        """
+        # Ensure the input is a Pydantic model, handling the case where it's passed as a dict.
+        if isinstance(planning_request, dict):
+            try:
+                planning_request = LoadPlanningRequest(**planning_request)
+            except ValidationError as e:
+                return f"Error: Invalid load planning request provided. Details: {e}"
+
+        try:
+            return LoadPlanner(planning_request).plan()
+        except ValueError as e:
+            return f"Load planning failed: {e}"
+
+def get_logistics_tools() -> list:
+    """
+    Factory function that returns a list of all available logistics tools.
+    """
+    return [LoadPlanningTool()]
@@ -0,0 +1,43 @@
+from crewai.tools import BaseTool
+from pydantic import ValidationError
+from app.data_models.production_models import ProductionScheduleRequest, ProductionSchedule
+from app.optimizations.production_scheduling import ProductionScheduler
+
+class ProductionSchedulingTool(BaseTool):
+    name: str = "Production Scheduling Tool"
+    description: str = """
+    Schedules the production of one or more products on a capacity-constrained producing node (e.g., the brewery)
+    over several periods. You must provide the 'demand' of each product per period and the 'capacity', with the
+    units that can be produced per period, the 'setup_time' lost to each product produced in a period, the
+    'batch_size' and the 'setup_cost'. Set 'method' to 'heuristic' for a feasible schedule in milliseconds or
+    to 'milp' for the cost-optimal schedule. The result contains the quantity to produce of each product in
+    each period, the resulting inventory, backlog and capacity utilisation, and the holding, backorder and setup costs.
+    """
+
+    def _run(self, schedule_request: ProductionScheduleRequest) -> ProductionSchedule:
+        """
+        Executes the production scheduling.
+
+        Args:
+            schedule_request: A ProductionScheduleRequest object with the requirements, capacity and costs.
+
+        Returns:
+            A ProductionSchedule object with the schedule, or an error message if validation or scheduling fails.
+        """
+        # Ensure the input is a Pydantic model, handling the case where it's passed as a dict.
+        if isinstance(schedule_request, dict):
+            try:
+                schedule_request = ProductionScheduleRequest(**schedule_request)
+            except ValidationError as e:
+                return f"Error: Invalid production schedule request provided. Details: {e}"
+
+        try:
+            return ProductionScheduler(schedule_request).schedule()
+        except ValueError as e:
+            return f"Production scheduling failed: {e}"
+
+def get_production_tools() -> list:
+    """
+    Factory function that returns a list of all available production tools.
+    """
+    return [ProductionSchedulingTool()]
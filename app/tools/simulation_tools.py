@@ -2,7 +2,10 @@ import json
 from crewai.tools import BaseTool
 from pydantic import BaseModel, ValidationError
 from app.simulations.supply_chain_simulation import SupplyChainSimulation
-from app.data_models.simulation_models import SimulationRequest, SimulationResults
+from app.simulations.policy_optimization import PolicyOptimizer
+from app.simulations.policy_comparison import PolicyComparator
+from app.data_models.simulation_models import SimulationRequest, SimulationResults, PolicySearchRequest, PolicySearchResult
+from app.data_models.simulation_models import PolicyComparisonRequest, PolicyComparisonResult
 
 class SupplyChainSimulationTool(BaseTool):
     name: str = "Predictive Supply Chain Simulation Tool"
@@ -10,7 +13,8 @@ class SupplyChainSimulationTool(BaseTool):
     Runs a 'what-if' discrete-event simulation of the supply chain to test different ordering policies.
     This tool is essential for comparing the potential outcomes of different heuristic strategies
     before applying one in the live Digital Twin. You must provide the 'initial_state',
-    'ordering_policy_str', and a 'scenario_name' as arguments.
+    'ordering_policy_str', and a 'scenario_name' as arguments. Add 'production' with the brewery's
+    'capacity' per step, 'setup_time', 'batch_size' and 'setup_cost' to simulate finite production capacity.
     """
     def _run(self, simulation_request: SimulationRequest) -> SimulationResults:
         """
@@ -37,8 +41,74 @@ class SupplyChainSimulationTool(BaseTool):
 
         return results
 
+class PolicyOptimizationTool(BaseTool):
+    name: str = "Simulation-Based Policy Optimization Tool"
+    description: str = """
+    Finds the best parameters of an ordering policy family by running many simulations, instead of
+    testing hand-written policies one at a time. Supported families are 'base_stock' (order up to S),
+    's_S' (order up to S when the inventory position falls to s) and 'R_Q' (order multiples of Q when
+    the inventory position falls to R), with one set of parameters per node. You must provide the
+    'initial_state' and 'policy_family'; the result contains the best parameters, a ready-to-use
+    'ordering_policy_str', and confidence intervals for its cost and its improvement over the start.
+    """
+
+    def _run(self, search_request: PolicySearchRequest) -> PolicySearchResult:
+        """
+        Executes the policy parameter search.
+
+        Args:
+            search_request: A PolicySearchRequest object with the scenario and the search settings.
+
+        Returns:
+            A PolicySearchResult object with the best policy, or an error message if validation fails.
+        """
+        # Ensure the input is a Pydantic model, handling the case where it's passed as a dict.
+        if isinstance(search_request, dict):
+            try:
+                search_request = PolicySearchRequest(**search_request)
+            except ValidationError as e:
+                return f"Error: Invalid policy search request provided. Details: {e}"
+
+        try:
+            return PolicyOptimizer(search_request).optimize()
+        except ValueError as e:
+            return f"Policy search failed: {e}"
+
+class PolicyComparisonTool(BaseTool):
+    name: str = "Policy Comparison Tool"
+    description: str = """
+    Compares two or more ordering policies on the same scenario and returns the best one, instead of
+    simulating each policy once with the simulation tool. Replications are added only until the
+    differences between the policies are statistically clear, and clearly worse policies are dropped early.
+    You must provide the 'initial_state' and 'policies', a dict from a policy name to its lambda string.
+    The result contains the 'best_policy', its 'ordering_policy_str', and for every policy its mean cost
+    with a confidence interval and the confidence interval of its cost difference to the best policy.
+    """
+
+    def _run(self, comparison_request: PolicyComparisonRequest) -> PolicyComparisonResult:
+        """
+        Executes the adaptive policy comparison.
+
+        Args:
+            comparison_request: A PolicyComparisonRequest object with the scenario and the policies to compare.
+
+        Returns:
+            A PolicyComparisonResult object with the best policy, or an error message if validation fails.
+        """
+        # Ensure the input is a Pydantic model, handling the case where it's passed as a dict.
+        if isinstance(comparison_request, dict):
+            try:
+                comparison_request = PolicyComparisonRequest(**comparison_request)
+            except ValidationError as e:
+                return f"Error: Invalid policy comparison request provided. Details: {e}"
+
+        try:
+            return PolicyComparator(comparison_request).compare()
+        except ValueError as e:
+            return f"Policy comparison failed: {e}"
+
 def get_simulation_tools() -> list:
     """
     Factory function that returns a list of all available simulation tools.
     """
-    return [SupplyChainSimulationTool()]
\ No newline at end of file
+    return [SupplyChainSimulationTool(), PolicyOptimizationTool(), PolicyComparisonTool()]
\ No newline at end of file
@@ -0,0 +1,44 @@
+from crewai.tools import BaseTool
+from pydantic import ValidationError
+from app.data_models.supplier_models import SourcingRequest, SourcingPlan
+from app.optimizations.supplier_allocation import SupplierSourcingEngine
+
+class SupplierSourcingTool(BaseTool):
+    name: str = "Supplier Scoring and Allocation Tool"
+    description: str = """
+    Scores every supplier of every product on price, reliability, lead time and disruption risk in one call,
+    and splits the demand of each product across its suppliers at the lowest risk-adjusted cost. You must
+    provide the 'suppliers', each with its 'name', 'product_id', 'price' and 'reliability_score' (as returned
+    by the ERP's get_supplier_info) and optionally its 'lead_time', 'capacity', and the 'weather_forecast' and
+    'news_headlines' for its location from the weather and news feeds, which determine its risk. Add the
+    'demand' per product to get an allocation; 'max_share' limits the share of any single supplier.
+    The result ranks the suppliers of each product and lists the allocated quantities and any unmet demand.
+    """
+
+    def _run(self, sourcing_request: SourcingRequest) -> SourcingPlan:
+        """
+        Executes the supplier scoring and allocation.
+
+        Args:
+            sourcing_request: A SourcingRequest object with the candidate suppliers and the demand.
+
+        Returns:
+            A SourcingPlan object with the scores and allocations, or an error message if validation fails.
+        """
+        # Ensure the input is a Pydantic model, handling the case where it's passed as a dict.
+        if isinstance(sourcing_request, dict):
+            try:
+                sourcing_request = SourcingRequest(**sourcing_request)
+            except ValidationError as e:
+                return f"Error: Invalid sourcing request provided. Details: {e}"
+
+        try:
+            return SupplierSourcingEngine(sourcing_request).run()
+        except ValueError as e:
+            return f"Supplier sourcing failed: {e}"
+
+def get_supplier_tools() -> list:
+    """
+    Factory function that returns a list of all available supplier tools.
+    """
+    return [SupplierSourcingTool()]
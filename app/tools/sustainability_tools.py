@@ -1,6 +1,7 @@
 from crewai.tools import BaseTool
 from app.flows.sustainability_flow import sustainability_flow
 from app.data_models.sustainability_report_models import SustainabilityReport
+from app.rules.sustainability_rules import get_rule_engine
 
 
 class SustainabilityEvaluationTool(BaseTool):
@@ -10,7 +11,13 @@ class SustainabilityEvaluationTool(BaseTool):
     def _run(self, proposed_action: str) -> SustainabilityReport:
         """
         Executes the sustainability evaluation flow and returns the final report as a Pydantic object.
+        Routine actions that the guide's rules decide conclusively are answered by the rule engine
+        without running the LLM flow.
         """
+        report = get_rule_engine().evaluate(proposed_action)
+        if report is not None:
+            return report
+
         # Late import to prevent circular dependency
         from app.agents.sustainability_compliance_agent import sustainability_compliance_agent
         
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from app.utils.metrics import METRICS
+
+class TTLCache:
+    """
+    A thread-safe cache whose entries expire a fixed time after they were stored.
+
+    When full, the least recently used entry is evicted. Hits and misses are counted in the
+    process-wide metrics registry under the cache's name.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        """
+        Initializes an empty cache.
+
+        Args:
+            name: The name of the cache, used as the label of its metrics.
+            ttl_seconds: How long an entry stays valid; 0 disables caching.
+            max_entries: The maximum number of entries.
+            clock: The time source, in seconds (replaceable in tests).
+        """
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value of a key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self.clock():
+                if entry is not None:
+                    del self._entries[key]
+                METRICS.increment("cache_misses_total", cache=self.name)
+                return None
+            self._entries.move_to_end(key)
+        METRICS.increment("cache_hits_total", cache=self.name)
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """Stores a value until the TTL has passed, evicting the least recently used entry if the cache is full."""
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Returns the cached value of a key, computing and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,94 @@
+import asyncio
+import functools
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from app.utils.logging_utils import get_logger
+from app.utils.metrics import METRICS, MetricsRegistry
+
+logger = get_logger("concurrency")
+
+class ServerBusyError(RuntimeError):
+    """Raised when a request is rejected because the server's request queue is full."""
+
+class RequestLimiter:
+    """
+    Bounds the number of requests a server handles concurrently and the number waiting for a slot.
+
+    Requests beyond the queue bound are rejected immediately with a ServerBusyError instead of
+    piling up, so that clients see backpressure as a fast error they can retry, rather than as
+    unbounded latency. Waiting requests are admitted in arrival order.
+
+    Example:
+        limiter = RequestLimiter("erp", max_concurrency=8, max_queued=32)
+
+        @mcp.tool()
+        @limiter.limit
+        async def get_historical_data() -> List[HistoricalData]: ...
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 8, max_queued: int = 32,
+                 queue_timeout: Optional[float] = 10.0, registry: MetricsRegistry = METRICS):
+        """
+        Initializes the limiter.
+
+        Args:
+            name: The name of the server, used as a metric label.
+            max_concurrency: The maximum number of requests handled at the same time.
+            max_queued: The maximum number of requests waiting for a slot; further requests are rejected.
+            queue_timeout: The maximum time in seconds a request waits for a slot before it is rejected, or None to wait indefinitely.
+            registry: The metrics registry that records queue waits, latencies and rejections.
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.registry = registry
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @asynccontextmanager
+    async def slot(self, operation: str = "request"):
+        """
+        Waits for a free slot and holds it for the duration of the block.
+
+        Args:
+            operation: The name of the operation (e.g., the tool name), used as a metric label.
+
+        Raises:
+            ServerBusyError: If the queue is full or the request waited longer than the queue timeout.
+        """
+        if self._semaphore.locked() and self.waiting >= self.max_queued:
+            self._reject(operation, "queue full")
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject(operation, "queue timeout")
+        finally:
+            self.waiting -= 1
+        self.registry.observe("server_queue_wait_seconds", time.perf_counter() - start, server=self.name)
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+            self.registry.observe("server_request_seconds", time.perf_counter() - start, server=self.name, operation=operation)
+
+    def limit(self, func):
+        """Decorates an async request handler so that every call holds a slot of this limiter."""
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with self.slot(func.__name__):
+                return await func(*args, **kwargs)
+        return wrapper
+
+    def _reject(self, operation: str, reason: str):
+        self.registry.increment("server_requests_rejected_total", server=self.name, reason=reason)
+        logger.warning("Rejected '%s' on server '%s': %s (%d active, %d waiting).",
+                       operation, self.name, reason, self.active, self.waiting)
+        raise ServerBusyError(f"The {self.name} server is busy ({reason}); retry the request later.")
@@ -0,0 +1,96 @@
+import itertools
+import secrets
+import sys
+from typing import Callable, Dict, List, Optional
+
+class IdSequence:
+    """
+    Generates monotonic integer IDs that can be rendered as UUID-formatted strings.
+
+    Internally an ID is a small integer from a counter, which costs neither a call to the system's
+    random source (as `uuid.uuid4` does) nor a UUID object. Rendered IDs combine a random 64-bit
+    namespace, drawn once per sequence, with the counter value, so they stay unique across processes
+    and can be parsed back into their integer.
+    """
+
+    def __init__(self, namespace: Optional[int] = None):
+        """
+        Initializes a sequence.
+
+        Args:
+            namespace: The 64-bit namespace of the rendered IDs, or None for a random namespace.
+        """
+        self.namespace = secrets.randbits(64) if namespace is None else namespace
+        digits = f"{self.namespace:016x}"
+        self._prefix = f"{digits[:8]}-{digits[8:12]}-{digits[12:]}"
+        self._counter = itertools.count(1)
+
+    def next(self) -> int:
+        """Returns the next integer ID."""
+        return next(self._counter)
+
+    def render(self, value: int) -> str:
+        """Renders an integer ID of this sequence as a UUID-formatted string."""
+        suffix = f"{value:016x}"
+        return f"{self._prefix}-{suffix[:4]}-{suffix[4:]}"
+
+    def next_uuid(self) -> str:
+        """Returns the next ID rendered as a UUID-formatted string."""
+        return self.render(next(self._counter))
+
+    def parse(self, rendered: str) -> Optional[int]:
+        """Returns the integer of an ID rendered by this sequence, or None if it was rendered elsewhere."""
+        if len(rendered) != 36 or not rendered.startswith(self._prefix):
+            return None
+        try:
+            return int(rendered[19:23] + rendered[24:], 16)
+        except ValueError:
+            return None
+
+class NameTable:
+    """
+    Interns the names of nodes or products.
+
+    Each distinct spelling is normalised and interned once, so repeated lookups return the same
+    string object without allocating (e.g., instead of calling `.lower()` on every use), and each
+    canonical name gets a small integer code for compact storage.
+    """
+
+    def __init__(self, normalise: Callable[[str], str] = str.lower):
+        """
+        Initializes an empty table.
+
+        Args:
+            normalise: The function that maps a spelling to its canonical name.
+        """
+        self.normalise = normalise
+        self.names: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self._canonical: Dict[str, str] = {}
+
+    def canonical(self, name: str) -> str:
+        """Returns the interned canonical form of a name."""
+        canonical = self._canonical.get(name)
+        if canonical is None:
+            canonical = self._canonical[name] = sys.intern(self.normalise(name))
+            if canonical not in self.codes:
+                self.codes[canonical] = len(self.names)
+                self.names.append(canonical)
+        return canonical
+
+    def code(self, name: str) -> int:
+        """Returns the integer code of a name."""
+        return self.codes[self.canonical(name)]
+
+    def name(self, code: int) -> str:
+        """Returns the canonical name of an integer code."""
+        return self.names[code]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+# Process-wide sequences and name tables shared by the Digital Twin and the boundary models.
+ORDER_IDS = IdSequence()
+SHIPMENT_IDS = IdSequence()
+NODE_NAMES = NameTable()
+PRODUCT_NAMES = NameTable(normalise=str)
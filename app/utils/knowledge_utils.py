@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import re
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from app.data_models.knowledge_models import KnowledgeChunk, KnowledgeMatch
+
+# Default location of the persisted vector index.
+KNOWLEDGE_INDEX_PATH = '.knowledge_index'
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*$")
+TOKEN_PATTERN = re.compile(r"[a-z0-9_]+")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with you your "
+    "we our can must should not all any each which".split()
+)
+
+# An embedding function maps a list of texts to a 2D array with one row per text.
+EmbedFunction = Callable[[List[str]], np.ndarray]
+
+def hashing_embedder(dimensions: int = 1024) -> EmbedFunction:
+    """
+    Returns a local, deterministic embedding function based on hashed term frequencies.
+    It needs no network access and is fast enough to re-embed the whole corpus on every change.
+
+    Args:
+        dimensions: The size of the embedding vectors.
+
+    Returns:
+        An embedding function producing L2-normalised vectors.
+    """
+    def embed(texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in TOKEN_PATTERN.findall(text.lower()):
+                if token in STOP_WORDS or len(token) < 2:
+                    continue
+                digest = hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest()
+                vectors[row, int.from_bytes(digest, 'little') % dimensions] += 1.0
+        # Sublinear term frequency keeps long sections from dominating short ones.
+        np.log1p(vectors, out=vectors)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+    embed.__name__ = f"hashing-{dimensions}"
+    return embed
+
+def chunk_markdown(source: str, content: str, max_chars: int = 1200) -> List[KnowledgeChunk]:
+    """
+    Splits a markdown document into chunks along its headings.
+    Sections longer than `max_chars` are further split on paragraph boundaries.
+
+    Args:
+        source: The path of the markdown file.
+        content: The content of the markdown file.
+        max_chars: The maximum number of characters per chunk.
+
+    Returns:
+        A list of KnowledgeChunk objects in document order.
+    """
+    chunks: List[KnowledgeChunk] = []
+    headings: List[str] = []
+    section: List[str] = []
+
+    def flush():
+        heading = " > ".join(headings) or os.path.basename(source)
+        buffer = ""
+        for paragraph in "\n".join(section).split("\n\n"):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if buffer and len(buffer) + len(paragraph) > max_chars:
+                chunks.append(KnowledgeChunk(source=source, heading=heading, text=buffer))
+                buffer = ""
+            buffer = f"{buffer}\n\n{paragraph}" if buffer else paragraph
+        if buffer:
+            chunks.append(KnowledgeChunk(source=source, heading=heading, text=buffer))
+        section.clear()
+
+    in_code_block = False
+    for line in content.splitlines():
+        if line.strip().startswith("```"):
+            in_code_block = not in_code_block
+        match = None if in_code_block else HEADING_PATTERN.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            headings[level - 1:] = [match.group(2)]
+            continue
+        section.append(line)
+    flush()
+    return chunks
+
+class KnowledgeIndex:
+    """
+    A persisted vector index over the markdown files of one or more directories.
+
+    Files are chunked and embedded once. The index is stored on disk together with the
+    modification time of every source file, so later runs only re-embed the files that
+    have been added or changed since the index was last built.
+    """
+
+    def __init__(self, directories: List[str], index_path: str = KNOWLEDGE_INDEX_PATH,
+                 embed_fn: Optional[EmbedFunction] = None, max_chars: int = 1200):
+        """
+        Initializes the index and brings it up to date with the files on disk.
+
+        Args:
+            directories: The directories to index recursively.
+            index_path: The directory where the index is persisted.
+            embed_fn: The embedding function to use. Defaults to the local hashing embedder.
+            max_chars: The maximum number of characters per chunk.
+        """
+        self.directories = directories
+        self.index_path = index_path
+        self.embed_fn = embed_fn or hashing_embedder()
+        self.max_chars = max_chars
+        self.chunks: List[KnowledgeChunk] = []
+        self.vectors: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        self.file_mtimes: Dict[str, float] = {}
+        self.refresh()
+
+    @property
+    def embedder_name(self) -> str:
+        """The name of the embedding function, stored with the index to invalidate it when the embedder changes."""
+        return getattr(self.embed_fn, '__name__', type(self.embed_fn).__name__)
+
+    def _discover_files(self) -> Dict[str, float]:
+        """Returns the modification times of all markdown files in the indexed directories."""
+        files = {}
+        for directory in self.directories:
+            if not os.path.isdir(directory):
+                continue
+            for root, _, filenames in os.walk(directory):
+                for filename in sorted(filenames):
+                    if filename.endswith(".md"):
+                        path = os.path.join(root, filename)
+                        files[path] = os.path.getmtime(path)
+        return files
+
+    def refresh(self) -> bool:
+        """
+        Loads the persisted index and re-embeds any files that were added, changed or removed.
+
+        Returns:
+            True if the index was modified and persisted again, otherwise False.
+        """
+        current_files = self._discover_files()
+        self._load()
+
+        changed = {path for path, mtime in current_files.items() if self.file_mtimes.get(path) != mtime}
+        removed = set(self.file_mtimes) - set(current_files)
+        if not changed and not removed:
+            return False
+
+        # Keep the chunks of unchanged files and re-embed only the rest.
+        keep = [i for i, chunk in enumerate(self.chunks) if chunk.source not in changed | removed]
+        chunks = [self.chunks[i] for i in keep]
+        vectors = [self.vectors[keep]] if keep else []
+
+        new_chunks = []
+        for path in sorted(changed):
+            with open(path, 'r', encoding='utf-8') as f:
+                new_chunks.extend(chunk_markdown(path, f.read(), self.max_chars))
+        if new_chunks:
+            vectors.append(self.embed_fn([f"{c.heading}\n{c.text}" for c in new_chunks]).astype(np.float32))
+
+        self.chunks = chunks + new_chunks
+        self.vectors = np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+        self.file_mtimes = current_files
+        self._save()
+        return True
+
+    def query(self, text: str, top_k: int = 4) -> List[KnowledgeMatch]:
+        """
+        Returns the chunks most similar to the given text.
+
+        Args:
+            text: The query text (e.g., a task description).
+            top_k: The maximum number of chunks to return.
+
+        Returns:
+            A list of KnowledgeMatch objects, ordered from most to least relevant.
+        """
+        if not self.chunks:
+            return []
+        query_vector = self.embed_fn([text])[0]
+        scores = self.vectors @ query_vector
+        top_k = min(top_k, len(self.chunks))
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best])]
+        return [KnowledgeMatch(chunk=self.chunks[i], score=float(scores[i])) for i in best if scores[i] > 0]
+
+    def format_context(self, text: str, top_k: int = 4) -> str:
+        """Returns the top-k chunks for a query, formatted for injection into a prompt."""
+        sections = [f"[{m.chunk.source} | {m.chunk.heading}]\n{m.chunk.text}" for m in self.query(text, top_k)]
+        return "\n\n---\n\n".join(sections)
+
+    def table_of_contents(self) -> str:
+        """Returns a compact list of the indexed documents and their section headings."""
+        toc: Dict[str, List[str]] = {}
+        for chunk in self.chunks:
+            headings = toc.setdefault(chunk.source, [])
+            heading = chunk.heading.split(" > ")[-1]
+            if heading not in headings:
+                headings.append(heading)
+        return "\n".join(f"- {source}: " + "; ".join(headings) for source, headings in toc.items())
+
+    def _load(self):
+        """Loads the persisted index if it exists and was built with the same embedder."""
+        metadata_path = os.path.join(self.index_path, 'index.json')
+        vectors_path = os.path.join(self.index_path, 'vectors.npy')
+        if not (os.path.exists(metadata_path) and os.path.exists(vectors_path)):
+            return
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        if metadata.get('embedder') != self.embedder_name or metadata.get('max_chars') != self.max_chars:
+            return
+        self.chunks = [KnowledgeChunk(**c) for c in metadata['chunks']]
+        self.file_mtimes = metadata['files']
+        self.vectors = np.load(vectors_path)
+
+    def _save(self):
+        """Persists the chunks, file modification times and vectors to disk."""
+        os.makedirs(self.index_path, exist_ok=True)
+        metadata = {
+            'embedder': self.embedder_name,
+            'max_chars': self.max_chars,
+            'files': self.file_mtimes,
+            'chunks': [c.model_dump() for c in self.chunks],
+        }
+        with open(os.path.join(self.index_path, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f)
+        np.save(os.path.join(self.index_path, 'vectors.npy'), self.vectors)
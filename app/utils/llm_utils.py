@@ -2,6 +2,8 @@ import os
 from dotenv import load_dotenv
 from crewai import LLM
 from crewai.utilities.paths import db_storage_path
+from app.utils.metrics import install_crewai_metrics
+from app.utils.offline_llm import OFFLINE_PREFIX, get_offline_llm
 
 load_dotenv()
 
@@ -10,9 +12,15 @@ def get_llm() -> LLM:
     """
     Initializes and returns the Language Model (LLM) configuration for the crew.
     It reads the model name and API key from environment variables.
+    A MODEL starting with 'offline/' selects the offline stub, replay or record backend instead.
+    LLM and tool call metrics are recorded from CrewAI's event bus once an LLM is in use.
     """
+    install_crewai_metrics()
+    model = os.getenv("MODEL")
+    if model and model.startswith(OFFLINE_PREFIX):
+        return get_offline_llm(model, api_key=os.getenv("GEMINI_API_KEY"))
     return LLM(
-        model=os.getenv("MODEL"),
+        model=model,
         api_key=os.getenv("GEMINI_API_KEY")
     )
 
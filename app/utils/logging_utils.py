@@ -0,0 +1,106 @@
+import json
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+# All application loggers live under this namespace so they can be configured independently of CrewAI's.
+ROOT_LOGGER_NAME = 'scct'
+# A level above CRITICAL that disables all application logging.
+QUIET_LEVEL = logging.CRITICAL + 10
+
+_configured = False
+
+class JsonFormatter(logging.Formatter):
+    """Formats log records as single-line JSON objects for log pipelines."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        # Structured fields are passed with `extra={"fields": {...}}`.
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    Passes only one in every `every` records for each distinct message template.
+    It is used for per-event messages (e.g., one per order or shipment) that would otherwise flood the output.
+    """
+
+    def __init__(self, every: int = 1):
+        super().__init__()
+        self.every = max(1, every)
+        self._counts: Dict[Tuple[str, str], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1:
+            return True
+        key = (record.name, record.msg)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        return count % self.every == 0
+
+def configure_logging(level: str = None, fmt: str = None, stream=None):
+    """
+    Configures the application loggers.
+
+    Args:
+        level: The log level (e.g., 'DEBUG', 'INFO', 'QUIET'). Defaults to the LOG_LEVEL environment variable, or INFO.
+        fmt: The output format, 'text' or 'json'. Defaults to the LOG_FORMAT environment variable, or text.
+        stream: The stream to write to. Defaults to standard output.
+    """
+    global _configured
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.getenv("LOG_FORMAT", "text")).lower()
+
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter("%(levelname)s: %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(QUIET_LEVEL if level == 'QUIET' else logging.getLevelName(level))
+    root.propagate = False
+    _configured = True
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns an application logger, configuring logging from the environment on first use.
+
+    Args:
+        name: The name of the component (e.g., 'digital_twin').
+    """
+    if not _configured:
+        configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+def get_event_logger(name: str) -> logging.Logger:
+    """
+    Returns a logger for high-volume, per-event messages.
+    Its records are sampled according to the LOG_SAMPLE_EVERY environment variable (default: log every event).
+
+    Args:
+        name: The name of the component (e.g., 'digital_twin.node').
+    """
+    logger = get_logger(f"{name}.events")
+    if not any(isinstance(f, SamplingFilter) for f in logger.filters):
+        logger.addFilter(SamplingFilter(int(os.getenv("LOG_SAMPLE_EVERY", "1"))))
+    return logger
+
+@contextmanager
+def quiet():
+    """A context manager that suppresses all application logging, e.g. for tight simulation loops."""
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    previous = root.level
+    root.setLevel(QUIET_LEVEL)
+    try:
+        yield
+    finally:
+        root.setLevel(previous)
@@ -0,0 +1,256 @@
+import bisect
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Default latency buckets in seconds, from sub-millisecond simulation steps to minute-long LLM calls.
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """A cumulative histogram with fixed bucket boundaries, in the style of Prometheus."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile by linear interpolation within the bucket that contains it."""
+        if self.count == 0:
+            return 0.0
+        rank, cumulative = q * self.count, 0
+        for i, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - cumulative) / bucket_count
+                return min(max(value, self.min), self.max)
+            cumulative += bucket_count
+        return self.max
+
+class MetricsRegistry:
+    """
+    A thread-safe, in-process registry of latency histograms and counters.
+    Metrics are identified by a name and an optional set of labels (e.g., tool="get_historical_data").
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+
+    def observe(self, name: str, value: float, **labels: str):
+        """Records a value (e.g., a latency in seconds) in the named histogram."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name: str, value: float = 1, **labels: str):
+        """Adds a value (e.g., a token or byte count) to the named counter."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def reset(self):
+        """Removes all recorded metrics."""
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def export_prometheus(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(f"{name}_bucket{_labels(key, le=repr(bound))} {cumulative}")
+                    lines.append(f"{name}_bucket{_labels(key, le='+Inf')} {histogram.count}")
+                    lines.append(f"{name}_sum{_labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{_labels(key)} {histogram.count}")
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        """Returns a JSON-serialisable summary with call counts, totals and latency percentiles."""
+        result = {"histograms": {}, "counters": {}}
+        with self._lock:
+            for name, series in sorted(self.histograms.items()):
+                for key, h in series.items():
+                    result["histograms"][name + _labels(key)] = {
+                        "count": h.count,
+                        "total_seconds": round(h.sum, 6),
+                        "mean_seconds": round(h.sum / h.count, 6) if h.count else 0.0,
+                        "p50_seconds": round(h.quantile(0.5), 6),
+                        "p95_seconds": round(h.quantile(0.95), 6),
+                        "max_seconds": round(h.max, 6),
+                    }
+            for name, series in sorted(self.counters.items()):
+                for key, value in series.items():
+                    result["counters"][name + _labels(key)] = value
+        return result
+
+def _labels(key: LabelKey, **extra: str) -> str:
+    """Formats a label set as a Prometheus label string."""
+    items = list(key) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+# Create a single registry shared by the whole application.
+METRICS = MetricsRegistry()
+
+class timed:
+    """
+    Records the wall-clock duration of a block or function call in a latency histogram.
+    It can be used both as a decorator and as a context manager.
+
+    Example:
+        @timed("digital_twin_step_seconds")
+        def step(self): ...
+
+        with timed("mcp_call_seconds", tool="get_historical_data"):
+            ...
+    """
+
+    def __init__(self, name: str, registry: MetricsRegistry = METRICS, **labels: str):
+        self.name = name
+        self.registry = registry
+        self.labels = labels
+        self._starts: List[float] = []
+
+    def __enter__(self):
+        self._starts.append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self._starts.pop(), **self.labels)
+        return False
+
+    def __call__(self, func):
+        name, registry, labels = self.name, self.registry, self.labels
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start, **labels)
+        return wrapper
+
+@contextmanager
+def profile(mode: Optional[str] = None, output_path: Optional[str] = None, top: int = 25):
+    """
+    Captures a CPU profile of the enclosed block.
+
+    Args:
+        mode: 'cprofile' or 'pyinstrument'. Defaults to the PROFILE environment variable; profiling is off if unset.
+        output_path: An optional file for the raw profile (cProfile stats or pyinstrument HTML).
+        top: The number of functions printed in the cProfile summary.
+    """
+    mode = (mode or os.getenv("PROFILE", "")).lower()
+    if mode == 'pyinstrument':
+        # pyinstrument is an optional dependency, only needed for this profiling mode.
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            print(profiler.output_text(unicode=True, color=False))
+            if output_path:
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(profiler.output_html())
+    elif mode == 'cprofile':
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+            print(stream.getvalue())
+            if output_path:
+                profiler.dump_stats(output_path)
+    else:
+        yield
+
+def install_crewai_metrics():
+    """
+    Subscribes to CrewAI's event bus to record LLM and tool call latencies, token usage and tool output sizes.
+    Tool calls include those made to the MCP servers through the MCP server adapter. It is safe to call repeatedly.
+    """
+    global _crewai_metrics_installed
+    if _crewai_metrics_installed:
+        return
+    _crewai_metrics_installed = True
+
+    # Late import so that the metrics module itself does not depend on CrewAI.
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent
+    from crewai.events.types.tool_usage_events import ToolUsageFinishedEvent, ToolUsageErrorEvent
+
+    llm_starts: Dict[str, float] = {}
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def on_llm_started(source, event):
+        llm_starts[event.call_id] = time.perf_counter()
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def on_llm_completed(source, event):
+        model = event.model or "unknown"
+        start = llm_starts.pop(event.call_id, None)
+        if start is not None:
+            METRICS.observe("llm_call_seconds", time.perf_counter() - start, model=model)
+        for usage_key, token_type in (("prompt_tokens", "prompt"), ("completion_tokens", "completion")):
+            tokens = (event.usage or {}).get(usage_key)
+            if tokens:
+                METRICS.increment("llm_tokens_total", tokens, model=model, type=token_type)
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def on_llm_failed(source, event):
+        llm_starts.pop(event.call_id, None)
+        METRICS.increment("llm_call_errors_total", model=event.model or "unknown")
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def on_tool_finished(source, event):
+        METRICS.observe("tool_call_seconds", (event.finished_at - event.started_at).total_seconds(), tool=event.tool_name)
+        METRICS.increment("tool_output_bytes_total", len(str(event.output).encode('utf-8')), tool=event.tool_name)
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def on_tool_error(source, event):
+        METRICS.increment("tool_call_errors_total", tool=event.tool_name)
+
+_crewai_metrics_installed = False
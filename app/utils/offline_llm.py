@@ -0,0 +1,291 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional
+from crewai.llms.base_llm import BaseLLM, llm_call_context
+from crewai.events.types.llm_events import LLMCallType
+from pydantic import BaseModel, PrivateAttr
+from app.data_models.llm_models import LLMRecording
+from app.utils.logging_utils import get_logger
+
+logger = get_logger('offline_llm')
+
+# MODEL values starting with this prefix select an offline backend:
+#   offline/stub                  - scripted structured outputs, no model at all
+#   offline/replay                - replays recorded responses, failing on a prompt that was never recorded
+#   offline/record:<model>        - calls <model> (e.g., gemini/gemini-2.5-pro) and records every response
+OFFLINE_PREFIX = 'offline/'
+# Default directory for the recorded responses, overridable with LLM_CASSETTE_DIR.
+CASSETTE_DIR = 'test/cassettes'
+
+# Volatile values (generated order and shipment IDs) are masked before hashing so that re-runs hit the same recording.
+UUID_PATTERN = re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.IGNORECASE)
+SCHEMA_MARKER = "OpenAPI schema:"
+TASK_PATTERN = re.compile(r"Current Task:(.*?)(?:\n\nThis is the expected criteria|$)", re.DOTALL)
+PULP_PROMPT_MARKER = "solve a linear programming problem using the PuLP library"
+
+# A stub builds the structured output for one response model from the prompt that requested it.
+StubFunction = Callable[[str], dict]
+STUBS: Dict[str, StubFunction] = {}
+
+def stub(model_name: str):
+    """Registers a scripted output for the response model with the given name (e.g., 'SustainabilityReport')."""
+    def decorator(func: StubFunction) -> StubFunction:
+        STUBS[model_name] = func
+        return func
+    return decorator
+
+def normalise_messages(messages) -> List[Dict[str, Any]]:
+    """Converts a prompt into a list of role/content messages with volatile IDs masked."""
+    if isinstance(messages, str):
+        messages = [{"role": "user", "content": messages}]
+    normalised = []
+    for message in messages:
+        content = message.get("content", "")
+        if not isinstance(content, str):
+            content = json.dumps(content, sort_keys=True, default=str)
+        normalised.append({"role": message.get("role", "user"), "content": UUID_PATTERN.sub("<id>", content)})
+    return normalised
+
+def prompt_key(messages, response_model: Optional[type] = None) -> str:
+    """Returns the hash under which the response to a prompt is recorded."""
+    payload = {
+        "messages": normalise_messages(messages),
+        "response_model": response_model.__name__ if response_model else None,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+class OfflineLLM(BaseLLM):
+    """
+    An LLM backend that runs without network access, for fast and deterministic crew runs.
+
+    In 'record' mode every call is forwarded to a real model and its response is written to a
+    cassette directory, keyed by the hash of the prompt. In 'replay' mode the recorded responses
+    are returned instead. In 'stub' mode no model is involved at all: prompts that ask for a
+    structured output get a scripted (or schema-derived placeholder) instance of it.
+
+    Native function calling is disabled in every mode so that agents use the text-based tool
+    protocol, which keeps recorded conversations identical to the replayed ones.
+    """
+
+    llm_type: str = "offline"
+    mode: str = "stub"
+    cassette_dir: str = CASSETTE_DIR
+    inner: Optional[BaseLLM] = None
+
+    _recordings: Dict[str, LLMRecording] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any):
+        super().model_post_init(__context)
+        if self.mode not in ('stub', 'replay', 'record'):
+            raise ValueError(f"Unknown offline LLM mode '{self.mode}'. Use 'stub', 'replay' or 'record'.")
+        if self.mode == 'record' and self.inner is None:
+            raise ValueError("The 'record' mode needs an inner LLM to record from.")
+        if self.mode == 'replay':
+            self._load_cassettes()
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        """
+        Answers a prompt from the recordings, the scripted stubs, or (when recording) the inner model.
+
+        Returns:
+            The response text, or an instance of `response_model` when a structured output was requested.
+
+        Raises:
+            LookupError: If replaying a prompt that has no recorded response.
+        """
+        if self.mode == 'record':
+            response = self.inner.call(messages, callbacks=callbacks, from_task=from_task,
+                                       from_agent=from_agent, response_model=response_model)
+            self._record(messages, response_model, response)
+            return response
+
+        with llm_call_context():
+            self._emit_call_started_event(messages=messages, tools=tools, callbacks=callbacks,
+                                          available_functions=available_functions,
+                                          from_task=from_task, from_agent=from_agent)
+            if self.mode == 'replay':
+                response = self._replay(messages, response_model)
+            else:
+                response = self._stub(messages, response_model)
+            self._emit_call_completed_event(response=response, call_type=LLMCallType.LLM_CALL,
+                                            from_task=from_task, from_agent=from_agent, messages=messages)
+            return response
+
+    # --- Record & Replay ---
+
+    def _record(self, messages, response_model, response):
+        """Writes one recorded response to the cassette directory."""
+        text = response.model_dump_json() if isinstance(response, BaseModel) else str(response)
+        key = prompt_key(messages, response_model)
+        recording = LLMRecording(key=key, model=self.inner.model, messages=normalise_messages(messages),
+                                 response_model=response_model.__name__ if response_model else None, response=text)
+        os.makedirs(self.cassette_dir, exist_ok=True)
+        with open(os.path.join(self.cassette_dir, f"{key}.json"), 'w', encoding='utf-8') as f:
+            f.write(recording.model_dump_json(indent=2))
+        self._recordings[key] = recording
+        logger.debug("Recorded LLM response %s", key[:12])
+
+    def _load_cassettes(self):
+        """Loads all recordings from the cassette directory."""
+        if not os.path.isdir(self.cassette_dir):
+            return
+        for filename in sorted(os.listdir(self.cassette_dir)):
+            if filename.endswith(".json"):
+                with open(os.path.join(self.cassette_dir, filename), 'r', encoding='utf-8') as f:
+                    recording = LLMRecording.model_validate_json(f.read())
+                self._recordings[recording.key] = recording
+        logger.info("Loaded %d recorded LLM responses from '%s'.", len(self._recordings), self.cassette_dir)
+
+    def _replay(self, messages, response_model):
+        """Returns the recorded response for a prompt."""
+        key = prompt_key(messages, response_model)
+        recording = self._recordings.get(key)
+        if recording is None:
+            raise LookupError(
+                f"No recorded LLM response for prompt {key[:12]} in '{self.cassette_dir}'. "
+                f"Record it first with MODEL={OFFLINE_PREFIX}record:<model>."
+            )
+        if response_model is not None:
+            return response_model.model_validate_json(recording.response)
+        return recording.response
+
+    # --- Scripted Stubs ---
+
+    def _stub(self, messages, response_model):
+        """Returns a scripted response for a prompt."""
+        prompt = "\n".join(m["content"] for m in normalise_messages(messages))
+        if PULP_PROMPT_MARKER in prompt:
+            return STUB_PULP_SCRIPT
+
+        if response_model is not None:
+            schema = response_model.model_json_schema()
+        else:
+            schema = _schema_from_prompt(prompt)
+        if schema is None:
+            return "Thought: I can answer directly.\nFinal Answer: This is a scripted response from the offline LLM stub."
+
+        name = schema.get("title", "")
+        output = STUBS[name](prompt) if name in STUBS else _placeholder(schema, schema.get("$defs", {}))
+        if response_model is not None:
+            return response_model.model_validate(output)
+        return f"Thought: I now know the final answer.\nFinal Answer: {json.dumps(output)}"
+
+def _schema_from_prompt(prompt: str) -> Optional[dict]:
+    """Extracts the JSON schema that CrewAI appends to the prompt of a task with a structured output."""
+    start = prompt.rfind(SCHEMA_MARKER)
+    if start == -1:
+        return None
+    text = prompt[start + len(SCHEMA_MARKER):].lstrip()
+    try:
+        schema, _ = json.JSONDecoder().raw_decode(text)
+    except json.JSONDecodeError:
+        return None
+    return schema if isinstance(schema, dict) else None
+
+def _placeholder(schema: dict, defs: dict) -> Any:
+    """Builds the smallest value that satisfies a JSON schema, for response models without a scripted stub."""
+    if "$ref" in schema:
+        return _placeholder(defs[schema["$ref"].split("/")[-1]], defs)
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"]
+        return _placeholder(options[0], defs) if options else None
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "default" in schema:
+        return schema["default"]
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: _placeholder(prop, defs) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return []
+    return {"string": "offline stub", "integer": 0, "number": 0.0, "boolean": False}.get(kind)
+
+# --- Scripted Outputs ---
+
+STUB_PULP_SCRIPT = '''import json
+import pulp
+
+model = pulp.LpProblem("replenishment", pulp.LpMinimize)
+order_quantity = pulp.LpVariable("order_quantity", lowBound=0)
+shortage = pulp.LpVariable("shortage", lowBound=0)
+excess = pulp.LpVariable("excess", lowBound=0)
+model += 2.0 * order_quantity + 0.5 * excess + 5.0 * shortage
+model += 20 + order_quantity - 50 == excess - shortage
+model.solve(pulp.PULP_CBC_CMD(msg=False))
+print(json.dumps({
+    "objective_value": float(pulp.value(model.objective)),
+    "variable_values": {v.name: float(v.varValue) for v in model.variables()},
+}))'''
+
+@stub("OptimizationProblem")
+def _optimization_problem(prompt: str) -> dict:
+    return {"problem_description": (
+        "Minimise 2.0 * order_quantity + 0.5 * excess + 5.0 * shortage, where order_quantity is the number of units "
+        "ordered by the retailer, subject to the inventory balance 20 + order_quantity - 50 = excess - shortage "
+        "(current inventory 20, forecast demand 50). All variables are continuous and non-negative."
+    )}
+
+@stub("DemandForecastOutput")
+def _demand_forecast(prompt: str) -> dict:
+    # Late import to prevent circular dependency
+    from app.digital_twin import DigitalTwin
+    state = DigitalTwin.detached().get_full_state()
+    history = {"period": state.current_step, "nodes": state.model_dump()["nodes"], "shipments_in_transit": []}
+    return {
+        "historical_data": [history],
+        "risk_assessment": "No disruptions reported by the offline stub; demand risk is low.",
+        "demand_forecast": {"product_id": "beer", "quantity": 20, "period": state.current_step + 1},
+    }
+
+@stub("OptimizationResult")
+def _optimization_result(prompt: str) -> dict:
+    # The optimal solution of the scripted PuLP problem above.
+    return {"objective_value": 60.0, "variable_values": {"excess": 0.0, "order_quantity": 30.0, "shortage": 0.0}}
+
+@stub("SustainabilityReport")
+def _sustainability_report(prompt: str) -> dict:
+    # Late import to prevent circular dependency
+    from app.rules.sustainability_rules import get_rule_engine
+
+    # Decide with the deterministic rule engine where it can; the task text holds the proposed action.
+    match = TASK_PATTERN.search(prompt)
+    report = get_rule_engine().evaluate(match.group(1) if match else prompt)
+    if report is not None:
+        return report.model_dump()
+
+    def section(rule: str) -> dict:
+        return {"status": "PASS", "checks": [
+            {"check_name": "Offline stub check", "rule": rule, "result": "PASS", "reason": "Scripted by the offline LLM stub."}
+        ]}
+    return {
+        "sustainability_check": section("Rule 1.1"),
+        "compliance_check": section("Regulation 2.1"),
+        "recommendation": {"decision": "APPROVE", "justification": "All scripted checks passed."},
+    }
+
+def get_offline_llm(model: str, api_key: Optional[str] = None) -> OfflineLLM:
+    """
+    Creates the offline LLM selected by a MODEL value such as 'offline/stub', 'offline/replay'
+    or 'offline/record:gemini/gemini-2.5-pro'.
+
+    Args:
+        model: The MODEL value, including the 'offline/' prefix.
+        api_key: The API key of the real model, used only when recording.
+
+    Returns:
+        The configured OfflineLLM.
+    """
+    mode, _, inner_model = model[len(OFFLINE_PREFIX):].partition(':')
+    inner = None
+    if mode == 'record':
+        # Late import so that replay and stub runs never construct a real model client.
+        from crewai import LLM
+        inner = LLM(model=inner_model, api_key=api_key)
+    return OfflineLLM(model=model, mode=mode, inner=inner,
+                      cassette_dir=os.getenv("LLM_CASSETTE_DIR", CASSETTE_DIR))
@@ -0,0 +1,60 @@
+import pytest
+from app.digital_twin import DigitalTwin, OrderRecord
+from app.utils.offline_llm import STUB_PULP_SCRIPT
+from app.data_models.supply_chain_models import SupplyChainStatus, SupplyChainNodeStatus
+from app.utils.identifiers import ORDER_IDS
+
+# Benchmarks need the pytest-benchmark plugin. Without it, only the tests using its fixture are skipped,
+# so that collecting the whole test directory still works.
+def pytest_collection_modifyitems(config, items):
+    """Skips the tests that use the `benchmark` fixture if the pytest-benchmark plugin is not active."""
+    if config.pluginmanager.hasplugin("benchmark"):
+        return
+    skip = pytest.mark.skip(reason="the pytest-benchmark plugin is not active")
+    for item in items:
+        if "benchmark" in getattr(item, "fixturenames", ()):
+            item.add_marker(skip)
+
+def _serial_chain_state(num_nodes: int, inventory: int = 100, num_products: int = 1):
+    """
+    Builds a synthetic serial supply chain for the simulation, holding `num_products` products.
+
+    Returns:
+        A tuple of the initial SupplyChainStatus and the node-to-upstream topology.
+    """
+    names = [f"node_{i}" for i in range(num_nodes)]
+    nodes = {
+        name: SupplyChainNodeStatus(name=name, inventory={('beer' if num_products == 1 else f"sku_{j}"): inventory * (i + 1) for j in range(num_products)}, incoming_orders=[], outgoing_orders=[])
+        for i, name in enumerate(names)
+    }
+    topology = {name: (names[i + 1] if i + 1 < num_nodes else None) for i, name in enumerate(names)}
+    return SupplyChainStatus(current_step=0, nodes=nodes, shipments_in_transit=[]), topology
+
+def _loaded_twin(num_orders: int) -> DigitalTwin:
+    """
+    Builds a detached Digital Twin with `num_orders` pending orders spread over the chain,
+    with enough inventory that every order is fulfilled and shipped on the next step.
+    """
+    twin = DigitalTwin.detached()
+    for node in twin.nodes.values():
+        node.inventory['beer'] = num_orders * 10
+    ordering_nodes = ['retailer', 'wholesaler', 'distributor']
+    for i in range(num_orders):
+        destination = ordering_nodes[i % len(ordering_nodes)]
+        twin.nodes[destination].place_order(OrderRecord(ORDER_IDS.next(), 'beer', 5, '', destination))
+    return twin
+
+@pytest.fixture
+def serial_chain_state():
+    """A factory for synthetic serial supply chains of a given length."""
+    return _serial_chain_state
+
+@pytest.fixture
+def loaded_twin():
+    """A factory for detached Digital Twins with a given number of pending orders."""
+    return _loaded_twin
+
+@pytest.fixture
+def recorded_pulp_script():
+    """The PuLP script of the offline LLM stub, replayed instead of generating one with the LLM."""
+    return STUB_PULP_SCRIPT
@@ -0,0 +1,39 @@
+import pytest
+from app.digital_twin import DigitalTwin
+from app.data_models.supply_chain_models import Order
+from app.utils.logging_utils import quiet
+
+@pytest.mark.parametrize("num_orders", [100, 1000, 10000, 100000])
+def test_digital_twin_step(benchmark, loaded_twin, num_orders):
+    """Benchmarks one Digital Twin step that fulfills and ships a growing number of orders."""
+    def step(twin):
+        with quiet():
+            twin.step()
+        return twin
+
+    twin = benchmark.pedantic(step, setup=lambda: ((loaded_twin(num_orders),), {}), rounds=5, iterations=1)
+    assert len(twin.shipments_in_transit) == num_orders
+
+@pytest.mark.parametrize("num_orders", [100, 1000, 10000])
+def test_get_full_state_serialisation(benchmark, loaded_twin, num_orders):
+    """Benchmarks building and serialising the full supply chain state to JSON."""
+    twin = loaded_twin(num_orders)
+    with quiet():
+        twin.step()
+    payload = benchmark(lambda: twin.get_full_state().model_dump_json())
+    assert len(payload) > num_orders
+
+@pytest.mark.parametrize("num_orders", [100, 1000])
+def test_place_orders(benchmark, num_orders):
+    """
+    Benchmarks placing orders with generated IDs through the Digital Twin.
+    Each call returns the node's state, so the cost grows with the number of orders the node holds.
+    """
+    def place(twin):
+        with quiet():
+            for i in range(num_orders):
+                twin.place_order(Order(product_id='beer', quantity=5, source_node='', destination_node='Retailer'))
+        return twin
+
+    twin = benchmark.pedantic(place, setup=lambda: ((DigitalTwin.detached(),), {}), rounds=3, iterations=1)
+    assert len(twin.nodes['retailer'].outgoing_orders) == num_orders
@@ -0,0 +1,51 @@
+import pytest
+from app.mcp import erp_server
+from app.utils.logging_utils import quiet
+
+@pytest.fixture
+def erp_history():
+    """Replaces the ERP history with a synthetic one and restores it afterwards."""
+    original = list(erp_server.DB.history)
+    yield erp_server.DB.history
+    erp_server.DB.history[:] = original
+
+@pytest.mark.parametrize("num_periods", [13, 52, 208])
+def test_erp_history_query(benchmark, erp_history, loaded_twin, num_periods):
+    """Benchmarks recording a growing history and serialising it as the MCP response would be."""
+    twin = loaded_twin(20)
+    erp_history.clear()
+    with quiet():
+        for _ in range(num_periods):
+            twin.step()
+            erp_server.DB.record(twin.get_full_state())
+
+    result = benchmark(lambda: erp_server.history_result(erp_server.DB.snapshot()))
+    assert len(result.structuredContent["result"]) == num_periods
+    assert result.content[0].text
+
+@pytest.mark.parametrize("mode", ["delta", "columnar", "summary"])
+def test_erp_history_compact_query(benchmark, erp_history, loaded_twin, mode):
+    """Benchmarks the compact history modes on a year of weekly periods."""
+    twin = loaded_twin(20)
+    erp_history.clear()
+    with quiet():
+        for _ in range(52):
+            twin.step()
+            erp_server.DB.record(twin.get_full_state())
+
+    full = erp_server.history_result(erp_server.DB.snapshot())
+    result = benchmark(lambda: erp_server.history_result(erp_server.DB.snapshot(), mode=mode))
+    assert len(result.content[0].text) < len(full.content[0].text)
+
+@pytest.mark.parametrize("num_periods", [13, 208])
+def test_erp_aggregate_views_read(benchmark, erp_history, loaded_twin, num_periods):
+    """Benchmarks reading the aggregate views, which should not grow with the length of the history."""
+    twin = loaded_twin(20)
+    erp_history.clear()
+    with quiet():
+        for _ in range(num_periods):
+            twin.step()
+            erp_server.DB.record(twin.get_full_state())
+
+    aggregates = benchmark(erp_server.DB.aggregates)
+    assert aggregates.num_periods == num_periods
@@ -0,0 +1,11 @@
+from app.optimizations.supply_chain_optimization import SupplyChainOptimizer
+from app.data_models.optimization_models import OptimizationProblem
+
+def test_lp_solve(benchmark, monkeypatch, recorded_pulp_script):
+    """Benchmarks executing and parsing a recorded PuLP script, without calling the LLM."""
+    optimizer = SupplyChainOptimizer()
+    monkeypatch.setattr(optimizer, "_generate_pulp_script", lambda problem_description: recorded_pulp_script)
+    problem = OptimizationProblem(problem_description="Recorded replenishment problem.")
+
+    result = benchmark.pedantic(optimizer.solve, args=(problem,), rounds=5, iterations=1)
+    assert result.variable_values["order_quantity"] == 30
@@ -0,0 +1,39 @@
+import pytest
+from app.simulations.supply_chain_simulation import SupplyChainSimulation
+from app.data_models.simulation_models import SimulationRequest
+from app.utils.logging_utils import quiet
+
+POLICY = "lambda node_name, current_inventory, demand: max(0, 120 - current_inventory)"
+
+def run_simulation(initial_state, topology, steps: int):
+    request = SimulationRequest(initial_state=initial_state, ordering_policy_str=POLICY, steps=steps, topology=topology)
+    with quiet():
+        return SupplyChainSimulation(request).run()
+
+@pytest.mark.parametrize("num_nodes", [4, 16, 64])
+def test_simulation_node_scaling(benchmark, serial_chain_state, num_nodes):
+    """Benchmarks a 52-step simulation run on serial chains of increasing length."""
+    state, topology = serial_chain_state(num_nodes)
+    results = benchmark.pedantic(run_simulation, args=(state, topology, 52), rounds=3, iterations=1)
+    assert len(results.history) == 52
+
+@pytest.mark.parametrize("steps", [20, 100, 400])
+def test_simulation_horizon_scaling(benchmark, serial_chain_state, steps):
+    """Benchmarks a four-node simulation run over increasing horizons."""
+    state, topology = serial_chain_state(4)
+    results = benchmark.pedantic(run_simulation, args=(state, topology, steps), rounds=3, iterations=1)
+    assert len(results.history) == steps
+
+@pytest.mark.parametrize("num_products", [1, 100, 1000, 5000])
+def test_simulation_product_scaling(benchmark, serial_chain_state, num_products):
+    """Benchmarks a 52-step, four-node simulation run with a product-level policy over a growing number of SKUs."""
+    state, topology = serial_chain_state(4, num_products=num_products)
+    request = SimulationRequest(initial_state=state, steps=52, topology=topology,
+                                ordering_policy_str="lambda inventory, pipeline, backlog: 120 - inventory - pipeline + backlog")
+
+    def run():
+        with quiet():
+            return SupplyChainSimulation(request).run()
+
+    results = benchmark.pedantic(run, rounds=3, iterations=1)
+    assert len(results.product_costs) == num_products
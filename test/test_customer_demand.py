@@ -0,0 +1,86 @@
+import numpy as np
+from app.data_models.erp_models import HistoricalData
+from app.data_models.customer_models import CustomerDemandModel, CustomerSegment, PricingPlan
+from app.data_models.simulation_models import DemandDistribution, SimulationRequest
+from app.data_models.supply_chain_models import Order, SupplyChainStatus, SupplyChainNodeStatus
+from app.digital_twin import DigitalTwin
+from app.simulations.customer_demand import DEFAULT_SEGMENTS, fit_demand_model, generate_demand, observed_demand, segment_means
+from app.simulations.supply_chain_simulation import SupplyChainSimulation
+from app.tools.customer_tools import CustomerDemandTool
+
+
+def test_customer_demand_fit_and_scenarios():
+    """Tests that the segment model is fitted to observed demand and that its scenarios respond to the pricing plan."""
+    print("--- Testing Customer Demand Model ---")
+
+    # Step 1: Demand observed under varying prices and promotions recovers the base demand, elasticity and lift.
+    rng = np.random.default_rng(1)
+    prices = rng.choice([16.0, 18.0, 20.0, 22.0, 24.0], 400)
+    promotions = rng.random(400) < 0.2
+    truth = CustomerDemandModel(segments=[CustomerSegment(name='all', base_demand=30, price_elasticity=-1.5, promotion_lift=0.5)])
+    demand = rng.poisson(segment_means(truth, prices, promotions).sum(axis=1))
+    fit = fit_demand_model(demand.tolist(), prices.tolist(), promotions.tolist(), prior=CustomerDemandModel(segments=DEFAULT_SEGMENTS))
+    print(f"Fitted: base={fit.base_demand:.1f} elasticity={fit.price_elasticity:.2f} lift={fit.promotion_lift:.2f}")
+    assert fit.estimated == ['base_demand', 'price_elasticity', 'promotion_lift']
+    assert abs(fit.base_demand - 30) < 1.5 and abs(fit.price_elasticity + 1.5) < 0.2 and abs(fit.promotion_lift - 0.5) < 0.1
+    assert abs(sum(s.base_demand for s in fit.model.segments) - fit.base_demand) < 1e-9
+    print("✅ Segments fitted to the observed demand.")
+
+    # Step 2: Scenarios are generated in bulk; a price cut and a promotion raise the demand, most of all in the price-sensitive segment.
+    model = CustomerDemandModel(segments=DEFAULT_SEGMENTS)
+    plan = PricingPlan(price_changes={4: 16.0}, promotion_steps=[8])
+    draws = generate_demand(model, plan, steps=10, scenarios=20000, rng=np.random.default_rng(0))
+    assert draws.shape == (20000, 10, 3)
+    mean = draws.mean(axis=0)
+    assert mean[5].sum() > mean[0].sum() and mean[8].sum() > mean[7].sum()
+    assert mean[5, 1] / mean[0, 1] > mean[5, 0] / mean[0, 0]
+    assert abs(mean[0].sum() - 20) < 0.2
+    print("✅ Demand responds to prices and promotions.")
+
+
+def test_segmented_demand_in_simulation():
+    """Tests that segmented demand drives the simulation and that customers who do not wait are lost sales."""
+    print("--- Testing Segmented Demand in the Simulation ---")
+
+    nodes = {name: SupplyChainNodeStatus(name=name, inventory={'beer': 30}, incoming_orders=[], outgoing_orders=[])
+             for name in ['retailer', 'wholesaler', 'distributor', 'brewery']}
+    results = {}
+    for fraction in (1.0, 0.0):
+        customers = CustomerDemandModel(segments=[s.model_copy(update={'backorder_fraction': fraction}) for s in DEFAULT_SEGMENTS])
+        request = SimulationRequest(
+            initial_state=SupplyChainStatus(current_step=0, nodes=nodes, shipments_in_transit=[]),
+            ordering_policy_str="lambda node_name, current_inventory, demand: demand", steps=30, seed=3,
+            demand=DemandDistribution(kind='segmented', customers=customers),
+        )
+        results[fraction] = SupplyChainSimulation(request).run()
+        print(f"Backorder fraction {fraction}: cost={results[fraction].total_cost:.1f} lost sales={results[fraction].lost_sales:.1f}")
+    assert results[1.0].lost_sales == 0 and results[0.0].lost_sales > 0
+    print("✅ Lost sales depend on the segments' willingness to wait.")
+
+    # The tool fits the model to the ERP history and returns a model the simulation accepts.
+    from app.mcp.erp_server import DB
+    result = CustomerDemandTool()._run({'history': [h.model_dump() for h in DB.history], 'scenarios': 500, 'seed': 0,
+                                        'plan': {'promotion_steps': [2]}})
+    assert result.fit is not None and result.fit.observations == len(DB.history)
+    assert result.mean_demand[2] > result.mean_demand[1]
+    DemandDistribution(kind='segmented', customers=result.model)
+    assert "Error" in CustomerDemandTool()._run({'steps': 0})
+    assert "Error" in CustomerDemandTool()._run({'model': {'segments': []}, 'observed_demand': [10, 12, 9]})
+    print("✅ Customer demand fitted from ERP history through the tool.")
+
+
+def test_observed_demand_from_twin_history():
+    """Tests that the demand observed in ERP history recorded from the Digital Twin is per period, not cumulative."""
+    print("--- Testing Observed Demand from Twin History ---")
+
+    # Each record holds all of the retailer's orders so far, as written by record_period_data.
+    dt = DigitalTwin.detached()
+    history = []
+    for quantity in (15, 25, 20):
+        dt.place_order(Order(product_id='beer', quantity=quantity, source_node='wholesaler', destination_node='retailer'))
+        dt.step()
+        state = dt.get_full_state().model_copy(deep=True)
+        history.append(HistoricalData(period=state.current_step, nodes=state.nodes, shipments_in_transit=state.shipments_in_transit))
+    assert len(history[-1].nodes['retailer'].outgoing_orders) == 3
+    assert observed_demand(history) == [15.0, 25.0, 20.0]
+    print("✅ Each order counted in the period it was placed.")
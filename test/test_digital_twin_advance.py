@@ -0,0 +1,57 @@
+import pytest
+from app.digital_twin import DigitalTwin, TwinCheckpointer
+from app.data_models.supply_chain_models import Order, TwinAdvanceRequest
+
+
+def _quantities(twin: DigitalTwin) -> dict:
+    state = twin.get_full_state()
+    return {
+        'step': state.current_step,
+        'nodes': {name: (node.inventory, [(o.quantity, o.status) for o in node.outgoing_orders]) for name, node in state.nodes.items()},
+        'in_transit': [(s.quantity, s.eta) for s in state.shipments_in_transit],
+    }
+
+
+def test_digital_twin_advance(tmp_path):
+    """Tests advancing the Digital Twin by several steps with a standing ordering policy and a stopping condition."""
+    print("--- Testing Multi-Step Advance of the Digital Twin ---")
+
+    # Use detached twins so the shared singleton used by other tests is not modified.
+    stepped, advanced = DigitalTwin.detached(), DigitalTwin.detached()
+
+    # Step 1: Advancing without a policy matches stepping one step at a time.
+    for twin in (stepped, advanced):
+        twin.place_order(Order(product_id='beer', quantity=20, source_node='wholesaler', destination_node='retailer'))
+    for _ in range(5):
+        stepped.step()
+    result = advanced.advance(5)
+    assert (result.start_step, result.end_step, result.condition_met) == (0, 5, False)
+    # Order and shipment IDs are random, so the twins are compared by their quantities and statuses.
+    assert _quantities(advanced) == _quantities(stepped)
+    assert [s.step for s in result.trajectory] == [1, 2, 3, 4, 5]
+    assert result.trajectory[0].pipeline['retailer'] == 20  # In transit after the wholesaler fulfilled it
+    assert result.trajectory[-1].inventory['retailer'] == 120
+    print("✅ Advance matches single steps.")
+
+    # Step 2: A standing base-stock policy orders every step, and is journaled like any other order.
+    twin = DigitalTwin.detached()
+    twin.attach_checkpointer(TwinCheckpointer(directory=str(tmp_path), snapshot_every=100))
+    request = TwinAdvanceRequest(
+        n_steps=13,
+        ordering_policy_str="lambda node_name, inventory, pipeline, backlog: max(0, 150 - (inventory + pipeline - backlog))",
+        until="lambda step, inventory: inventory['retailer']['beer'] >= 150",
+    )
+    result = twin.advance(request.n_steps, until=request.get_condition(), policy=request.get_ordering_policy())
+    assert result.condition_met and result.end_step < 13
+    assert result.orders_placed == sum(s.orders_placed for s in result.trajectory) > 0
+    assert result.trajectory[-1].inventory['retailer'] >= 150
+    restored = DigitalTwin.detached()
+    TwinCheckpointer(directory=str(tmp_path)).restore(restored)
+    assert restored.get_full_state() == twin.get_full_state()
+    print(f"✅ Policy placed {result.orders_placed} orders; condition met at step {result.end_step}.")
+
+    # Step 3: Policies and conditions with unknown arguments are rejected before the twin changes.
+    with pytest.raises(ValueError):
+        twin.advance(3, until=lambda weather: True)
+    assert twin.current_step == result.end_step
+    print("✅ Invalid condition rejected.")
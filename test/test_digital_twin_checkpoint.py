@@ -0,0 +1,36 @@
+from app.digital_twin import DigitalTwin, TwinCheckpointer
+from app.data_models.supply_chain_models import Order
+
+
+def test_digital_twin_checkpoint(tmp_path):
+    """Tests snapshotting, journaling and restoring the Digital Twin state."""
+    print("--- Testing Digital Twin Checkpoint and Restore ---")
+
+    # Use a detached twin so the shared singleton used by other tests is not modified.
+    dt = DigitalTwin.detached()
+    checkpointer = TwinCheckpointer(directory=str(tmp_path), snapshot_every=2)
+    dt.attach_checkpointer(checkpointer)
+
+    # Step 1: Mutate the twin across an automatic snapshot and some journaled changes.
+    dt.place_order(Order(product_id='beer', quantity=20, source_node='wholesaler', destination_node='retailer'))
+    dt.step()
+    dt.step()  # Automatic snapshot at step 2
+    dt.place_order(Order(product_id='beer', quantity=30, source_node='distributor', destination_node='wholesaler'))
+    dt.step()
+    expected = dt.get_full_state()
+    assert len(list(tmp_path.glob("snapshot-*.bin"))) == 2
+    print("✅ Snapshots and journal written.")
+
+    # Step 2: Restore into a fresh twin from the latest snapshot plus the journal.
+    restored = DigitalTwin.detached()
+    replayed = TwinCheckpointer(directory=str(tmp_path)).restore(restored)
+    assert replayed == 2
+    assert restored.get_full_state() == expected
+    print("✅ State restored from snapshot and journal.")
+
+    # Step 3: The shared order records stay shared after restore, and so do their models in a full state.
+    restored.step()
+    assert restored.nodes['retailer'].outgoing_orders[0] is restored.nodes['wholesaler'].incoming_orders[0]
+    state = restored.get_full_state()
+    assert state.nodes['retailer'].outgoing_orders[0] is state.nodes['wholesaler'].incoming_orders[0]
+    print("✅ Order identity preserved.")
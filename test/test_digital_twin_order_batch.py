@@ -0,0 +1,65 @@
+from app.digital_twin import DigitalTwin, EventLog, TwinCheckpointer, TwinReplayer
+from app.data_models.supply_chain_models import Order, OrderBatch, OrderOperation
+
+
+def _place(order_id: str, quantity: int, destination: str = 'retailer', source: str = 'wholesaler') -> OrderOperation:
+    order = Order(order_id=order_id, product_id='beer', quantity=quantity, source_node=source, destination_node=destination)
+    return OrderOperation(action='place', order=order)
+
+
+def test_digital_twin_order_batch(tmp_path):
+    """Tests placing, cancelling and amending orders in batches."""
+    print("--- Testing Digital Twin Order Batches ---")
+
+    # Use a detached twin so the shared singleton used by other tests is not modified.
+    dt = DigitalTwin.detached()
+    dt.attach_checkpointer(TwinCheckpointer(directory=str(tmp_path), snapshot_every=100))
+    log_path = str(tmp_path / "events.bin")
+    dt.attach_event_log(log_path)
+
+    # Step 1: An atomic batch with an invalid operation changes nothing.
+    result = dt.apply_order_batch(OrderBatch(operations=[
+        _place('r1', 20),
+        _place('b1', 10, destination='brewery', source='brewery'),
+        OrderOperation(action='cancel', order_id='missing'),
+    ]))
+    assert result.applied == 0
+    assert [(r.index, r.action) for r in result.rejected] == [(1, 'place'), (2, 'cancel')]
+    assert result.pending_quantities == {}
+    assert dt.get_node_state('retailer').outgoing_orders == []
+    print("✅ Atomic batch rejected as a whole.")
+
+    # Step 2: Later operations see the effect of earlier ones; a non-atomic batch applies the valid operations.
+    result = dt.apply_order_batch(OrderBatch(atomic=False, operations=[
+        _place('r1', 20),
+        _place('r2', 30),
+        _place('w1', 40, destination='wholesaler', source='distributor'),
+        OrderOperation(action='amend', order_id='r1', quantity=250),
+        OrderOperation(action='cancel', order_id='r2'),
+        OrderOperation(action='amend', order_id='r2', quantity=5),
+        OrderOperation(action='amend', order_id='w1', quantity=0),
+    ]))
+    assert result.applied == 5
+    assert [r.index for r in result.rejected] == [5, 6]
+    assert result.placed_order_ids == ['r1', 'r2', 'w1']
+    assert result.pending_quantities == {'retailer': {'beer': 250}, 'wholesaler': {'beer': 40}}
+    print("✅ Non-atomic batch applied the valid operations.")
+
+    # Step 3: Cancelled orders are not fulfilled, and amended quantities are used for fulfillment.
+    dt.step()
+    retailer_orders = {o.order_id: o.status for o in dt.get_node_state('retailer').outgoing_orders}
+    assert retailer_orders == {'r1': 'PENDING', 'r2': 'CANCELLED'}  # 250 exceeds the wholesaler's 200 units
+    assert dt.get_node_state('wholesaler').outgoing_orders[0].status == 'FULFILLED'
+    assert dt.amend_order('r1', 150)
+    assert not dt.cancel_order('r2')
+    dt.step()
+    assert dt.get_node_state('retailer').outgoing_orders[0].status == 'FULFILLED'
+    expected = dt.get_full_state()
+    print("✅ Cancellations and amendments respected by fulfillment.")
+
+    # Step 4: The journal and the event log both rebuild the same state.
+    restored = DigitalTwin.detached()
+    TwinCheckpointer(directory=str(tmp_path)).restore(restored)
+    assert restored.get_full_state() == expected
+    assert TwinReplayer(EventLog.load(log_path)).state_at(dt.current_step).get_full_state() == expected
+    print("✅ Batches restored from the journal and replayed from the event log.")
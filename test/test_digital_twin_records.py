@@ -0,0 +1,47 @@
+import tracemalloc
+from app.digital_twin import DigitalTwin, OrderRecord, ShipmentRecord
+from app.data_models.supply_chain_models import Order, Shipment
+from app.utils.identifiers import ORDER_IDS
+
+
+def _allocated(factory, count: int) -> int:
+    """Returns the bytes allocated to keep `count` objects built by the factory alive."""
+    tracemalloc.start()
+    objects = [factory() for _ in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(objects) == count
+    return size
+
+
+def test_digital_twin_records():
+    """Tests the slotted internal order and shipment records of the Digital Twin."""
+    print("--- Testing Digital Twin Internal Records ---")
+
+    # Step 1: Records convert to and from the boundary models without losing anything.
+    order = Order(product_id='beer', quantity=7, source_node='Wholesaler', destination_node='Retailer')
+    record = OrderRecord.from_model(order)
+    assert isinstance(record.order_id, int)
+    assert record.to_model() == order.model_copy(update={'source_node': 'wholesaler', 'destination_node': 'retailer'})
+    external = Order(order_id='PO-1', product_id='beer', quantity=1, source_node='wholesaler', destination_node='retailer')
+    assert OrderRecord.from_model(external).order_id == 'PO-1'
+    shipment = Shipment(order_id=order.order_id, product_id='beer', quantity=7, source_node='wholesaler', destination_node='retailer', eta=2)
+    assert ShipmentRecord.from_model(shipment).to_model() == shipment
+    print("✅ Conversions round-trip.")
+
+    # Step 2: An open order record takes several times less memory than an Order model.
+    models = _allocated(lambda: Order(product_id='beer', quantity=5, source_node='wholesaler', destination_node='retailer'), 10000)
+    records = _allocated(lambda: OrderRecord(ORDER_IDS.next(), 'beer', 5, 'wholesaler', 'retailer'), 10000)
+    print(f"Order model: {models / 10000:.0f} bytes, order record: {records / 10000:.0f} bytes.")
+    assert models > 3 * records
+    print("✅ Records are compact.")
+
+    # Step 3: The twin keeps records internally and only hands out models.
+    dt = DigitalTwin.detached()
+    status = dt.place_order(Order(product_id='beer', quantity=20, source_node='wholesaler', destination_node='retailer'))
+    assert isinstance(dt.nodes['retailer'].outgoing_orders[0], OrderRecord)
+    assert isinstance(status.outgoing_orders[0], Order)
+    dt.step()
+    assert isinstance(dt.shipments_in_transit[0], ShipmentRecord)
+    assert dt.get_full_state().shipments_in_transit[0].order_id == status.outgoing_orders[0].order_id
+    print("✅ Models only at the boundary.")
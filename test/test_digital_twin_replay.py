@@ -0,0 +1,83 @@
+from app.digital_twin import DigitalTwin, EventLog, TwinReplayer
+from app.data_models.supply_chain_models import Order
+from app.data_models.production_models import ProductionCapacity
+from app.data_models.logistics_models import Lane
+from app.data_models.simulation_models import LeadTimeDistribution
+
+
+def test_digital_twin_replay(tmp_path):
+    """Tests the event log and the replay engine of the Digital Twin."""
+    print("--- Testing Digital Twin Event Replay ---")
+
+    # Use a detached twin so the shared singleton used by other tests is not modified.
+    dt = DigitalTwin.detached()
+    log_path = str(tmp_path / "events.bin")
+    dt.attach_event_log(log_path)
+
+    # Step 1: Run a short scenario and keep the live state at every step.
+    # The state at a step includes the orders placed after advancing to it. Snapshots are deep copies
+    # because the live status objects share their Order instances with the twin.
+    live_states = {}
+    dt.place_order(Order(product_id='beer', quantity=20, source_node='wholesaler', destination_node='retailer'))
+    for step in range(4):
+        dt.place_order(Order(product_id='beer', quantity=10 * (step + 1), source_node='distributor', destination_node='wholesaler'))
+        live_states[step] = dt.get_full_state().model_copy(deep=True)
+        dt.step()
+    live_states[4] = dt.get_full_state().model_copy(deep=True)
+    print(f"Recorded {len(dt.event_log)} events.")
+
+    # Step 2: Replaying the persisted log rebuilds the exact state at any step.
+    replayer = TwinReplayer(EventLog.load(log_path))
+    for step, expected in live_states.items():
+        assert replayer.state_at(step).get_full_state() == expected, f"Replay mismatch at step {step}"
+    print("✅ Replay verified at every step.")
+
+    # Replay keeps checkpoints of complete steps on the way, and later states start from the nearest one.
+    replayer = TwinReplayer(EventLog.load(log_path), snapshot_every=2)
+    for step in (4, 1, 3, 0, 2):
+        assert replayer.state_at(step).get_full_state() == live_states[step], f"Replay mismatch at step {step}"
+    assert list(replayer.snapshots) == [2]
+    print("✅ Replay from checkpoints verified.")
+
+    # Step 3: A branch continues independently from an earlier step.
+    branch = replayer.branch(2)
+    branch.place_order(Order(product_id='beer', quantity=99, source_node='wholesaler', destination_node='retailer'))
+    branch.step()
+    assert branch.current_step == 3
+    assert branch.get_full_state() != live_states[3]
+    assert TwinReplayer(branch.event_log).state_at(3).get_full_state() == branch.get_full_state()
+    assert dt.get_full_state() == live_states[4]
+    print("✅ Branching verified.")
+
+
+def test_digital_twin_replay_configuration(tmp_path):
+    """Tests that production capacities and lanes configured after logging started are replayed and carried into branches."""
+    print("--- Testing Replay of Twin Configuration ---")
+
+    dt = DigitalTwin.detached()
+    log_path = str(tmp_path / "events.bin")
+    dt.attach_event_log(log_path)
+    dt.step()
+    capacity = ProductionCapacity(capacity=60, setup_time=5, batch_size=20, setup_cost=3)
+    dt.configure_production('brewery', capacity)
+    lane = Lane(origin='wholesaler', destination='retailer', transit_time=LeadTimeDistribution(kind='uniform', low=1, high=3),
+                vehicle_capacity=25, cost_per_vehicle=100)
+    dt.configure_lane(lane)
+    dt.place_order(Order(order_id='p1', product_id='beer', quantity=30, source_node='brewery', destination_node='brewery'))
+    dt.place_order(Order(order_id='r1', product_id='beer', quantity=60, source_node='wholesaler', destination_node='retailer'))
+    dt.step()
+
+    replayer = TwinReplayer(EventLog.load(log_path))
+    assert replayer.state_at(0).nodes['brewery'].production is None and not replayer.state_at(0).logistics.lanes
+    assert replayer.state_at(1).nodes['brewery'].production == capacity
+    assert replayer.state_at(1).logistics.lanes[('wholesaler', 'retailer')] == lane
+    assert replayer.state_at(2).logistics.vehicles_dispatched == dt.logistics.vehicles_dispatched == 3
+    assert replayer.state_at(2).get_full_state() == dt.get_full_state()
+
+    # The branch keeps producing under the configured capacity.
+    branch = replayer.branch(1)
+    assert branch.nodes['brewery'].production == capacity
+    assert branch.logistics.lanes[('wholesaler', 'retailer')] == lane
+    branch.place_order(Order(order_id='p2', product_id='beer', quantity=40, source_node='brewery', destination_node='brewery'))
+    assert [o.order_id for o in branch.get_node_state('brewery').outgoing_orders] == ['p1', 'p2']
+    print("✅ Production capacity and lanes replayed and branched.")
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from app.data_models.supply_chain_models import Order
+from app.digital_twin import DigitalTwin
+from app.erp.aggregate_views import AggregateViews, RollingStatistic
+from app.mcp import erp_server
+from app.utils.logging_utils import quiet
+
+
+@pytest.fixture
+def erp_history():
+    """Restores the ERP history after the test."""
+    original = list(erp_server.DB.history)
+    yield erp_server.DB.history
+    erp_server.DB.history[:] = original
+
+
+def test_rolling_statistic():
+    """Tests the O(1) rolling statistics against numpy."""
+    values = np.random.default_rng(0).poisson(20, size=30).astype(float)
+    statistic = RollingStatistic(window=4)
+    for value in values:
+        statistic.add(value)
+    summary = statistic.summary()
+    assert summary.mean == pytest.approx(values.mean()) and summary.variance == pytest.approx(values.var())
+    assert summary.rolling_mean == pytest.approx(values[-4:].mean())
+    assert summary.rolling_variance == pytest.approx(values[-4:].var())
+    assert summary.rolling_trend == pytest.approx((values[-1] - values[-4]) / 3)
+    print("✅ Rolling statistics verified.")
+
+
+def test_aggregate_views(erp_history):
+    """Tests that the aggregate views are maintained incrementally as periods are recorded."""
+    print("--- Testing ERP Aggregate Views ---")
+
+    # Step 1: The seeded history yields the orders placed per period and a bullwhip ratio per node.
+    aggregates = erp_server.DB.aggregates()
+    retailer, wholesaler = aggregates.nodes['retailer']['beer'], aggregates.nodes['wholesaler']['beer']
+    assert aggregates.num_periods == 2 and aggregates.last_period == 2
+    assert retailer.orders_placed.mean == 20 and retailer.orders_placed.variance == 25
+    assert retailer.bullwhip_ratio is None
+    assert wholesaler.orders_received.mean == 20 and wholesaler.bullwhip_ratio == pytest.approx(6.25 / 25)
+    print("✅ Seeded history aggregates verified.")
+
+    # Step 2: Recording periods from the twin updates the views, including fill rates of fulfilled orders.
+    twin = DigitalTwin.detached()
+    rng = np.random.default_rng(1)
+    with quiet():
+        for _ in range(12):
+            twin.place_order(Order(product_id='beer', quantity=int(rng.integers(5, 30)), source_node='wholesaler', destination_node='retailer'))
+            twin.step()
+            erp_server.DB.record(twin.get_full_state())
+    aggregates = erp_server.DB.aggregates(nodes=['wholesaler'])
+    wholesaler = aggregates.nodes['wholesaler']['beer']
+    assert set(aggregates.nodes) == {'wholesaler'} and aggregates.num_periods == 14
+    orders = {o.order_id: o for record in erp_server.DB.snapshot() for o in record.nodes['wholesaler'].incoming_orders}
+    fulfilled = sum(o.quantity for o in orders.values() if o.status == 'FULFILLED')
+    assert 0 < wholesaler.fill_rate < 1
+    assert wholesaler.fill_rate == pytest.approx(fulfilled / sum(o.quantity for o in orders.values()))
+    inventory = [record.nodes['wholesaler'].inventory['beer'] for record in erp_server.DB.snapshot()]
+    assert wholesaler.inventory.rolling_mean == pytest.approx(np.mean(inventory[-4:]))
+    assert wholesaler.inventory.last == inventory[-1]
+    print("✅ Incremental updates verified.")
+
+    # Step 3: The incremental views match views rebuilt from scratch, also after the history is replaced directly.
+    rebuilt = AggregateViews()
+    for record in erp_server.DB.snapshot():
+        rebuilt.update(record)
+    assert rebuilt.summary() == erp_server.DB.aggregates()
+    erp_history[:] = erp_history[:2]
+    assert erp_server.DB.aggregates().num_periods == 2
+    print("✅ Rebuilt views verified.")
+
+
+async def test_aggregate_tools(erp_history):
+    """Tests the MCP tools that serve the aggregate views."""
+    assert (await erp_server.get_bullwhip_ratios())["wholesaler"]["beer"] == pytest.approx(0.25)
+    assert (await erp_server.get_fill_rates())['retailer']['beer'] is None
+    views = await erp_server.get_aggregate_views(nodes=['retailer'], products=['beer'])
+    assert list(views.nodes) == ['retailer']
+    print("✅ Aggregate view tools verified.")
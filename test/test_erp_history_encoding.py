@@ -0,0 +1,56 @@
+import pytest
+from app.data_models.erp_models import HistoricalData, PeriodDelta, HistoryColumns, HistorySummary
+from app.data_models.supply_chain_models import Order
+from app.digital_twin import DigitalTwin
+from app.erp import history_encoding
+from app.mcp import erp_server
+from app.utils.logging_utils import quiet
+
+
+def twin_history(num_periods: int):
+    """Records the periods of a detached twin with a steady stream of orders."""
+    twin, history = DigitalTwin.detached(), []
+    with quiet():
+        for _ in range(num_periods):
+            twin.place_order(Order(product_id='beer', quantity=5, source_node='wholesaler', destination_node='retailer'))
+            twin.step()
+            state = twin.get_full_state()
+            history.append(HistoricalData(period=state.current_step, nodes=state.nodes,
+                                          shipments_in_transit=state.shipments_in_transit).model_copy(deep=True))
+    return tuple(history)
+
+
+def test_history_encoding():
+    """Tests the compact encodings of ERP history."""
+    print("--- Testing ERP History Encoding ---")
+    history = tuple(erp_server.DB.history) + twin_history(20)
+
+    # Step 1: Delta encoding is lossless, also after a JSON round trip, and much smaller than full records.
+    full = erp_server.history_result(history)
+    delta = erp_server.history_result(history, mode="delta")
+    decoded = history_encoding.decode_deltas([PeriodDelta.model_validate(d) for d in delta.structuredContent["result"]])
+    assert decoded == list(history)
+    assert len(delta.content[0].text) * 5 < len(full.content[0].text)
+    print(f"✅ Delta encoding verified: {len(full.content[0].text)} -> {len(delta.content[0].text)} characters.")
+
+    # Step 2: Projections keep only the selected fields and nodes.
+    projected = erp_server.history_result(history, fields=["inventory"], nodes=["retailer"]).structuredContent["result"]
+    assert projected[0] == {"period": 1, "nodes": {"retailer": {"name": "retailer", "inventory": {"beer": 85}}}}
+    assert all("added_incoming_orders" not in node for d in history_encoding.encode_deltas(history, ["inventory"])
+               for node in d.nodes.values() if node.added_incoming_orders)
+    with pytest.raises(ValueError):
+        history_encoding.select_fields(["prices"])
+    print("✅ Field and node projection verified.")
+
+    # Step 3: Columns hold one value per period, and the summary matches them.
+    columns = HistoryColumns.model_validate(erp_server.history_result(history, mode="columnar").structuredContent["result"])
+    assert columns.periods == [record.period for record in history]
+    assert columns.nodes["retailer"].inventory["beer"][:2] == [85, 100]
+    assert columns.nodes["retailer"].outgoing_quantity["beer"][:2] == [15, 25]
+    assert columns.in_transit_quantity["beer"][:2] == [15, 45]
+    summary = HistorySummary.model_validate(erp_server.history_result(history, mode="summary").structuredContent["result"])
+    retailer = columns.nodes["retailer"].inventory["beer"]
+    assert summary.num_periods == len(history)
+    assert summary.nodes["retailer"].inventory["beer"].mean == pytest.approx(sum(retailer) / len(retailer))
+    assert summary.nodes["retailer"].inventory["beer"].last == retailer[-1]
+    print("✅ Columnar and summary modes verified.")
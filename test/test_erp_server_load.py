@@ -0,0 +1,95 @@
+import asyncio
+import time
+import numpy as np
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+from app.data_models.erp_models import HistoricalData
+from app.digital_twin import DigitalTwin
+from app.mcp import erp_server
+from app.utils.concurrency import RequestLimiter, ServerBusyError
+from app.utils.logging_utils import quiet
+from app.utils.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def erp_history():
+    """Restores the ERP history after the test."""
+    original = list(erp_server.DB.history)
+    yield erp_server.DB.history
+    erp_server.DB.history[:] = original
+
+
+async def test_request_limiter_backpressure():
+    """Tests that requests beyond the concurrency and queue bounds are rejected instead of queued."""
+    print("--- Testing Request Backpressure ---")
+    registry = MetricsRegistry()
+    limiter = RequestLimiter("test", max_concurrency=1, max_queued=1, queue_timeout=None, registry=registry)
+    release = asyncio.Event()
+
+    @limiter.limit
+    async def slow_request(value: int) -> int:
+        await release.wait()
+        return value
+
+    # Step 1: The first request runs, the second waits in the queue, and the third is rejected at once.
+    running = asyncio.create_task(slow_request(1))
+    queued = asyncio.create_task(slow_request(2))
+    await asyncio.sleep(0)
+    assert (limiter.active, limiter.waiting) == (1, 1)
+    with pytest.raises(ServerBusyError):
+        await slow_request(3)
+    assert registry.counters["server_requests_rejected_total"][(("reason", "queue full"), ("server", "test"))] == 1
+    print("✅ Full queue rejected a request.")
+
+    # Step 2: Once the running request completes, the queued one is admitted.
+    release.set()
+    assert await asyncio.gather(running, queued) == [1, 2]
+    assert (limiter.active, limiter.waiting) == (0, 0)
+
+    # Step 3: A request that waits longer than the queue timeout is rejected.
+    release.clear()
+    limiter.queue_timeout = 0.05
+    running = asyncio.create_task(slow_request(1))
+    await asyncio.sleep(0)
+    with pytest.raises(ServerBusyError):
+        await slow_request(2)
+    release.set()
+    await running
+    print("✅ Queue timeout verified.")
+
+
+async def test_erp_server_load(erp_history):
+    """Drives the ERP server with concurrent local clients that record and read history at the same time."""
+    print("--- Testing ERP Server Under Load ---")
+    num_clients, periods_per_client = 8, 10
+    initial_periods = len(erp_history)
+    twin = DigitalTwin.detached()
+    with quiet():
+        twin.step()
+    state = twin.get_full_state().model_dump(mode="json")
+    latencies = []
+
+    async def client(client_id: int):
+        async with create_connected_server_and_client_session(erp_server.mcp) as session:
+            for i in range(periods_per_client):
+                start = time.perf_counter()
+                period = {**state, "current_step": 1000 * (client_id + 1) + i}
+                written = await session.call_tool("record_period_data", arguments={"period_data": period})
+                history = await session.call_tool("get_historical_data", arguments={})
+                latencies.append(time.perf_counter() - start)
+                assert not written.isError and written.structuredContent["status"] == "success"
+                records = [HistoricalData.model_validate(r) for r in history.structuredContent["result"]]
+                # Every snapshot contains the client's own writes, in the order they were made.
+                own = [r.period for r in records if 1000 * (client_id + 1) <= r.period < 1000 * (client_id + 2)]
+                assert own == [1000 * (client_id + 1) + k for k in range(i + 1)]
+
+    # Step 1: All clients run concurrently against the same database without losing or duplicating a write.
+    await asyncio.gather(*(client(c) for c in range(num_clients)))
+    periods = [record.period for record in erp_server.DB.snapshot()[initial_periods:]]
+    assert sorted(periods) == sorted(1000 * (c + 1) + i for c in range(num_clients) for i in range(periods_per_client))
+    print(f"✅ {len(periods)} concurrent writes recorded exactly once.")
+
+    # Step 2: Report the round-trip latency of a write followed by a read.
+    p50, p95 = np.percentile(latencies, [50, 95])
+    print(f"✅ Latency of a write and read: p50={p50 * 1000:.1f} ms, p95={p95 * 1000:.1f} ms.")
+    assert erp_server.LIMITER.active == 0 and erp_server.LIMITER.waiting == 0
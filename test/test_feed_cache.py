@@ -0,0 +1,55 @@
+import json
+from app.mcp import news_server, weather_server
+from app.mcp.feeds import SignalFeed
+from app.utils.cache import TTLCache
+
+
+def test_ttl_cache():
+    """Tests that cache entries expire after the TTL and that the least recently used entry is evicted."""
+    print("--- Testing TTL Cache ---")
+
+    now = [0.0]
+    cache = TTLCache("test", ttl_seconds=10, max_entries=2, clock=lambda: now[0])
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)  # 'b' is the least recently used entry.
+    assert cache.get('b') is None and len(cache) == 2
+    now[0] = 10.0
+    assert cache.get('a') is None and cache.get('c') is None
+    assert cache.get_or_compute('a', lambda: 4) == 4 and cache.get('a') == 4
+    print("✅ Entries expire after the TTL and the cache stays within its size.")
+
+
+def test_signal_feeds():
+    """Tests that the feeds are cached, reproducible with a seed and batched."""
+    print("--- Testing Signal Feeds ---")
+
+    # Step 1: Two feeds with the same seed draw the same signals, in whatever order the keys are looked up.
+    draw = lambda rng, key: rng.choice(weather_server.POSSIBLE_FORECASTS)
+    locations = [f"city-{i}" for i in range(20)]
+    first = SignalFeed("weather", draw, seed=42, ttl_seconds=0).get_many(locations)
+    second = SignalFeed("weather", draw, seed=42, ttl_seconds=0).get_many(list(reversed(locations)))
+    assert first == second
+    assert len(set(first.values())) > 1
+    print("✅ Seeded feeds are reproducible.")
+
+    # Step 2: Within the TTL, a key is drawn once; after it, the next draw is taken.
+    calls = []
+    feed = SignalFeed("weather", lambda rng, key: calls.append(key) or draw(rng, key), seed=42, ttl_seconds=60)
+    feed.cache.clock = lambda: 0.0
+    assert feed.get("Munich") == feed.get(" munich ") and calls == ["munich"]
+    feed.cache.clock = lambda: 60.0
+    feed.get("Munich")
+    assert calls == ["munich", "munich"]
+    print("✅ Signals are served from the cache until they expire.")
+
+    # Step 3: The batched server tools answer every location and topic in one call, consistent with the single-item tools.
+    forecasts = json.loads(weather_server.get_weather_forecasts(["Munich", "Hamburg", "Munich"]))
+    print(f"Forecasts: {forecasts}")
+    assert [f["location"] for f in forecasts] == ["Munich", "Hamburg"]
+    assert json.loads(weather_server.get_weather_forecast("Munich"))["forecast"] == forecasts[0]["forecast"]
+    headlines = json.loads(news_server.get_latest_news_batch(["logistics", "economy", "unknown"]))
+    assert headlines[2]["headline"] == news_server.NEWS_HEADLINES["default"][0]
+    assert json.loads(news_server.get_latest_news("Logistics"))["headline"] == headlines[0]["headline"]
+    print("✅ Batched tools agree with the single-item tools.")
@@ -0,0 +1,38 @@
+import uuid
+from app.digital_twin import DigitalTwin
+from app.data_models.supply_chain_models import Order
+from app.utils.identifiers import IdSequence, NameTable, PRODUCT_NAMES
+
+
+def test_identifiers():
+    """Tests the monotonic ID sequences and the interned name tables."""
+    print("--- Testing Compact Identifiers ---")
+
+    # Step 1: IDs are monotonic integers, rendered as valid UUID strings that parse back to the integer.
+    ids = IdSequence()
+    values = [ids.next() for _ in range(3)]
+    assert values == sorted(values) and len(set(values)) == 3
+    rendered = ids.render(2 ** 40 + 7)
+    assert str(uuid.UUID(rendered)) == rendered
+    assert ids.parse(rendered) == 2 ** 40 + 7
+    assert IdSequence().parse(rendered) is None  # Another namespace
+    assert ids.parse(str(uuid.uuid4())) is None
+    assert len({Order(product_id='beer', quantity=1, source_node='a', destination_node='b').order_id for _ in range(1000)}) == 1000
+    print("✅ ID sequences verified.")
+
+    # Step 2: Each spelling of a name is normalised once and always returns the same interned object.
+    names = NameTable()
+    retailer = names.canonical('Retailer')
+    assert retailer == 'retailer' and names.canonical('RETAILER') is retailer
+    assert names.code('retailer') == 0 and names.name(names.code('Wholesaler')) == 'wholesaler'
+    assert len(names) == 2
+    print("✅ Name tables verified.")
+
+    # Step 3: Orders stored by the twin share the interned names of its nodes.
+    dt = DigitalTwin.detached()
+    dt.place_order(Order(product_id=''.join(['be', 'er']), quantity=5, source_node='', destination_node='Retailer'))
+    order = dt.get_node_state('retailer').outgoing_orders[0]
+    assert order.destination_node is dt.nodes['retailer'].name
+    assert order.source_node is dt.nodes['wholesaler'].name
+    assert order.product_id is PRODUCT_NAMES.canonical('beer')
+    print("✅ Twin orders use interned names.")
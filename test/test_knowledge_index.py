@@ -0,0 +1,70 @@
+import os
+from app.utils.knowledge_utils import KnowledgeIndex
+
+
+def test_knowledge_index(tmp_path):
+    """Tests chunking, retrieval and mtime-based invalidation of the knowledge index."""
+    print("--- Testing Knowledge Index ---")
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "guide.md").write_text(
+        "# Guide\n\n## Shipping\n\nShipments travel by rail between the distributor and the wholesaler.\n\n"
+        "## Suppliers\n\nOnly approved suppliers from the ethical list may be used for sourcing hops.\n",
+        encoding="utf-8"
+    )
+    index_path = str(tmp_path / "index")
+
+    # Step 1: Build the index and retrieve the most relevant chunk.
+    index = KnowledgeIndex(directories=[str(docs)], index_path=index_path)
+    assert len(index.chunks) == 2
+    matches = index.query("Which suppliers are approved for sourcing?", top_k=1)
+    assert matches[0].chunk.heading == "Guide > Suppliers"
+    print("✅ Retrieval verified.")
+
+    # Step 2: A second index loads the persisted vectors without re-embedding.
+    reloaded = KnowledgeIndex(directories=[str(docs)], index_path=index_path)
+    assert reloaded.refresh() is False
+    assert len(reloaded.chunks) == 2
+    print("✅ Persistence verified.")
+
+    # Step 3: Modified and new files are re-embedded on refresh.
+    (docs / "extra.md").write_text("# Extra\n\nThe brewery produces beer in batches.\n", encoding="utf-8")
+    assert reloaded.refresh() is True
+    assert len(reloaded.chunks) == 3
+    assert reloaded.query("brewery batches", top_k=1)[0].chunk.source.endswith("extra.md")
+    os.remove(docs / "extra.md")
+    assert reloaded.refresh() is True
+    assert len(reloaded.chunks) == 2
+    print("✅ Invalidation verified.")
+
+
+def test_knowledge_in_delegated_tasks(tmp_path):
+    """Tests that the manager's delegation tools add the knowledge relevant to each delegated task to the coworker's context."""
+    from crewai import Agent
+    from app.control_tower.crew_manager_agent import manager_agent, KnowledgeAwareAgent
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "guide.md").write_text(
+        "# Guide\n\n## Shipping\n\nShipments travel by rail between the distributor and the wholesaler.\n\n"
+        "## Suppliers\n\nOnly approved suppliers from the ethical list may be used for sourcing hops.\n",
+        encoding="utf-8"
+    )
+    index = KnowledgeIndex(directories=[str(docs)], index_path=str(tmp_path / "index"))
+
+    contexts = []
+    class Coworker(Agent):
+        def execute_task(self, task, context=None, tools=None):
+            contexts.append(context)
+            return "Done."
+
+    coworker = Coworker(role="Logistics Agent", goal="Move beer.", backstory="Moves beer.", llm=manager_agent.llm)
+    manager = KnowledgeAwareAgent(role="Manager", goal="Manage.", backstory="Manages.", llm=manager_agent.llm,
+                                  knowledge_index=index, knowledge_top_k=1)
+    delegate, ask = manager.get_delegation_tools([coworker])
+    delegate.run(task="How do shipments travel by rail?", context="Route the next shipment.", coworker="Logistics Agent")
+    ask.run(question="Which suppliers are approved for sourcing hops?", context="", coworker="Logistics Agent")
+    assert "Guide > Shipping" in contexts[0] and contexts[0].endswith("Route the next shipment.")
+    assert "Guide > Suppliers" in contexts[1] and "Guide > Shipping" not in contexts[1]
+    print("✅ Knowledge injected into delegated tasks.")
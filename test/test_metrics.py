@@ -0,0 +1,39 @@
+from app.digital_twin import DigitalTwin
+from app.utils.metrics import MetricsRegistry, METRICS, timed
+
+
+def test_metrics():
+    """Tests latency histograms, counters and their Prometheus and JSON exports."""
+    print("--- Testing Metrics ---")
+    registry = MetricsRegistry()
+
+    # Step 1: Record latencies through the decorator and the context manager.
+    @timed("work_seconds", registry=registry, kind="decorated")
+    def work():
+        return sum(range(1000))
+
+    for _ in range(10):
+        work()
+    with timed("work_seconds", registry=registry, kind="block"):
+        sum(range(1000))
+    registry.increment("bytes_total", 512, tool="get_historical_data")
+
+    summary = registry.summary()
+    print(summary)
+    assert summary["histograms"]['work_seconds{kind="decorated"}']["count"] == 10
+    assert summary["histograms"]['work_seconds{kind="block"}']["count"] == 1
+    assert summary["counters"]['bytes_total{tool="get_historical_data"}'] == 512
+    print("✅ JSON summary verified.")
+
+    # Step 2: The Prometheus export contains cumulative buckets and totals.
+    text = registry.export_prometheus()
+    assert "# TYPE work_seconds histogram" in text
+    assert 'work_seconds_bucket{kind="decorated",le="+Inf"} 10' in text
+    assert 'bytes_total{tool="get_historical_data"} 512' in text
+    print("✅ Prometheus export verified.")
+
+    # Step 3: Digital Twin steps are instrumented.
+    before = METRICS.summary()["histograms"].get("digital_twin_step_seconds", {}).get("count", 0)
+    DigitalTwin.detached().step()
+    assert METRICS.summary()["histograms"]["digital_twin_step_seconds"]["count"] == before + 1
+    print("✅ Digital Twin instrumentation verified.")
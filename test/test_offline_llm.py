@@ -0,0 +1,53 @@
+import os
+import pytest
+from crewai import Agent, Crew, Task
+from app.data_models.demand_forecast_models import DemandForecastOutput
+from app.data_models.optimization_models import OptimizationProblem
+from app.data_models.sustainability_report_models import SustainabilityReport
+from app.optimizations.supply_chain_optimization import SupplyChainOptimizer
+from app.utils.llm_utils import get_llm
+from app.utils.offline_llm import OfflineLLM, prompt_key
+
+
+def test_offline_llm(tmp_path, monkeypatch):
+    """Tests the scripted stub, and recording and replaying responses without network access."""
+    print("--- Testing Offline LLM ---")
+    monkeypatch.setenv("MODEL", "offline/stub")
+    monkeypatch.setenv("LLM_CASSETTE_DIR", str(tmp_path / "cassettes"))
+
+    # Step 1: The stub returns scripted structured outputs, both natively and through a crew task.
+    llm = get_llm()
+    assert isinstance(llm, OfflineLLM) and llm.mode == 'stub'
+    forecast = llm.call("Forecast demand for beer.", response_model=DemandForecastOutput)
+    assert forecast.demand_forecast.product_id == 'beer'
+    assert llm.call("Formulate the problem.", response_model=OptimizationProblem).problem_description
+
+    agent = Agent(role="Sustainability Officer", goal="Evaluate actions.", backstory="An auditor.", llm=llm)
+    task = Task(description="Evaluate sourcing 500 units of 'hops' from supplier 'EcoHops Inc.' based in Germany.",
+                expected_output="A sustainability report.", agent=agent, output_pydantic=SustainabilityReport)
+    report = Crew(agents=[agent], tasks=[task]).kickoff().pydantic
+    assert report.recommendation.decision == 'APPROVE'
+    print("✅ Scripted stub outputs verified.")
+
+    # Step 2: The optimizer runs end to end on the stub's PuLP script.
+    result = SupplyChainOptimizer().solve(OptimizationProblem(problem_description="Replenish the retailer."))
+    assert result.variable_values["order_quantity"] == 30
+    print("✅ Offline optimization verified.")
+
+    # Step 3: Record responses from an inner model, then replay them by prompt hash.
+    recorder = OfflineLLM(model="offline/record:stub", mode='record', inner=OfflineLLM(model="offline/stub"),
+                          cassette_dir=str(tmp_path / "cassettes"))
+    order_prompt = "Place an order. Order ID: 3f1c2d9e-8a7b-4c6d-9e0f-1a2b3c4d5e6f"
+    recorded = recorder.call(order_prompt)
+    recorder.call("Formulate the problem.", response_model=OptimizationProblem)
+    assert len(os.listdir(tmp_path / "cassettes")) == 2
+
+    monkeypatch.setenv("MODEL", "offline/replay")
+    replayer = get_llm()
+    # Generated IDs are masked, so a re-run with a different order ID hits the same recording.
+    assert replayer.call("Place an order. Order ID: 00000000-1111-2222-3333-444444444444") == recorded
+    assert isinstance(replayer.call("Formulate the problem.", response_model=OptimizationProblem), OptimizationProblem)
+    assert prompt_key("a") != prompt_key("a", OptimizationProblem)
+    with pytest.raises(LookupError):
+        replayer.call("A prompt that was never recorded.")
+    print("✅ Record and replay verified.")
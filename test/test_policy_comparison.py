@@ -0,0 +1,70 @@
+from app.data_models.simulation_models import DemandDistribution, PolicyComparisonRequest, SimulationRequest
+from app.data_models.supply_chain_models import SupplyChainStatus, SupplyChainNodeStatus
+from app.simulations.policy_comparison import PolicyComparator
+from app.simulations.supply_chain_simulation import SupplyChainSimulation
+from app.tools.simulation_tools import PolicyComparisonTool
+
+POLICIES = {
+    'Base Stock 40': "lambda inventory, pipeline, backlog: np.maximum(0, 40 - inventory - pipeline + backlog)",
+    'Base Stock 200': "lambda inventory, pipeline, backlog: np.maximum(0, 200 - inventory - pipeline + backlog)",
+    'Just-in-Time': "lambda node_name, current_inventory, demand: demand",
+    'Never Order': "lambda inventory: np.zeros_like(inventory)",
+}
+
+
+def beer_game_state() -> SupplyChainStatus:
+    nodes = {
+        name: SupplyChainNodeStatus(name=name, inventory={'beer': 20}, incoming_orders=[], outgoing_orders=[])
+        for name in ['retailer', 'wholesaler', 'distributor', 'brewery']
+    }
+    return SupplyChainStatus(current_step=0, nodes=nodes, shipments_in_transit=[])
+
+
+def test_cost_ceiling():
+    """Tests that a run stops once its cost exceeds the cost ceiling."""
+    request = SimulationRequest(initial_state=beer_game_state(), steps=40, seed=0, ordering_policy_str=POLICIES['Never Order'])
+    full = SupplyChainSimulation(request).run()
+    stopped = SupplyChainSimulation(request.model_copy(update={"cost_ceiling": full.total_cost / 4})).run()
+    assert not full.terminated_early and full.steps_completed == 40
+    assert stopped.terminated_early and stopped.steps_completed < 40
+    assert full.total_cost / 4 < stopped.total_cost < full.total_cost
+    print("✅ Cost ceiling verified.")
+
+
+def test_policy_comparison():
+    """Tests the adaptive comparison of ordering policies by racing and successive halving."""
+    print("--- Testing Policy Comparison ---")
+
+    request = PolicyComparisonRequest(initial_state=beer_game_state(), steps=40, policies=POLICIES,
+                                      demand=DemandDistribution(kind='poisson', mean=15), max_replications=40)
+
+    # Step 1: Racing finds the best policy and eliminates the clearly worse ones after the first round.
+    result = PolicyComparator(request).compare()
+    assert result.best_policy == 'Just-in-Time' and result.converged
+    assert result.ordering_policy_str == POLICIES['Just-in-Time']
+    assert result.policies['Never Order'].eliminated_in_round == 1
+    assert result.policies['Never Order'].replications == request.initial_replications
+    assert result.policies['Just-in-Time'].difference_interval == [0.0, 0.0]
+    assert all(entry.difference_interval[0] > 0 for name, entry in result.policies.items() if name != result.best_policy)
+    print(f"✅ Racing verified: '{result.best_policy}' after {result.total_runs} runs.")
+
+    # Step 2: Runs of a hopeless policy stop at the ceiling, which saves simulated steps.
+    assert result.policies['Never Order'].terminated_runs > 0
+    assert result.policies['Just-in-Time'].terminated_runs == 0
+    assert result.simulated_steps < result.total_runs * request.steps
+    unbounded = PolicyComparator(request.model_copy(update={"cost_ceiling_factor": None})).compare()
+    assert unbounded.best_policy == result.best_policy
+    assert unbounded.simulated_steps == unbounded.total_runs * request.steps > result.simulated_steps
+    print("✅ Early termination verified.")
+
+    # Step 3: Successive halving reaches the same decision.
+    halving = PolicyComparator(request.model_copy(update={"elimination": "successive_halving"})).compare()
+    assert halving.best_policy == result.best_policy and halving.rounds == 2
+    assert halving.policies['Just-in-Time'].replications == 2 * request.initial_replications
+    print("✅ Successive halving verified.")
+
+    # Step 4: The tool accepts a dict and reports a comparison of a single policy as an error message.
+    output = PolicyComparisonTool()._run({"initial_state": beer_game_state().model_dump(),
+                                          "policies": {'Never Order': POLICIES['Never Order']}})
+    assert isinstance(output, str) and "at least two policies" in output
+    print("✅ Policy comparison tool verified.")
@@ -0,0 +1,120 @@
+import pytest
+from app.data_models.production_models import ProductionCapacity, ProductionScheduleRequest
+from app.data_models.simulation_models import SimulationRequest
+from app.data_models.supply_chain_models import Order, OrderBatch, OrderOperation
+from app.digital_twin import DigitalTwin, EventLog, TwinCheckpointer, TwinReplayer
+from app.optimizations.production_scheduling import ProductionScheduler
+from app.simulations.supply_chain_simulation import SupplyChainSimulation
+from app.tools.production_tools import ProductionSchedulingTool
+
+CAPACITY = ProductionCapacity(capacity=100, setup_time=10, batch_size=10, setup_cost=15)
+DEMAND = {'lager': [30, 30, 60, 80, 40, 30], 'stout': [10, 20, 40, 50, 20, 10]}
+
+
+def test_production_scheduler():
+    """Tests that the heuristic and the MILP build feasible schedules and that the MILP is at least as cheap."""
+    print("--- Testing Production Scheduling ---")
+
+    schedules = {}
+    for method in ('heuristic', 'milp'):
+        request = ProductionScheduleRequest(demand=DEMAND, initial_inventory={'lager': 20}, capacity=CAPACITY, method=method)
+        schedules[method] = schedule = ProductionScheduler(request).schedule()
+        print(f"{method}: status={schedule.status} total_cost={schedule.total_cost} utilisation={schedule.utilisation}")
+        assert all(u <= 1.0 + 1e-9 for u in schedule.utilisation)
+        assert all(q % CAPACITY.batch_size == 0 for quantities in schedule.production.values() for q in quantities)
+        assert schedule.total_cost == schedule.holding_cost + schedule.backorder_cost + schedule.setup_cost
+    assert schedules['milp'].status == 'Optimal'
+    assert schedules['milp'].total_cost <= schedules['heuristic'].total_cost
+    print("✅ Both schedules respect the capacity and batch size; the MILP is no more expensive.")
+
+    # The tool accepts dicts and reports invalid capacities as an error message.
+    result = ProductionSchedulingTool()._run({'demand': DEMAND, 'capacity': {'capacity': 15, 'setup_time': 10, 'batch_size': 10}})
+    assert isinstance(result, str) and result.startswith("Production scheduling failed")
+    print("✅ Capacities that cannot fit a batch are rejected by the tool.")
+
+
+def test_simulation_with_production_capacity():
+    """Tests that finite production capacity limits the producing node of the simulation."""
+    print("--- Testing Simulation with Production Capacity ---")
+
+    initial_state = DigitalTwin.detached().get_full_state()
+    initial_state.nodes['brewery'].inventory['beer'] = 0
+    policy = "lambda node_name, current_inventory, demand: demand"
+    costs = {}
+    for label, production in (('unlimited', None), ('capacity', ProductionCapacity(capacity=20, setup_time=5, batch_size=5, setup_cost=2))):
+        request = SimulationRequest(initial_state=initial_state, ordering_policy_str=policy, steps=40, seed=3, production=production)
+        results = SupplyChainSimulation(request).run()
+        costs[label] = results.total_cost
+        print(f"{label}: total_cost={results.total_cost} utilisation={results.production_utilisation}")
+        if production is not None:
+            assert 0 < results.production_utilisation <= 1.0
+    assert costs['capacity'] > costs['unlimited']
+    print("✅ A capacity below the mean demand makes the simulated costs less optimistic.")
+
+
+def test_digital_twin_production(tmp_path):
+    """Tests production orders in the Digital Twin, including restoring them and replaying their events."""
+    print("--- Testing Digital Twin Production ---")
+
+    dt = DigitalTwin.detached()
+    dt.attach_checkpointer(TwinCheckpointer(directory=str(tmp_path), snapshot_every=100))
+    log_path = str(tmp_path / "events.bin")
+    dt.attach_event_log(log_path)
+
+    # Step 1: Without a capacity the brewery cannot order; with one it places production orders with itself.
+    production_order = lambda order_id, quantity: Order(order_id=order_id, product_id='beer', quantity=quantity,
+                                                        source_node='brewery', destination_node='brewery')
+    dt.place_order(production_order('p0', 30))
+    assert dt.get_node_state('brewery').outgoing_orders == []
+    dt.configure_production('brewery', ProductionCapacity(capacity=60, setup_time=5, batch_size=20))
+    dt.place_order(production_order('p1', 30))
+    dt.place_order(production_order('p2', 30))
+    dt.place_order(production_order('p3', 60))  # A setup and three batches exceed the capacity.
+    assert [o.order_id for o in dt.get_node_state('brewery').outgoing_orders] == ['p1', 'p2']
+    print("✅ Production orders are only accepted when they fit in one period.")
+
+    # Step 2: Each step produces the orders that fit, in order; batch rounding adds the surplus to the inventory.
+    dt.step()
+    statuses = {o.order_id: o.status for o in dt.get_node_state('brewery').outgoing_orders}
+    assert statuses == {'p1': 'FULFILLED', 'p2': 'PENDING'}
+    assert dt.get_node_state('brewery').inventory['beer'] == 500 + 40
+    dt.step()
+    assert dt.get_node_state('brewery').outgoing_orders[1].status == 'FULFILLED'
+    assert dt.get_node_state('brewery').inventory['beer'] == 500 + 80
+    expected = dt.get_full_state()
+    print("✅ Production respects the capacity per step.")
+
+    # Step 3: The journal and the event log both rebuild the same state, including the capacity.
+    restored = DigitalTwin.detached()
+    TwinCheckpointer(directory=str(tmp_path)).restore(restored)
+    assert restored.get_full_state() == expected
+    assert restored.nodes['brewery'].production == dt.nodes['brewery'].production
+    assert TwinReplayer(EventLog.load(log_path)).state_at(dt.current_step).get_full_state() == expected
+    print("✅ Production restored from the journal and replayed from the event log.")
+
+
+def test_production_orders_fit_in_capacity():
+    """Tests that no production order larger than one period's capacity can be left pending, which would stall production."""
+    print("--- Testing Oversized Production Orders ---")
+
+    dt = DigitalTwin.detached()
+    dt.configure_production('brewery', ProductionCapacity(capacity=60, setup_time=5, batch_size=20))
+    production_order = Order(order_id='p1', product_id='beer', quantity=30, source_node='brewery', destination_node='brewery')
+
+    # Step 1: An amend of an order placed earlier in the same batch is validated against its capacity.
+    result = dt.apply_order_batch(OrderBatch(operations=[
+        OrderOperation(action='place', order=production_order),
+        OrderOperation(action='amend', order_id='p1', quantity=500),
+    ], atomic=False))
+    assert result.applied == 1 and "cannot produce 500" in result.rejected[0].reason
+    assert dt.get_node_state('brewery').outgoing_orders[0].quantity == 30
+    print("✅ Batch amends cannot oversize a production order.")
+
+    # Step 2: The capacity cannot be lowered below a pending production order.
+    with pytest.raises(ValueError, match="pending production order of 30 units"):
+        dt.configure_production('brewery', ProductionCapacity(capacity=20))
+    assert dt.nodes['brewery'].production.capacity == 60
+    dt.step()
+    assert dt.get_node_state('brewery').outgoing_orders[0].status == 'FULFILLED'
+    dt.configure_production('brewery', ProductionCapacity(capacity=20))
+    print("✅ Production capacity only lowered once the pending orders fit.")
@@ -0,0 +1,101 @@
+import numpy as np
+from app.data_models.simulation_models import DemandDistribution, LeadTimeDistribution
+from app.data_models.simulation_models import SimulationRequest
+from app.data_models.erp_models import HistoricalData
+from app.data_models.supply_chain_models import Order, SupplyChainStatus, SupplyChainNodeStatus
+from app.digital_twin import DigitalTwin
+from app.simulations.supply_chain_simulation import SupplyChainSimulation
+from app.simulations.random_generators import DemandGenerator, scenario_streams, empirical_demand, empirical_lead_times
+
+
+def run(request: SimulationRequest, seed: int = 7):
+    return SupplyChainSimulation(request.model_copy(update={"seed": seed})).run()
+
+
+def test_multi_product_simulation():
+    """Tests the vectorised node × product simulation with per-product costs and both policy signatures."""
+    print("--- Testing Multi-Product Simulation ---")
+
+    products = ['ale', 'lager', 'stout']
+    nodes = {
+        name: SupplyChainNodeStatus(name=name, inventory={p: 40 for p in products}, incoming_orders=[], outgoing_orders=[])
+        for name in ['retailer', 'wholesaler', 'distributor', 'brewery']
+    }
+    state = SupplyChainStatus(current_step=0, nodes=nodes, shipments_in_transit=[])
+
+    # Step 1: A per-product policy and the equivalent product-level policy produce identical results.
+    scalar = SimulationRequest(initial_state=state, steps=30,
+                               ordering_policy_str="lambda node_name, current_inventory, demand: max(0, 50 - current_inventory)")
+    vectorised = scalar.model_copy(update={"ordering_policy_str": "lambda inventory: np.maximum(0, 50 - inventory)"})
+    scalar_results, vectorised_results = run(scalar), run(vectorised)
+    assert len(scalar_results.history) == 30
+    assert set(scalar_results.product_costs) == set(products)
+    assert scalar_results.total_cost == vectorised_results.total_cost
+    assert scalar_results.stockout_events == vectorised_results.stockout_events
+    print("✅ Policy signatures verified.")
+
+    # Step 2: Costs are tracked per product, and unmet demand is backordered at the backorder cost.
+    starved = scalar.model_copy(update={
+        "ordering_policy_str": "lambda inventory: np.zeros_like(inventory)",
+        "holding_costs": {"stout": 2.0},
+        "backorder_costs": {"lager": 10.0},
+    })
+    results = run(starved)
+    assert results.history[-1].nodes['retailer']['backlog'] > 0
+    assert results.product_costs['lager'] > results.product_costs['ale']
+    assert abs(results.total_cost - sum(results.product_costs.values())) < 1e-6
+    print("✅ Per-product holding and backorder costs verified.")
+
+
+def test_stochastic_generators():
+    """Tests the seeded demand and lead-time generators and common random numbers."""
+    print("--- Testing Stochastic Generators ---")
+
+    # Step 1: With common random numbers, scenarios with the same seed share their draws; without, they do not.
+    generator = DemandGenerator(DemandDistribution(kind='poisson', mean=20), ['beer'])
+    draw = lambda streams: generator.sample(streams[0], 0, 50)
+    assert np.array_equal(draw(scenario_streams(1, "Policy A")), draw(scenario_streams(1, "Policy B")))
+    assert not np.array_equal(draw(scenario_streams(1, "A", common_random_numbers=False)),
+                              draw(scenario_streams(1, "B", common_random_numbers=False)))
+    assert not np.array_equal(generator.sample(scenario_streams(1, replication=0)[0], 0, 50),
+                              generator.sample(scenario_streams(1, replication=1)[0], 0, 50))
+    print("✅ Common random numbers verified.")
+
+    # Step 2: The negative binomial and seasonal distributions have the configured moments.
+    rng = np.random.default_rng(0)
+    overdispersed = DemandGenerator(DemandDistribution(kind='negative_binomial', mean=20, dispersion=4), ['beer'])
+    draws = overdispersed.sample(rng, 0, 20000)
+    assert abs(draws.mean() - 20) < 0.5 and abs(draws.var() - (20 + 20 ** 2 / 4)) < 10
+    seasonal = DemandGenerator(DemandDistribution(kind='seasonal', mean=20, amplitude=0.5, period=4), ['beer'])
+    assert seasonal.sample(rng, 1, 5000).mean() > 25 > 15 > seasonal.sample(rng, 3, 5000).mean()
+    print("✅ Demand distributions verified.")
+
+    # Step 3: Empirical distributions are built from ERP history.
+    from app.mcp.erp_server import DB
+    assert sorted(empirical_demand(DB.history).samples) == [15.0, 25.0]
+    assert sorted(empirical_lead_times(DB.history).samples) == [1, 1, 2]
+    # History recorded from the twin lists every order placed so far in each period; each one is sampled once.
+    dt, history = DigitalTwin.detached(), []
+    for quantity in (15, 25, 20):
+        dt.place_order(Order(product_id='beer', quantity=quantity, source_node='wholesaler', destination_node='retailer'))
+        dt.step()
+        state = dt.get_full_state().model_copy(deep=True)
+        history.append(HistoricalData(period=state.current_step, nodes=state.nodes, shipments_in_transit=state.shipments_in_transit))
+    assert empirical_demand(history).samples == [15.0, 25.0, 20.0]
+    print("✅ Empirical distributions verified.")
+
+    # Step 4: Seeded runs are reproducible, also with stochastic lead times, and the pipeline drains into inventory.
+    nodes = {
+        name: SupplyChainNodeStatus(name=name, inventory={'beer': 60}, incoming_orders=[], outgoing_orders=[])
+        for name in ['retailer', 'wholesaler', 'distributor', 'brewery']
+    }
+    request = SimulationRequest(
+        initial_state=SupplyChainStatus(current_step=0, nodes=nodes, shipments_in_transit=[]), steps=40,
+        ordering_policy_str="lambda inventory, pipeline, backlog: 80 - inventory - pipeline + backlog",
+        demand=DemandDistribution(kind='negative_binomial', mean=15, dispersion=3),
+        lead_time=LeadTimeDistribution(kind='poisson', mean=2.0),
+    )
+    first, second = run(request, seed=3), run(request, seed=3)
+    assert first.total_cost == second.total_cost and first.history == second.history
+    assert run(request, seed=4).total_cost != first.total_cost
+    print("✅ Reproducible stochastic runs verified.")